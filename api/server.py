@@ -1,6 +1,6 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from typing import Dict, List
 import json
@@ -101,24 +101,47 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
     except WebSocketDisconnect:
         manager.disconnect(user_id)
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint: Span latency histograms from utils/metrics.py"""
+    from utils.metrics import METRICS_ENABLED, get_histograms
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics disabled (METRICS_ENABLED=0)")
+    return PlainTextResponse(get_histograms().render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/api/health")
 async def health_check():
+    from data.collector import DataCollector
+    from utils import engines
+    from utils.loop_monitor import get_loop_monitor
+    from utils.user_cache import get_user_cache
+    # Reads the shared engines as they are: A liveness probe must not build one (None = never started)
     return {
         "status": "healthy",
         "active_connections": len(manager.active_connections),
+        "data_fetch": DataCollector.get_fetch_stats(),
+        "exchanges": engines._exchange_registry.get_stats() if engines._exchange_registry else None,
+        "scan_scheduler": engines._scan_scheduler.get_stats() if engines._scan_scheduler else None,
+        "scan_pipeline": engines._scan_pipeline.last_report if engines._scan_pipeline else None,
+        "compute_pool": engines._compute_pool.get_stats() if engines._compute_pool else None,
+        "event_loop": get_loop_monitor().get_stats(),
+        "db_writer": engines._db_writer.get_stats() if engines._db_writer else None,
+        "user_cache": get_user_cache().get_stats(),
         "timestamp": datetime.now().isoformat()
     }
 
 @app.get("/api/signals/{user_id}")
 async def get_user_signals(user_id: str, limit: int = 10):
     """Fetch user's recent signals from database"""
-    from utils.db import init_db, SignalHistory
+    from sqlalchemy import select
+    from utils.db import SignalHistory
+    from utils.async_db import init_async_db
     
-    db = init_db()
+    db = init_async_db()
     try:
-        signals = db.session.query(SignalHistory).order_by(SignalHistory.id.desc()).limit(limit).all()
+        signals = await db.all(select(SignalHistory).order_by(SignalHistory.id.desc()).limit(limit))
     finally:
-        db.close()
+        await db.close()
     
     return {
         "user_id": user_id,
@@ -130,12 +153,22 @@ async def get_user_signals(user_id: str, limit: int = 10):
                 "tp": s.tp,
                 "sl": s.sl,
                 "confidence": s.confidence,
+                "strategy": s.strategy,
+                "outcome": s.outcome,
+                "tpsl_outcome": s.tpsl_outcome,
+                "realized_move": s.realized_move,
                 "timestamp": s.timestamp.isoformat() if s.timestamp else None
             }
             for s in signals
         ]
     }
 
+@app.get("/api/signal-stats")
+async def get_signal_stats(days: int = 30):
+    """Resolved signal hit rates per strategy and confidence band (see engine/outcome_tracker.py)"""
+    from engine.outcome_tracker import get_signal_stats as signal_stats
+    return await asyncio.to_thread(signal_stats, days)
+
 @app.post("/api/execute-trade")
 async def execute_trade(trade_data: dict):
     """Handle trade execution from Mini App"""
@@ -148,51 +181,61 @@ async def execute_trade(trade_data: dict):
         "executed_at": datetime.now().isoformat()
     }
 
-@app.get("/api/market-scan")
-async def market_scan():
-    # Use shared global ai_gen and data_collector
-    from utils.engines import get_ai_gen, get_data_collector
-    this_ai_gen = get_ai_gen()
-    this_data_collector = get_data_collector()
-    
-    # Priority assets (High Return / Popular)
-    assets_to_scan = [
-        # Forex OTC
-        ("EURUSD=X", "forex"), ("GBPUSD=X", "forex"), ("USDJPY=X", "forex"),
-        # Crypto
-        ("BTC/USDT", "crypto"), ("ETH/USDT", "crypto"), ("SOL/USDT", "crypto"),
-        # Synthetics
-        ("R_100", "synthetic"), ("R_75", "synthetic"), ("C1000", "synthetic"), ("B1000", "synthetic"),
-        # Commodities
-        ("GC=F", "forex"), # Gold
-    ]
+# Priority assets (High Return / Popular)
+MARKET_SCAN_ASSETS = [
+    # Forex OTC
+    ("EURUSD=X", "forex"), ("GBPUSD=X", "forex"), ("USDJPY=X", "forex"),
+    # Crypto
+    ("BTC/USDT", "crypto"), ("ETH/USDT", "crypto"), ("SOL/USDT", "crypto"),
+    # Synthetics
+    ("R_100", "synthetic"), ("R_75", "synthetic"), ("C1000", "synthetic"), ("B1000", "synthetic"),
+    # Commodities
+    ("GC=F", "forex"), # Gold
+]
+MARKET_SCAN_MIN_CONFIDENCE = 85 # On the raw score ('raw_confidence'), not the calibrated win rate
 
-    async def scan_asset(symbol, asset_type):
+@app.on_event("startup")
+async def start_scan_push():
+    """Pushes the scan scheduler's high-confidence signals to connected Mini App users."""
+    from utils.engines import get_scan_scheduler
+    scheduler = get_scan_scheduler()
+    queue = scheduler.subscribe()
+    scan_symbols = {symbol for symbol, _ in MARKET_SCAN_ASSETS}
+
+    async def push_loop():
         try:
-            if asset_type == "forex":
-                df = await data_collector.fetch_data(symbol, asset_type)
-            elif asset_type == "crypto":
-                df = await data_collector.get_crypto_data(symbol)
-            elif asset_type == "synthetic":
-                df = await data_collector.get_synthetic_data(symbol)
-            else:
-                return None
-                
-            if df.empty: return None
-            
-            signal = await this_ai_gen.generate_signal(symbol, df)
-            if signal and signal['confidence'] >= 85:
-                return signal
-        except Exception as e:
-            logging.error(f"Scan error for {symbol}: {e}")
-        return None
+            while True:
+                published = await queue.get()
+                if not manager.active_connections:
+                    continue
+                for symbol, signal in published.items():
+                    if signal and symbol in scan_symbols and signal['raw_confidence'] >= MARKET_SCAN_MIN_CONFIDENCE:
+                        await manager.broadcast({"type": "signal", "data": signal, "timestamp": datetime.now().isoformat()})
+        finally:
+            scheduler.unsubscribe(queue)
 
-    # Run scans in parallel
-    tasks = [scan_asset(s, t) for s, t in assets_to_scan]
-    results = await asyncio.gather(*tasks)
+    asyncio.create_task(push_loop())
+
+@app.get("/api/market-scan")
+async def market_scan():
+    # Closed-bar evaluations from the scan scheduler: No fetch or recompute per request
+    from utils.engines import get_scan_pipeline, get_scan_scheduler
+    scheduler = get_scan_scheduler()
+    if scheduler.ready(MARKET_SCAN_ASSETS):
+        signals = [s for s in scheduler.latest(MARKET_SCAN_ASSETS) if s['raw_confidence'] >= MARKET_SCAN_MIN_CONFIDENCE]
+        signals.sort(key=lambda x: x['confidence'], reverse=True)
+        return {"count": len(signals), "signals": signals[:10]}
+
+    # Pipelined pass: Fetches overlap with micro-batched scoring (same mode as the scheduler: news sentiment included)
+    from engine.scan_scheduler import SCAN_FAST_SCAN
+    try:
+        results = (await get_scan_pipeline().run(MARKET_SCAN_ASSETS, fast_scan=SCAN_FAST_SCAN)).values()
+    except Exception as e:
+        logging.error(f"Market scan error: {e}")
+        results = []
     
     # Filter valid signals
-    high_conf_signals = [r for r in results if r is not None]
+    high_conf_signals = [r for r in results if r is not None and r['raw_confidence'] >= MARKET_SCAN_MIN_CONFIDENCE]
     
     # Sort by confidence descending
     high_conf_signals.sort(key=lambda x: x['confidence'], reverse=True)
@@ -214,16 +257,36 @@ async def push_signal_internal(payload: dict):
 
 # --- ADMIN MANAGEMENT ENDPOINTS ---
 
+@app.get("/api/admin/memory")
+async def admin_memory(admin_id: str, top: int = 10):
+    """RSS, cache sizes and (MEM_PROFILER=1) top tracemalloc allocation sites per subsystem"""
+    from utils.db import SUPER_ADMIN_ID
+    from utils.mem_profiler import get_mem_profiler
+    if admin_id != SUPER_ADMIN_ID:
+        raise HTTPException(status_code=403, detail="Unauthorized Access")
+    # Snapshotting walks every traced block: Keep it off the event loop
+    return await asyncio.to_thread(get_mem_profiler().report, top)
+
+@app.get("/api/admin/loop-stalls")
+async def admin_loop_stalls(admin_id: str, limit: int = 20):
+    """Full stack traces of the latest event-loop stalls (see utils/loop_monitor.py)"""
+    from utils.db import SUPER_ADMIN_ID
+    from utils.loop_monitor import get_loop_monitor
+    if admin_id != SUPER_ADMIN_ID:
+        raise HTTPException(status_code=403, detail="Unauthorized Access")
+    return get_loop_monitor().get_stats(stalls=limit, stacks=True)
+
 @app.get("/api/admin/users")
 async def admin_get_users(admin_id: str):
     """Fetch all users for the Admin Dashboard"""
-    from utils.db import init_db, User, SUPER_ADMIN_ID
+    from utils.db import User, SUPER_ADMIN_ID
+    from utils.async_db import init_async_db
     if admin_id != SUPER_ADMIN_ID:
         raise HTTPException(status_code=403, detail="Unauthorized Access")
     
-    db = init_db()
+    db = init_async_db()
     try:
-        users = db.get_all_users()
+        users = await db.get_all_users()
         return [
             {
                 "id": u.id,
@@ -251,12 +314,14 @@ async def admin_get_users(admin_id: str):
             for u in users
         ]
     finally:
-        db.close()
+        await db.close()
 
 @app.post("/api/admin/user-action")
 async def admin_user_action(payload: dict):
     """Perform CRUD action on a user (ban, promote, delete)"""
-    from utils.db import init_db, User, SUPER_ADMIN_ID, SignalHistory, TradeExecution, BrokerAccount
+    from sqlalchemy import delete
+    from utils.db import User, SUPER_ADMIN_ID, SignalHistory, TradeExecution, BrokerAccount
+    from utils.async_db import init_async_db
     admin_id = payload.get("admin_id")
     target_id = payload.get("target_id")
     action = payload.get("action") # ban, unban, promote, demote, delete
@@ -264,9 +329,9 @@ async def admin_user_action(payload: dict):
     if admin_id != SUPER_ADMIN_ID:
         raise HTTPException(status_code=403, detail="Unauthorized Access")
     
-    db = init_db()
+    db = init_async_db()
     try:
-        user = db.get_user_by_telegram_id(target_id)
+        user = await db.get_user_by_telegram_id(target_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
             
@@ -291,17 +356,17 @@ async def admin_user_action(payload: dict):
             user.plan_expires_at = datetime.datetime.utcnow() + datetime.timedelta(days=30)
         elif action == "delete":
             # Cascading deletion for SQLite (manual because of how models are structured)
-            db.session.query(TradeExecution).filter(TradeExecution.user_id == target_id).delete()
-            db.session.query(BrokerAccount).filter(BrokerAccount.user_id == user.id).delete()
+            await db.execute(delete(TradeExecution).where(TradeExecution.user_id == target_id))
+            await db.execute(delete(BrokerAccount).where(BrokerAccount.user_id == user.id))
             # Note: SignalHistory is global, not user-specific in current schema
-            db.session.delete(user)
+            await db.delete(user)
         else:
             raise HTTPException(status_code=400, detail="Invalid action")
             
-        db.commit()
+        await db.commit()
         return {"status": "success", "message": f"Action {action} performed on {target_id}"}
     finally:
-        db.close()
+        await db.close()
 
 # Function to be called from bot handlers
 async def push_signal_to_miniapp(user_id: str, signal: dict):
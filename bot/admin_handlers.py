@@ -5,7 +5,9 @@ Full CRUD, User Management, KYC Review, Plan Upgrades
 import logging
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, WebAppInfo
 from telegram.ext import ContextTypes
-from utils.db import init_db, User, SUPER_ADMIN_ID
+from sqlalchemy import select
+from utils.db import User, SUPER_ADMIN_ID
+from utils.async_db import init_async_db
 from config import Config
 import datetime
 
@@ -13,22 +15,22 @@ def is_super_admin(user_id: str) -> bool:
     """Check if user is the Super Admin"""
     return str(user_id) == SUPER_ADMIN_ID
 
-def is_admin(user_id: str) -> bool:
+async def is_admin(user_id: str) -> bool:
     """Check if user is any admin"""
     if is_super_admin(user_id):
         return True
-    db = init_db()
+    db = init_async_db()
     try:
-        user = db.get_user_by_telegram_id(str(user_id))
+        user = await db.get_user_by_telegram_id(str(user_id))
         return user and user.is_admin
     finally:
-        db.close()
+        await db.close()
 
 async def admin_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Main admin command handler"""
     user_id = str(update.effective_user.id)
     
-    if not is_admin(user_id):
+    if not await is_admin(user_id):
         await update.message.reply_text("⛔ Access Denied. Admin privileges required.")
         return
     
@@ -61,17 +63,17 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
     await query.answer()
     user_id = str(update.effective_user.id)
     
-    if not is_admin(user_id):
+    if not await is_admin(user_id):
         await query.edit_message_text("⛔ Access Denied.")
         return True # Handled (but denied)
     
     # User List with Pagination
     if data.startswith("admin_users_"):
         page = int(data.split("_")[2])
-        db = init_db()
+        db = init_async_db()
         try:
-            users = db.get_users_paginated(page=page, per_page=10)
-            total = db.get_user_count()
+            users = await db.get_users_paginated(page=page, per_page=10)
+            total = await db.get_user_count()
             total_pages = (total + 9) // 10
             
             if not users:
@@ -114,20 +116,20 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
             
             await query.edit_message_text(text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode="Markdown")
         finally:
-            db.close()
+            await db.close()
         return True
     
     # Stats Dashboard
     elif data == "admin_stats":
-        db = init_db()
+        db = init_async_db()
         try:
-            total_users = db.get_user_count()
-            registered = db.session.query(User).filter(User.is_registered == True).count()
-            free_users = db.session.query(User).filter(User.subscription_plan == "free").count()
-            basic_users = db.session.query(User).filter(User.subscription_plan == "basic").count()
-            pro_users = db.session.query(User).filter(User.subscription_plan == "pro").count()
-            vip_users = db.session.query(User).filter(User.subscription_plan == "vip").count()
-            pending_kyc = db.session.query(User).filter(User.kyc_status == "pending").count()
+            total_users = await db.get_user_count()
+            registered = await db.count(User, User.is_registered == True)
+            free_users = await db.count(User, User.subscription_plan == "free")
+            basic_users = await db.count(User, User.subscription_plan == "basic")
+            pro_users = await db.count(User, User.subscription_plan == "pro")
+            vip_users = await db.count(User, User.subscription_plan == "vip")
+            pending_kyc = await db.count(User, User.kyc_status == "pending")
             
             text = (
                 "📊 **PLATFORM STATISTICS**\n"
@@ -145,14 +147,14 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
             keyboard = [[InlineKeyboardButton("🔙 Back", callback_data="admin_back")]]
             await query.edit_message_text(text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode="Markdown")
         finally:
-            db.close()
+            await db.close()
         return True
     
     # Pending KYC
     elif data == "admin_kyc_pending":
-        db = init_db()
+        db = init_async_db()
         try:
-            pending = db.get_pending_kyc()
+            pending = await db.get_pending_kyc()
             
             if not pending:
                 text = "✅ No pending KYC submissions."
@@ -168,15 +170,15 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
             
             await query.edit_message_text(text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode="Markdown")
         finally:
-            db.close()
+            await db.close()
         return True
     
     # KYC Review
     elif data.startswith("admin_kyc_review_"):
         target_id = data.split("_")[3]
-        db = init_db()
+        db = init_async_db()
         try:
-            user = db.get_user_by_telegram_id(target_id)
+            user = await db.get_user_by_telegram_id(target_id)
             if not user:
                 await query.edit_message_text("User not found.")
                 return
@@ -211,19 +213,19 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
                     await context.bot.send_photo(query.message.chat_id, user.kyc_selfie, caption="🤳 Selfie with ID")
                 except: pass
         finally:
-            db.close()
+            await db.close()
         return True
     
     # KYC Approve
     elif data.startswith("admin_kyc_approve_"):
         target_id = data.split("_")[3]
-        db = init_db()
+        db = init_async_db()
         try:
-            user = db.get_user_by_telegram_id(target_id)
+            user = await db.get_user_by_telegram_id(target_id)
             if user:
                 user.kyc_status = "approved"
                 user.kyc_reviewed_at = datetime.datetime.utcnow()
-                db.commit()
+                await db.commit()
                 
                 # Notify user
                 try:
@@ -236,7 +238,7 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
                 
                 await query.edit_message_text(f"✅ KYC approved for user `{target_id}`.", parse_mode="Markdown")
         finally:
-            db.close()
+            await db.close()
         return True
     
     # KYC Reject
@@ -252,9 +254,9 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
     # User Detail View (Intelligence Mode)
     elif data.startswith("admin_view_"):
         target_id = data.split("_")[2]
-        db = init_db()
+        db = init_async_db()
         try:
-            user = db.get_user_by_telegram_id(target_id)
+            user = await db.get_user_by_telegram_id(target_id)
             if not user:
                 await query.edit_message_text("User not found.")
                 return
@@ -302,7 +304,7 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
             
             await query.edit_message_text(text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode="Markdown")
         finally:
-            db.close()
+            await db.close()
         return True
     
     # Upgrade Plan
@@ -324,16 +326,16 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
         target_id = parts[2]
         new_plan = parts[3]
         
-        db = init_db()
+        db = init_async_db()
         try:
-            user = db.get_user_by_telegram_id(target_id)
+            user = await db.get_user_by_telegram_id(target_id)
             if user:
                 user.subscription_plan = new_plan
                 if new_plan != "free":
                     user.plan_expires_at = datetime.datetime.utcnow() + datetime.timedelta(days=30)
                 else:
                     user.plan_expires_at = None
-                db.commit()
+                await db.commit()
                 
                 # Notify user
                 try:
@@ -346,35 +348,35 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
                 
                 await query.edit_message_text(f"✅ Plan updated to **{new_plan.upper()}** for `{target_id}`.", parse_mode="Markdown")
         finally:
-            db.close()
+            await db.close()
         return True
     
     # Promote User to Admin
     elif data.startswith("admin_promote_"):
         target_id = data.split("_")[2]
-        db = init_db()
+        db = init_async_db()
         try:
-            user = db.get_user_by_telegram_id(target_id)
+            user = await db.get_user_by_telegram_id(target_id)
             if user:
                 user.is_admin = True
-                db.commit()
+                await db.commit()
                 await query.edit_message_text(f"⭐ User `{target_id}` has been **PROMOTED** to Admin.", parse_mode="Markdown")
         finally:
-            db.close()
+            await db.close()
         return True
 
     # Demote Admin to User
     elif data.startswith("admin_demote_"):
         target_id = data.split("_")[2]
-        db = init_db()
+        db = init_async_db()
         try:
-            user = db.get_user_by_telegram_id(target_id)
+            user = await db.get_user_by_telegram_id(target_id)
             if user:
                 user.is_admin = False
-                db.commit()
+                await db.commit()
                 await query.edit_message_text(f"🎖️ User `{target_id}` has been **DEMOTED** to User.", parse_mode="Markdown")
         finally:
-            db.close()
+            await db.close()
         return True
 
     # Delete Confirmation
@@ -394,19 +396,20 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
     # Actual Delete Execution
     elif data.startswith("admin_delete_"):
         target_id = data.split("_")[2]
+        from sqlalchemy import delete
         from utils.db import TradeExecution, BrokerAccount
-        db = init_db()
+        db = init_async_db()
         try:
-            user = db.get_user_by_telegram_id(target_id)
+            user = await db.get_user_by_telegram_id(target_id)
             if user:
                 # Manual cascade for SQLite consistency as seen in server.py
-                db.session.query(TradeExecution).filter(TradeExecution.user_id == target_id).delete()
-                db.session.query(BrokerAccount).filter(BrokerAccount.user_id == user.id).delete()
-                db.session.delete(user)
-                db.commit()
+                await db.execute(delete(TradeExecution).where(TradeExecution.user_id == target_id))
+                await db.execute(delete(BrokerAccount).where(BrokerAccount.user_id == user.id))
+                await db.delete(user)
+                await db.commit()
                 await query.edit_message_text(f"🗑️ User `{target_id}` has been **PERMANENTLY DELETED**.", parse_mode="Markdown")
         finally:
-            db.close()
+            await db.close()
         return True
 
     # Add Balance Preparation (Native Request)
@@ -422,44 +425,44 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
     # Manual Signal Reset
     elif data.startswith("admin_reset_"):
         target_id = data.split("_")[2]
-        db = init_db()
+        db = init_async_db()
         try:
-            user = db.get_user_by_telegram_id(target_id)
+            user = await db.get_user_by_telegram_id(target_id)
             if user:
                 user.signals_used_today = 0
-                db.commit()
+                await db.commit()
                 await query.edit_message_text(f"🔄 Daily signal count has been **RESET** for `{target_id}`.", parse_mode="Markdown")
         finally:
-            db.close()
+            await db.close()
         return True
 
     # Ban User
     elif data.startswith("admin_ban_"):
         target_id = data.split("_")[2]
-        db = init_db()
+        db = init_async_db()
         try:
-            user = db.get_user_by_telegram_id(target_id)
+            user = await db.get_user_by_telegram_id(target_id)
             if user:
                 user.is_banned = True
-                db.commit()
+                await db.commit()
                 await query.edit_message_text(f"🚫 User `{target_id}` has been **BANNED**.", parse_mode="Markdown")
         finally:
-            db.close()
+            await db.close()
         return True
     
     # Unban User
     elif data.startswith("admin_unban_"):
         target_id = data.split("_")[2]
-        db = init_db()
+        db = init_async_db()
         try:
-            user = db.get_user_by_telegram_id(target_id)
+            user = await db.get_user_by_telegram_id(target_id)
             if user:
                 user.is_banned = False
                 user.ban_reason = None
-                db.commit()
+                await db.commit()
                 await query.edit_message_text(f"✅ User `{target_id}` has been **UNBANNED**.", parse_mode="Markdown")
         finally:
-            db.close()
+            await db.close()
         return True
     
     # Search User
@@ -503,7 +506,7 @@ async def admin_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
     user_id = str(update.effective_user.id)
     text = update.message.text or ""
     
-    if not is_admin(user_id):
+    if not await is_admin(user_id):
         return False
 
     # IGNORE commands or menu buttons - let main handler take over
@@ -519,14 +522,14 @@ async def admin_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
         context.user_data['admin_search_mode'] = False
         search_term = update.message.text.strip()
         
-        db = init_db()
+        db = init_async_db()
         try:
             # Search by telegram_id, username, or email
-            user = db.session.query(User).filter(
+            user = await db.first(select(User).where(
                 (User.telegram_id == search_term) | 
                 (User.username == search_term) | 
                 (User.email == search_term)
-            ).first()
+            ))
             
             if user:
                 keyboard = [[InlineKeyboardButton("View Profile", callback_data=f"admin_view_{user.telegram_id}")]]
@@ -538,7 +541,7 @@ async def admin_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
             else:
                 await update.message.reply_text("❌ No user found with that identifier.")
         finally:
-            db.close()
+            await db.close()
         return True
     
     # Broadcast Mode
@@ -546,9 +549,9 @@ async def admin_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
         context.user_data['admin_broadcast_mode'] = False
         message = update.message.text
         
-        db = init_db()
+        db = init_async_db()
         try:
-            users = db.get_all_users()
+            users = await db.get_all_users()
             success = 0
             failed = 0
             
@@ -565,7 +568,7 @@ async def admin_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
             
             await update.message.reply_text(f"📢 Broadcast complete!\n✅ Sent: {success}\n❌ Failed: {failed}")
         finally:
-            db.close()
+            await db.close()
         return True
     
     # KYC Rejection Reason
@@ -573,14 +576,14 @@ async def admin_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
         target_id = context.user_data.pop('kyc_reject_target')
         reason = update.message.text
         
-        db = init_db()
+        db = init_async_db()
         try:
-            user = db.get_user_by_telegram_id(target_id)
+            user = await db.get_user_by_telegram_id(target_id)
             if user:
                 user.kyc_status = "rejected"
                 user.kyc_rejection_reason = reason
                 user.kyc_reviewed_at = datetime.datetime.utcnow()
-                db.commit()
+                await db.commit()
                 
                 # Notify user
                 try:
@@ -593,7 +596,7 @@ async def admin_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
                 
                 await update.message.reply_text(f"❌ KYC rejected for `{target_id}` with reason: {reason}", parse_mode="Markdown")
         finally:
-            db.close()
+            await db.close()
         return True
 
     # Balance Adjustment Processing
@@ -601,13 +604,13 @@ async def admin_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
         target_id = context.user_data.pop('admin_bal_target')
         try:
             amount = float(update.message.text.strip())
-            db = init_db()
+            db = init_async_db()
             try:
-                user = db.get_user_by_telegram_id(target_id)
+                user = await db.get_user_by_telegram_id(target_id)
                 if user:
                     old_bal = user.wallet_balance
                     user.wallet_balance += amount
-                    db.commit()
+                    await db.commit()
                     
                     action = "ADDED" if amount >= 0 else "SUBTRACTED"
                     await update.message.reply_text(
@@ -629,7 +632,7 @@ async def admin_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
                         )
                     except: pass
             finally:
-                db.close()
+                await db.close()
         except ValueError:
             await update.message.reply_text("❌ Invalid amount. Please enter a number (e.g. 100 or -50).")
         return True
@@ -6,7 +6,9 @@ import re
 import logging
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, ReplyKeyboardRemove
 from telegram.ext import ContextTypes
-from utils.db import init_db, User, SUPER_ADMIN_ID
+from sqlalchemy import select
+from utils.db import User, SUPER_ADMIN_ID
+from utils.async_db import init_async_db
 import datetime
 
 # Common country list
@@ -40,9 +42,9 @@ async def start_signup(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = str(update.effective_user.id)
     username = update.effective_user.username
     
-    db = init_db()
+    db = init_async_db()
     try:
-        user = db.get_user_by_telegram_id(user_id)
+        user = await db.get_user_by_telegram_id(user_id)
         
         if not user:
             # Create new user entry
@@ -52,7 +54,7 @@ async def start_signup(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 registration_step="name"
             )
             db.add(user)
-            db.commit()
+            await db.commit()
         elif user.is_registered:
             await update.message.reply_text(
                 "✅ You're already registered! Use the menu to access features.",
@@ -65,12 +67,12 @@ async def start_signup(update: Update, context: ContextTypes.DEFAULT_TYPE):
             # Ensure we update username if they set one since last attempt
             if username and not user.username:
                 user.username = username
-            db.commit()
+            await db.commit()
         
         # Check for missing username (Mandatory Requirement)
         if not user.username:
             user.registration_step = "set_username"
-            db.commit()
+            await db.commit()
             await update.message.reply_text(
                 "🦁 **WELCOME TO TRADESIGX**\n"
                 "━━━━━━━━━━━━━━━━━━━━\n\n"
@@ -90,16 +92,16 @@ async def start_signup(update: Update, context: ContextTypes.DEFAULT_TYPE):
             reply_markup=ReplyKeyboardRemove()
         )
     finally:
-        db.close()
+        await db.close()
 
 async def handle_signup_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
     """Process signup flow messages. Returns True if handled."""
     user_id = str(update.effective_user.id)
     text = update.message.text.strip()
     
-    db = init_db()
+    db = init_async_db()
     try:
-        user = db.get_user_by_telegram_id(user_id)
+        user = await db.get_user_by_telegram_id(user_id)
         
         if not user or user.is_registered:
             return False
@@ -114,14 +116,14 @@ async def handle_signup_message(update: Update, context: ContextTypes.DEFAULT_TY
                 return True
             
             # Simple check for unique username in DB
-            existing = db.session.query(User).filter(User.username == text).first()
+            existing = await db.first(select(User).where(User.username == text))
             if existing:
                 await update.message.reply_text("❌ This username is already taken. Please try another.")
                 return True
                 
             user.username = text
             user.registration_step = "name"
-            db.commit()
+            await db.commit()
             await update.message.reply_text(
                 f"✅ Username set to **{text}**!\n\n"
                 "**Step 1 of 6**: What's your full name?",
@@ -137,7 +139,7 @@ async def handle_signup_message(update: Update, context: ContextTypes.DEFAULT_TY
             
             user.full_name = text
             user.registration_step = "email"
-            db.commit()
+            await db.commit()
             
             await update.message.reply_text(
                 f"Great, **{text}**! 👋\n\n"
@@ -154,14 +156,14 @@ async def handle_signup_message(update: Update, context: ContextTypes.DEFAULT_TY
                 return True
             
             # Check if email already exists
-            existing = db.session.query(User).filter(User.email == text.lower()).first()
+            existing = await db.first(select(User).where(User.email == text.lower()))
             if existing and existing.telegram_id != user_id:
                 await update.message.reply_text("❌ This email is already registered to another account.")
                 return True
             
             user.email = text.lower()
             user.registration_step = "phone"
-            db.commit()
+            await db.commit()
             
             await update.message.reply_text(
                 "✅ Email saved!\n\n"
@@ -188,7 +190,7 @@ async def handle_signup_message(update: Update, context: ContextTypes.DEFAULT_TY
             
             user.phone = phone
             user.registration_step = "country"
-            db.commit()
+            await db.commit()
             
             await update.message.reply_text(
                 "✅ Phone saved!\n\n"
@@ -219,14 +221,14 @@ async def handle_signup_message(update: Update, context: ContextTypes.DEFAULT_TY
             
             user.country = text
             user.registration_step = "terms"
-            db.commit()
+            await db.commit()
             
             await show_terms(update, context)
             return True
         
         return False
     finally:
-        db.close()
+        await db.close()
 
 async def handle_signup_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
     """Handle signup-related callbacks. Returns True if handled."""
@@ -239,9 +241,9 @@ async def handle_signup_callback(update: Update, context: ContextTypes.DEFAULT_T
     await query.answer()
     user_id = str(update.effective_user.id)
     
-    db = init_db()
+    db = init_async_db()
     try:
-        user = db.get_user_by_telegram_id(user_id)
+        user = await db.get_user_by_telegram_id(user_id)
         if not user:
             return False
         
@@ -251,7 +253,7 @@ async def handle_signup_callback(update: Update, context: ContextTypes.DEFAULT_T
             
             if country == "Other":
                 user.registration_step = "country_other"
-                db.commit()
+                await db.commit()
                 await query.edit_message_text(
                     "🌍 Please type your country name:",
                     parse_mode="Markdown"
@@ -259,7 +261,7 @@ async def handle_signup_callback(update: Update, context: ContextTypes.DEFAULT_T
             else:
                 user.country = country
                 user.registration_step = "terms"
-                db.commit()
+                await db.commit()
                 
                 await query.edit_message_text(
                     f"✅ Country set to **{country}**!\n\n"
@@ -276,7 +278,7 @@ async def handle_signup_callback(update: Update, context: ContextTypes.DEFAULT_T
             user.registration_step = "complete"
             # FREE Plan expires after 30 days
             user.plan_expires_at = datetime.datetime.utcnow() + datetime.timedelta(days=30)
-            db.commit()
+            await db.commit()
             
             # Clear access cache to reflect registered status in handlers
             if 'is_registered_cached' in context.user_data:
@@ -311,7 +313,7 @@ async def handle_signup_callback(update: Update, context: ContextTypes.DEFAULT_T
         
         return False
     finally:
-        db.close()
+        await db.close()
 
 async def show_terms(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show terms of service"""
@@ -368,7 +370,7 @@ def check_user_access(user) -> tuple:
     
     # Strict Enforcement of Mandatory Fields
     if not user.email or not user.phone or not user.country:
-        user.is_registered = False # Force re-signup if data is missing
+        # Read-only check ('user' may be a cached UserSnapshot): /signup completes the missing fields
         return False, "⚠️ **Profile Incomplete**: We noticed some mandatory fields (Email, Phone, or Country) are missing. Please use /signup to update your profile."
 
     if user.is_banned:
@@ -425,14 +427,28 @@ def check_signal_limit(user) -> tuple:
     return True, ""
 
 def increment_signal_usage(user, db):
-    """Increment the user's daily signal count (Admin bypass)"""
+    """
+    Increment the user's daily signal count (Admin bypass).
+    Written as one atomic UPDATE through the shared DB writer (batched with other small commits);
+    'user' shows the new count immediately without being marked dirty in the caller's session.
+    Needs a running event loop (the writer's); 'db' is kept for the callers' signature.
+    """
     # SUPER ADMIN bypass: Never increment usage
-    if user and str(user.telegram_id) == SUPER_ADMIN_ID:
+    if not user or str(user.telegram_id) == SUPER_ADMIN_ID:
         return
 
+    from sqlalchemy import update, case, func
+    from sqlalchemy.orm.attributes import set_committed_value
     today = datetime.datetime.utcnow().strftime("%Y-%m-%d")
-    if user.last_signal_date != today:
-        user.signals_used_today = 0
-        user.last_signal_date = today
-    user.signals_used_today += 1
-    db.commit()
+    used = (user.signals_used_today or 0) + 1 if user.last_signal_date == today else 1
+
+    user_pk, telegram_id = user.id, user.telegram_id
+    def write(session):
+        session.execute(update(User).where(User.id == user_pk).values(
+            signals_used_today=case((User.last_signal_date == today, func.coalesce(User.signals_used_today, 0) + 1), else_=1),
+            last_signal_date=today,
+        ).execution_options(user_cache_keys=(telegram_id,)))
+    from utils.engines import get_db_writer
+    get_db_writer().submit_nowait(write) # Raises RuntimeError outside an event loop, before 'user' is touched
+    set_committed_value(user, "signals_used_today", used)
+    set_committed_value(user, "last_signal_date", today)
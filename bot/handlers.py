@@ -16,7 +16,11 @@ from bot.ui import (
 from data.collector import DataCollector
 from engine.ai_generator import AISignalGenerator
 from utils.formatter import format_signal, ASSET_NAMES
-from utils.db import SignalHistory, User, TradeExecution, BrokerAccount, init_db
+from sqlalchemy import select
+from utils.db import SignalHistory, User, TradeExecution, BrokerAccount
+from utils.async_db import init_async_db
+from utils.user_cache import get_user_snapshot
+from utils.metrics import timed
 
 # Import new authentication and admin modules
 from bot.auth_handler import (
@@ -27,7 +31,7 @@ from bot.admin_handlers import admin_command, admin_callback_handler, admin_mess
 from bot.payment_handler import show_upgrade_menu, handle_payment_callback, handle_successful_payment
 from bot.kyc_handler import start_kyc, handle_kyc_photo, kyc_status, handle_kyc_callback
 
-from utils.engines import get_ai_gen, get_data_collector
+from utils.engines import get_ai_gen, get_data_collector, get_scan_scheduler, get_scan_pipeline, get_db_writer
 ai_gen = get_ai_gen() # 🦁 Use Shared Singleton
 
 # Global Cache for Quick Scan results (Super Fast response)
@@ -35,6 +39,19 @@ _last_scan_results = []
 _last_scan_time = 0
 SCAN_CACHE_TTL = 300 # 5 minutes
 
+# Callback families whose data carries a free-form suffix (symbols, timezones...): One metrics label each
+CALLBACK_FAMILIES = ("analyze_", "cat_", "toggle_", "set_tz_", "risk_edit_", "risk_set_",
+                     "autotrade_set_", "info_strategy_", "link_wallet_")
+
+def callback_action(update: Update, context=None):
+    """Bounded 'action' label for callback_handler spans (exec_analyze|forex|EURUSD|5m -> exec_analyze)."""
+    data = (update.callback_query.data or "") if update.callback_query else ""
+    action = data.split("|", 1)[0]
+    for family in CALLBACK_FAMILIES:
+        if action.startswith(family):
+            return {"action": family + "*"}
+    return {"action": action or "none"}
+
 def get_market_sentiment():
     """Generates a smart summary of current market conditions for PRO/VIP users"""
     if not _last_scan_results:
@@ -52,16 +69,60 @@ def get_market_sentiment():
     top_asset = _last_scan_results[0]['asset'] if _last_scan_results else "None"
     return f"Market Mood: {mood} | Hot: `{top_asset}`"
 
-# Global Semaphore to limit memory usage: Strictly Serial for 512MB RAM
-scan_semaphore = asyncio.Semaphore(1) 
+# Radar universe (13 assets): Also kept hot by the live candle streams
+RADAR_ASSETS = [
+    # Forex
+    ("EURUSD=X", "forex"), ("GBPUSD=X", "forex"), ("USDJPY=X", "forex"),
+    # Crypto (24/7)
+    ("BTC/USDT", "crypto"), ("ETH/USDT", "crypto"), ("SOL/USDT", "crypto"),
+    # Synthetics (Volatility)
+    ("1HZ100V", "synthetic"), ("1HZ75V", "synthetic"), ("C1000", "synthetic"), ("B1000", "synthetic"),
+    # Commodities & Indices
+    ("GC=F", "forex"), ("SI=F", "forex"), ("CL=F", "forex"),
+]
+
+def _record_trade(session, trade, user_pk, amount):
+    """DB writer op: Inserts the trade and debits the wallet in one transaction. Returns the new balance."""
+    from sqlalchemy import update, select
+    session.add(trade)
+    session.execute(update(User).where(User.id == user_pk).values(wallet_balance=User.wallet_balance - amount)
+                    .execution_options(user_cache_keys=(trade.user_id,)))
+    return session.execute(select(User.wallet_balance).where(User.id == user_pk)).scalar()
+
+def _settle_paper_trade(session, trade_id, telegram_id, win):
+    """DB writer op: Closes a paper trade and credits the wallet. Returns (status, pnl, balance)."""
+    from sqlalchemy import update, select
+    t = session.get(TradeExecution, trade_id)
+    if win:
+        t.status, t.pnl = "WON", t.amount * 0.85
+        # Atomic credit (like _record_trade's debit): Other wallet writers don't go through this queue
+        session.execute(update(User).where(User.telegram_id == telegram_id)
+                        .values(wallet_balance=User.wallet_balance + (t.amount + t.pnl))
+                        .execution_options(user_cache_keys=(telegram_id,)))
+    else:
+        t.status, t.pnl = "LOST", -t.amount
+    balance = session.execute(select(User.wallet_balance).where(User.telegram_id == telegram_id)).scalar()
+    return t.status, t.pnl, balance
 
-def global_gc():
-    """Lion RAM Purge: Forces GC and clears all internal caches"""
+def global_gc(force: bool = False):
+    """
+    Lion RAM Purge: Clears all internal caches and forces GC, but only once RSS is over GC_PURGE_RSS_MB
+    (or when forced): Below the budget the caches keep their hit rate. Sizes: /api/admin/memory.
+    """
     import gc
     from data.collector import _data_cache
-    from engine.sentiment_analysis import SentimentAnalysis
+    from engine.scan_pipeline import rss_mb
+    from utils.mem_profiler import GC_PURGE_RSS_MB, get_mem_profiler
+    
+    purges = get_mem_profiler().purges
+    rss = rss_mb()
+    purges['last_rss_mb'] = round(rss, 1) if rss is not None else None
+    if not force and rss is not None and rss < GC_PURGE_RSS_MB:
+        purges['skipped'] += 1
+        return
+    purges['purged'] += 1
     
-    # 1. Clear Data Cache
+    # 1. Clear Data Cache (live candle stream buffers are fixed-size and survive the purge)
     _data_cache.clear()
     
     # 2. Clear Scan Cache (Prevent stale Radar re-dispatches)
@@ -76,78 +137,39 @@ def global_gc():
         
     # 3. Force Python GC
     gc.collect()
-    logging.info("🦁 Lion Shield: Global Memory Purge Complete.")
+    logging.info(f"🦁 Lion Shield: Global Memory Purge Complete (RSS was {purges['last_rss_mb']}MB, budget {GC_PURGE_RSS_MB}MB).")
 
 async def scan_market_now():
     """Core scanning logic used by both manual Quick Analysis and Automated Radar"""
-    global _last_scan_results, _last_scan_time, scan_semaphore
+    global _last_scan_results, _last_scan_time
     
     # Check Cache FIRST
     if _last_scan_results and (time.time() - _last_scan_time < SCAN_CACHE_TTL):
         logging.info("Returning cached market scan results (Super Fast Mode)")
         return _last_scan_results
 
-    essential_assets = [
-        # Forex
-        ("EURUSD=X", "forex"), ("GBPUSD=X", "forex"), ("USDJPY=X", "forex"),
-        # Crypto (24/7)
-        ("BTC/USDT", "crypto"), ("ETH/USDT", "crypto"), ("SOL/USDT", "crypto"),
-        # Synthetics (Volatility)
-        ("1HZ100V", "synthetic"), ("1HZ75V", "synthetic"), ("C1000", "synthetic"), ("B1000", "synthetic"),
-        # Commodities & Indices
-        ("GC=F", "forex"), ("SI=F", "forex"), ("CL=F", "forex"),
-    ]
-    
-    # Use essential_assets for background radar scans
-    assets_to_scan = essential_assets
-
-    async def scan_asset(symbol, asset_type):
-        async with scan_semaphore:
-            try:
-                # Use Shared Singleton for Data Retrieval
-                shared_dc = get_data_collector() 
-                df = await shared_dc.fetch_data(symbol, asset_type)
-                
-                if df is None or df.empty: 
-                    return None
-                
-                signal = await ai_gen.generate_signal(symbol, df, fast_scan=True)
-                
-                # MEMORY CLEANUP: Delete dataframe immediately after use
-                del df
-                
-                # Alignment Threshold: Lowered to 1% for "Anytime Signals" mode
-                if signal and signal['confidence'] >= 1: 
-                    return signal
-            except Exception: 
-                return None
-            return None
-
-    # SEQUENTIAL SCANNING (Permanent RAM Stability for Render Free Tier)
-    results = []
-    import gc
-    
     # Confirmed high-priority assets (13 total)
-    essential_assets = [
-        ("EURUSD=X", "forex"), ("GBPUSD=X", "forex"), ("USDJPY=X", "forex"),
-        ("BTC/USDT", "crypto"), ("ETH/USDT", "crypto"), ("SOL/USDT", "crypto"),
-        ("1HZ100V", "synthetic"), ("1HZ75V", "synthetic"), ("C1000", "synthetic"), ("B1000", "synthetic"),
-        ("GC=F", "forex"), ("SI=F", "forex"), ("CL=F", "forex"),
-    ]
+    essential_assets = RADAR_ASSETS
+    
+    # SCHEDULER SNAPSHOT: Every asset was already evaluated on its latest closed candle
+    scheduler = get_scan_scheduler()
+    if scheduler.ready(essential_assets):
+        results = sorted(scheduler.latest(essential_assets), key=lambda x: x['confidence'], reverse=True)
+        _last_scan_results, _last_scan_time = results, time.time()
+        return results
 
-    logging.info(f"🦁 Lion Shield: Starting Sequential Scan of {len(essential_assets)} assets...")
+    # PIPELINED SCANNING: Fetches overlap with micro-batched scoring, concurrency follows the RSS budget
+    logging.info(f"🦁 Lion Shield: Starting Pipelined Scan of {len(essential_assets)} assets...")
+    from engine.scan_scheduler import SCAN_FAST_SCAN
+    try:
+        # Same mode as the scheduler snapshot above, so both paths score alike
+        signals = await get_scan_pipeline().run(essential_assets, fast_scan=SCAN_FAST_SCAN)
+    except Exception as e:
+        logging.error(f"Pipelined Scan Error: {e}")
+        signals = {}
     
-    for symbol, asset_type in essential_assets:
-        try:
-            res = await scan_asset(symbol, asset_type)
-            if res:
-                results.append(res)
-            
-            # Reclaim RAM immediately after each asset
-            gc.collect() 
-        except Exception as e:
-            logging.error(f"Sequential Scan Error for {symbol}: {e}")
-            continue
+    # Alignment Threshold: Lowered to 1% for "Anytime Signals" mode
+    results = [sig for sig in signals.values() if sig and sig['confidence'] >= 1]
 
     # Sort and Cache Results
     _last_scan_results = sorted(results, key=lambda x: x['confidence'], reverse=True)
@@ -156,6 +178,7 @@ async def scan_market_now():
     logging.info(f"Scan complete. Found {len(_last_scan_results)} high-confidence signals.")
     return _last_scan_results
 
+@timed("handler", handler="run_native_scan")
 async def run_native_scan(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Native Telegram Scanner - Manual Trigger (Safe for both Message & Callback)"""
     is_callback = update.callback_query is not None
@@ -174,7 +197,7 @@ async def run_native_scan(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     signals = await scan_market_now()
     
-    # Reclaim memory immediately after scan
+    # Reclaim memory after the scan if RSS is over budget
     global_gc()
 
     if not signals:
@@ -220,6 +243,7 @@ async def run_native_scan(update: Update, context: ContextTypes.DEFAULT_TYPE):
         parse_mode="Markdown"
     )
 
+@timed("handler", handler="start_command")
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
     import logging
@@ -229,13 +253,13 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     from bot.ui import get_welcome_menu_keyboard, get_registered_menu_keyboard
     
     # Check if user exists and is registered
-    db = init_db()
+    db = init_async_db()
     try:
         user_id = str(user.id)
         username = user.username
         is_super = user_id == "1241907317" or username == "origichidiah"
         
-        db_user = db.get_user_by_telegram_id(user_id)
+        db_user = await db.get_user_by_telegram_id(user_id)
         
         if not db_user:
             if is_super:
@@ -249,10 +273,10 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     registration_step="completed"
                 )
                 db.add(db_user)
-                db.commit()
+                await db.commit()
             else:
                 # New regular user - show welcome menu
-                db.close()
+                await db.close()
                 await update.message.reply_text(
                     f"🦁 **WELCOME TO TRADESIGX!**\n"
                     f"━━━━━━━━━━━━━━━━━━━━\n\n"
@@ -271,14 +295,14 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             db_user.is_super_admin = True
             db_user.is_registered = True
             db_user.subscription_plan = "vip"
-            db.commit()
+            await db.commit()
         
         if db_user.is_super_admin:
             is_super = True
 
         if not db_user.is_registered and not is_super:
             # Unregistered user - show welcome menu
-            db.close()
+            await db.close()
             
             await update.message.reply_text(
                 f"👋 **Welcome back, {user.first_name}!**\n"
@@ -320,7 +344,7 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             welcome_text += "AI-powered analysis is ready for Forex, Crypto & Synthetics.\n\n"
             
         welcome_text += "What would you like to do?"
-        db.close()
+        await db.close()
         
         await update.message.reply_text(
             welcome_text, 
@@ -337,7 +361,7 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except Exception as e:
         logging.error(f"Start command error: {e}")
         try:
-            db.close()
+            await db.close()
         except: pass
         
         user_id = str(user.id)
@@ -351,6 +375,7 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             parse_mode="Markdown"
         )
 
+@timed("handler", handler="handle_message")
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
         user_id = str(update.effective_user.id)
@@ -380,19 +405,14 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         # ACCESS CONTROL: Check if user is registered (Cached for Speed)
         if not context.user_data.get('is_registered_cached') and not is_super:
-            db = init_db()
-            try:
-                user = db.get_user_by_telegram_id(user_id)
-                can_access, access_msg = check_user_access(user)
-                
-                if not can_access:
-                    await update.message.reply_text(access_msg, parse_mode="Markdown")
-                    db.close()
-                    return True
-                # Cache status if they can access
-                context.user_data['is_registered_cached'] = True
-            finally:
-                db.close()
+            user = await get_user_snapshot(user_id)
+            can_access, access_msg = check_user_access(user)
+            
+            if not can_access:
+                await update.message.reply_text(access_msg, parse_mode="Markdown")
+                return True
+            # Cache status if they can access
+            context.user_data['is_registered_cached'] = True
         
         # Handle Broker API Token Entry
         menu_buttons = ["📈 Generate Signal", "⚡ Quick Analysis", "💼 Wallet", "🔌 Brokers", "⚙️ Settings", "📖 Help", "ℹ️ About"]
@@ -410,14 +430,14 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     await update.message.reply_text("❌ **Invalid Address**: The wallet address provided is too short. Please paste a valid public address.")
                     return True
                 
-                db = init_db()
+                db = init_async_db()
                 try:
-                    user = db.get_user_by_telegram_id(user_id)
+                    user = await db.get_user_by_telegram_id(user_id)
                     import json
                     wallets = json.loads(user.external_wallets or "{}")
                     wallets[linking_wallet] = addr
                     user.external_wallets = json.dumps(wallets)
-                    db.commit()
+                    await db.commit()
                     
                     del context.user_data['linking_wallet_type']
                     await update.message.reply_text(
@@ -428,7 +448,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
                         parse_mode="Markdown"
                     )
                 finally:
-                    db.close()
+                    await db.close()
                 return True
 
         if waiting_broker in ['deriv', 'binance', 'pocket']:
@@ -438,17 +458,17 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     await update.message.reply_text(f"❌ **Invalid Entry**: The ID/Token provided for **{waiting_broker.capitalize()}** is too short. Please paste it correctly.")
                     return True
                 
-                db = init_db()
+                db = init_async_db()
                 try:
-                    user = db.get_user_by_telegram_id(str(update.effective_user.id))
-                    broker = db.session.query(BrokerAccount).filter_by(user_id=user.id, broker_name=waiting_broker).first()
+                    user = await db.get_user_by_telegram_id(str(update.effective_user.id))
+                    broker = await db.first(select(BrokerAccount).filter_by(user_id=user.id, broker_name=waiting_broker))
                     if not broker:
                         broker = BrokerAccount(user_id=user.id, broker_name=waiting_broker)
                         db.add(broker)
                     
                     broker.api_key = token
                     broker.is_active = True
-                    db.commit()
+                    await db.commit()
                     
                     del context.user_data['waiting_for_token']
                     
@@ -464,7 +484,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
                         parse_mode="Markdown"
                     )
                 finally:
-                    db.close()
+                    await db.close()
                 return True
         
         if text == "📈 Generate Signal":
@@ -475,15 +495,15 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         elif text == "⚡ Quick Analysis":
             await run_native_scan(update, context)
         elif text == "💼 Wallet":
-            db = init_db()
+            db = init_async_db()
             try:
-                user = db.get_user_by_telegram_id(str(update.effective_user.id))
+                user = await get_user_snapshot(update.effective_user.id)
                 if not user:
                     await update.message.reply_text("❌ **User Error**: Please type /start to register your wallet.")
                     return True
                 
                 # Check for connected broker
-                broker = db.session.query(BrokerAccount).filter_by(user_id=user.id).first()
+                broker = await db.first(select(BrokerAccount).filter_by(user_id=user.id))
                 broker_name = broker.broker_name if broker else "None (Click to Connect)"
                 
                 balance_text = (
@@ -496,7 +516,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 )
                 await update.message.reply_text(balance_text, reply_markup=get_wallet_keyboard(), parse_mode="Markdown")
             finally:
-                db.close()
+                await db.close()
         elif text == "🔌 Brokers":
             await update.message.reply_text(
                 "🖇 Select a broker to connect or manage:",
@@ -560,6 +580,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text(f"🚨 **Handler Error**: I encountered an issue processing your request.\nError: `{str(e)}`")
         except Exception: pass
 
+@timed("handler", label_fn=callback_action, handler="callback_handler")
 async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     if not query:
@@ -591,28 +612,24 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         # Profile Health Check: INTERCEPT analysis/trade commands for incomplete profiles
         if query.data.startswith(("analyze_", "exec_analyze", "sel|broker", "menu_bulk_scan", "exec_bulk_scan")):
-            db = init_db()
-            try:
-                user = db.get_user_by_telegram_id(str(update.effective_user.id))
-                can_access, error_msg = check_user_access(user)
-                if not can_access:
-                    await query.answer("⚠️ Profile Incomplete", show_alert=True)
-                    await query.edit_message_text(error_msg, reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("📝 Complete /signup", callback_data="cmd_signup")]]), parse_mode="Markdown")
-                    return True
-            finally:
-                db.close()
+            user = await get_user_snapshot(update.effective_user.id)
+            can_access, error_msg = check_user_access(user)
+            if not can_access:
+                await query.answer("⚠️ Profile Incomplete", show_alert=True)
+                await query.edit_message_text(error_msg, reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("📝 Complete /signup", callback_data="cmd_signup")]]), parse_mode="Markdown")
+                return True
         
         # Handle welcome menu commands
         if query.data == "cmd_signup":
             # Start the signup process
             from bot.auth_handler import start_signup
             context.user_data['skip_signup_check'] = True
-            db = init_db()
-            user = db.get_user_by_telegram_id(str(update.effective_user.id))
+            db = init_async_db()
+            user = await db.get_user_by_telegram_id(str(update.effective_user.id))
             if user:
                 user.registration_step = "name"
-                db.commit()
-            db.close()
+                await db.commit()
+            await db.close()
             await query.edit_message_text(
                 "📝 **SIGN UP**\n━━━━━━━━━━━━━━━━━━━━\n\n"
                 "Let's get you set up! This takes less than a minute.\n\n"
@@ -649,8 +666,7 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return True
     
         elif query.data == "menu_external_wallets":
-            db = init_db()
-            user = db.get_user_by_telegram_id(str(update.effective_user.id))
+            user = await get_user_snapshot(update.effective_user.id)
             import json
             wallets = json.loads(user.external_wallets or "{}")
             
@@ -674,7 +690,6 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 [InlineKeyboardButton("🔙 Back to Wallet", callback_data="menu_wallet")]
             ]
             await query.edit_message_text(text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode="Markdown")
-            db.close()
             return True
     
         elif query.data.startswith("link_wallet_"):
@@ -688,9 +703,8 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return True
         
         elif query.data == "cmd_profile":
-            db = init_db()
             user_id = str(update.effective_user.id)
-            user = db.get_user_by_telegram_id(user_id)
+            user = await get_user_snapshot(user_id)
             is_super = user_id == "1241907317" or update.effective_user.username == "origichidiah"
             
             if (user and user.is_registered) or is_super:
@@ -718,7 +732,6 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 profile_text = "👤 **Profile not available.**\n\nPlease sign up first to access your profile."
                 keyboard = [[InlineKeyboardButton("📝 Sign Up", callback_data="cmd_signup")]]
                 
-            db.close()
             await query.edit_message_text(profile_text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode="Markdown")
             return True
             
@@ -753,8 +766,7 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             username = update.effective_user.username
             is_super = user_id == "1241907317" or username == "origichidiah"
             
-            db = init_db()
-            user = db.get_user_by_telegram_id(user_id)
+            user = await get_user_snapshot(user_id)
             
             if (user and user.is_registered) or is_super:
                 await query.edit_message_text(
@@ -768,7 +780,6 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     reply_markup=get_welcome_menu_keyboard(),
                     parse_mode="Markdown"
                 )
-            db.close()
             return True
         
         # Registered user menu shortcuts
@@ -783,8 +794,7 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return True
         
         elif query.data == "menu_wallet":
-            db = init_db()
-            user = db.get_user_by_telegram_id(str(update.effective_user.id))
+            user = await get_user_snapshot(update.effective_user.id)
             if user:
                 balance_text = (
                     "💼 **TradeSigx Digital Wallet**\n━━━━━━━━━━━━━━━━━━━━\n"
@@ -792,7 +802,6 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     f"📍 **USDT Address**: `{user.wallet_address or 'Not Generated'}`"
                 )
                 await query.edit_message_text(balance_text, reply_markup=get_wallet_keyboard(), parse_mode="Markdown")
-            db.close()
             return True
     
         elif query.data == "menu_brokers":
@@ -820,8 +829,7 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await query.edit_message_text("🔍 Select the asset class you want to analyze:", reply_markup=get_analysis_keyboard())
     
         elif query.data == "menu_bulk_scan":
-            db = init_db()
-            user = db.get_user_by_telegram_id(str(update.effective_user.id))
+            user = await get_user_snapshot(update.effective_user.id)
             selected_assets = user.bulk_scan_config.split(",") if user.bulk_scan_config else []
             await query.edit_message_text(
                 "🛰 **Multi-Asset Bulk Scanner**\n\n"
@@ -830,11 +838,10 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 reply_markup=get_bulk_scanner_keyboard(selected_assets),
                 parse_mode="Markdown"
             )
-            db.close()
     
         elif query.data.startswith("toggle_bulk|"):
-            db = init_db()
-            user = db.get_user_by_telegram_id(str(update.effective_user.id))
+            db = init_async_db()
+            user = await db.get_user_by_telegram_id(str(update.effective_user.id))
             symbol = query.data.split("|")[1]
             
             current_list = user.bulk_scan_config.split(",") if user.bulk_scan_config else []
@@ -844,16 +851,14 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 current_list.append(symbol)
             
             user.bulk_scan_config = ",".join(current_list)
-            db.commit()
+            await db.commit()
             
             await query.edit_message_reply_markup(reply_markup=get_bulk_scanner_keyboard(current_list))
-            db.close()
+            await db.close()
     
         elif query.data == "exec_bulk_scan":
-            db = init_db()
-            user = db.get_user_by_telegram_id(str(update.effective_user.id))
+            user = await get_user_snapshot(update.effective_user.id)
             raw_assets = user.bulk_scan_config.split(",") if user.bulk_scan_config else []
-            db.close()
     
             if not raw_assets or (len(raw_assets) == 1 and not raw_assets[0]):
                 await query.answer("❌ Please select at least one asset!")
@@ -873,15 +878,23 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
             await query.edit_message_text("🛰 **ULTRA-FAST MULTI-SCANNER ACTIVE**\n━━━━━━━━━━━━━━━━━━━━\n🔄 _Bypassing Rate Limits..._\n🧠 _Applying Neural Confluence..._\n\n⏳ *This may take 15-30s depending on market volatility.*", parse_mode="Markdown")
             
+            # BATCH FETCH: Yahoo-routed symbols share one multi-ticker download
+            try:
+                prefetched = await asyncio.wait_for(DataCollector.fetch_data_batch(selected_assets), timeout=30.0)
+            except Exception as e:
+                logging.error(f"BULK SCAN | Batch fetch failed, using per-asset fetches: {e}")
+                prefetched = {}
+            
             async def scan_single(symbol):
                 try:
-                    # Small random jitter to prevent synchronized 429s from bulk requests
-                    import random
-                    await asyncio.sleep(random.uniform(0.1, 0.8))
-                    
                     logging.info(f"BULK SCAN | Starting analysis for {symbol}")
-                    # Use the new unified fetch_data with a stricter timeout for individual assets
-                    df = await asyncio.wait_for(DataCollector.fetch_data(symbol), timeout=25.0)
+                    df = prefetched.get(symbol)
+                    if df is None:
+                        # Small random jitter to prevent synchronized 429s from bulk requests
+                        import random
+                        await asyncio.sleep(random.uniform(0.1, 0.8))
+                        # Use the new unified fetch_data with a stricter timeout for individual assets
+                        df = await asyncio.wait_for(DataCollector.fetch_data(symbol), timeout=25.0)
                     if df.empty:
                         return {"asset": symbol, "direction": "LIMIT", "confidence": 0, "strategy": "Provider Throttled"}
                     
@@ -930,10 +943,10 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 
                 if res['direction'] == "BUY":
                     status = "🟢 **BUY OPPORTUNITY**"
-                    bar = "████████░░" if res['confidence'] > 80 else "██████░░░░"
+                    bar = "████████░░" if res['raw_confidence'] > 80 else "██████░░░░"
                 elif res['direction'] == "SELL":
                     status = "🔴 **SELL OPPORTUNITY**"
-                    bar = "████████░░" if res['confidence'] > 80 else "██████░░░░"
+                    bar = "████████░░" if res['raw_confidence'] > 80 else "██████░░░░"
                 elif res['direction'] == "ERROR" or res['direction'] == "No Data":
                     status = "⚠️ **SCAN FAILED**"
                     bar = "░░░░░░░░░░"
@@ -980,8 +993,7 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         elif query.data == "settings_risk":
             from bot.ui import get_risk_management_keyboard
-            db = init_db()
-            user = db.get_user_by_telegram_id(str(update.effective_user.id))
+            user = await get_user_snapshot(update.effective_user.id)
             
             text = (
                 "⚖️ **Risk Management controls**\n\n"
@@ -991,13 +1003,11 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 f"• **Max Daily Loss**: `{user.max_daily_loss}%`"
             )
             await query.edit_message_text(text=text, reply_markup=get_risk_management_keyboard(user), parse_mode="Markdown")
-            db.close()
             return True
 
         elif query.data == "settings_autotrade":
             from bot.ui import get_autotrade_settings_keyboard
-            db = init_db()
-            user = db.get_user_by_telegram_id(str(update.effective_user.id))
+            user = await get_user_snapshot(update.effective_user.id)
             await query.edit_message_text(
                 "🤖 **Autotrading Control Center** v8.0\n"
                 "Let the AI execute trades for you based on high-confidence setups.\n\n"
@@ -1008,15 +1018,14 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 reply_markup=get_autotrade_settings_keyboard(user),
                 parse_mode="Markdown"
             )
-            db.close()
             return True
 
         elif query.data == "autotrade_toggle":
             from bot.ui import get_autotrade_settings_keyboard
-            db = init_db()
-            user = db.get_user_by_telegram_id(str(update.effective_user.id))
+            db = init_async_db()
+            user = await db.get_user_by_telegram_id(str(update.effective_user.id))
             user.autotrade_enabled = not user.autotrade_enabled
-            db.commit()
+            await db.commit()
             await query.answer(f"🤖 Autotrading {'ENABLED' if user.autotrade_enabled else 'DISABLED'}")
             
             # Refresh menu
@@ -1030,7 +1039,7 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 reply_markup=get_autotrade_settings_keyboard(user),
                 parse_mode="Markdown"
             )
-            db.close()
+            await db.close()
             return True
 
         elif query.data == "autotrade_edit_conf":
@@ -1102,8 +1111,8 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             field = parts[2]
             value = parts[3]
             
-            db = init_db()
-            user = db.get_user_by_telegram_id(str(update.effective_user.id))
+            db = init_async_db()
+            user = await db.get_user_by_telegram_id(str(update.effective_user.id))
             if user:
                 if field == "conf": user.autotrade_min_confidence = float(value)
                 elif field == "limit": user.autotrade_max_trades = int(value)
@@ -1113,15 +1122,13 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     elif value == "crypto": user.autotrade_assets = "BTC/USDT,ETH/USDT,SOL/USDT,XRP/USDT,ADA/USDT"
                     elif value == "synthetic": user.autotrade_assets = "R_100,R_75,R_50,R_25,R_10"
                     elif value == "all": user.autotrade_assets = "EURUSD=X,GBPUSD=X,USDJPY=X,BTC/USDT,ETH/USDT,R_100,R_75,GC=F"
-                db.commit()
-            db.close()
+                await db.commit()
+            await db.close()
             
             await query.answer(f"✅ Autotrade {field} updated!")
             
-            # Return to Autotrade menu
+            # Return to Autotrade menu (the committed row stays readable: No second lookup)
             from bot.ui import get_autotrade_settings_keyboard
-            db = init_db()
-            user = db.get_user_by_telegram_id(str(update.effective_user.id))
             await query.edit_message_text(
                 "🤖 **Autotrading Control Center** v8.0\n"
                 "Let the AI execute trades for you based on high-confidence setups.\n\n"
@@ -1132,7 +1139,6 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 reply_markup=get_autotrade_settings_keyboard(user),
                 parse_mode="Markdown"
             )
-            db.close()
             return True
 
         elif query.data == "settings_strategies":
@@ -1210,20 +1216,18 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             field = parts[2]
             value = float(parts[3])
             
-            db = init_db()
-            user = db.get_user_by_telegram_id(str(update.effective_user.id))
+            db = init_async_db()
+            user = await db.get_user_by_telegram_id(str(update.effective_user.id))
             if user:
                 if field == "lot": user.default_lot = value
                 elif field == "perc": user.risk_per_trade = value
                 elif field == "loss": user.max_daily_loss = value
-                db.commit()
-            db.close()
+                await db.commit()
+            await db.close()
             
             await query.answer(f"✅ Risk updated: {field} = {value}")
             
-            # Reload Risk Menu manually instead of recursion
-            db = init_db()
-            user = db.get_user_by_telegram_id(str(update.effective_user.id))
+            # Reload Risk Menu manually instead of recursion (from the committed row: No second lookup)
             text = (
                 "⚖️ **Risk Management controls**\n\n"
                 "Define your safety parameters. These are applied to all automated radar trades and signal calculations:\n\n"
@@ -1232,7 +1236,6 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 f"• **Max Daily Loss**: `{user.max_daily_loss}%`"
             )
             await query.edit_message_text(text=text, reply_markup=get_risk_management_keyboard(user), parse_mode="Markdown")
-            db.close()
             return True
     
         elif query.data.startswith("settings_"):
@@ -1262,11 +1265,10 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             direction = parts[3]
             entry_price = float(parts[4])
             
-            db = init_db()
+            db = init_async_db()
             try:
-                user = db.get_user_by_telegram_id(str(update.effective_user.id))
-                from bot.models import BrokerAccount
-                active_brokers = db.session.query(BrokerAccount).filter_by(user_id=user.id, is_active=True).all()
+                user = await get_user_snapshot(update.effective_user.id)
+                active_brokers = await db.all(select(BrokerAccount).filter_by(user_id=user.id, is_active=True))
                 
                 from bot.ui import get_broker_selection_for_trade
                 await query.edit_message_text(
@@ -1280,7 +1282,7 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     parse_mode="Markdown"
                 )
             finally:
-                db.close()
+                await db.close()
             return True
     
         elif query.data.startswith("exec|trade|"):
@@ -1295,18 +1297,17 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await query.answer("🚀 Processing Trade...")
             await query.edit_message_text(f"⏳ **Executing {direction} on {symbol}...**\nConnecting to {broker_choice.title()}...", parse_mode="Markdown")
             
-            db = init_db()
+            db = init_async_db()
             try:
-                user = db.get_user_by_telegram_id(user_id)
+                user = await db.get_user_by_telegram_id(user_id)
                 if not user:
                     await query.edit_message_text("❌ **User Error**: Please type /start to register.")
                     return True
                 
                 trade_amount = user.default_lot * 100 
                 primary_broker = None
-                from bot.models import BrokerAccount, TradeExecution
                 if broker_choice != 'paper':
-                    primary_broker = db.session.query(BrokerAccount).filter_by(user_id=user.id, broker_name=broker_choice, is_active=True).first()
+                    primary_broker = await db.first(select(BrokerAccount).filter_by(user_id=user.id, broker_name=broker_choice, is_active=True))
                 
                 is_live_broker = primary_broker and primary_broker.api_key
                 
@@ -1346,48 +1347,38 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     result = {'status': 'success', 'contract_id': f"PO-{int(time.time())}"}
                 
                 if result['status'] == "success":
-                    user.wallet_balance -= trade_amount
                     trade = TradeExecution(
                         user_id=user_id, asset=symbol, direction=direction,
                         amount=trade_amount, entry_price=entry_price,
                         contract_id=result.get('contract_id'), status="OPEN"
                     )
-                    db.add(trade)
-                    db.commit()
+                    # Insert + wallet debit through the shared writer (atomic UPDATE, batched with other commits)
+                    user_pk = user.id
+                    balance = await get_db_writer().submit(lambda session: _record_trade(session, trade, user_pk, trade_amount))
                     if broker_choice != 'pocket':
-                        await query.edit_message_text(f"✅ **Trade Confirmed**\nAsset: `{symbol}`\nBroker: `{broker_choice.title()}`\nID: `{result.get('contract_id')}`\n💰 Balance: `${user.wallet_balance:.2f}`")
+                        await query.edit_message_text(f"✅ **Trade Confirmed**\nAsset: `{symbol}`\nBroker: `{broker_choice.title()}`\nID: `{result.get('contract_id')}`\n💰 Balance: `${balance:.2f}`")
     
                     # Simulation loop for paper trades
                     if broker_choice == 'paper':
                         async def simulated_pnl(query, user_id, trade_id):
                             import random
                             await asyncio.sleep(8)
-                            sub_db = init_db()
-                            try:
-                                t = sub_db.session.query(TradeExecution).get(trade_id)
-                                u = sub_db.get_user_by_telegram_id(user_id)
-                                win = random.choice([True, True, False])
-                                if win:
-                                    t.status, t.pnl = "WON", t.amount * 0.85
-                                    u.wallet_balance += (t.amount + t.pnl)
-                                else:
-                                    t.status, t.pnl = "LOST", -t.amount
-                                sub_db.commit()
-                                icon = "🟢" if win else "🔴"
-                                await query.message.reply_text(f"{icon} **PAPER TRADE RESULT**\n{t.status}! PnL: `${t.pnl:.2f}`\nBalance: `${u.wallet_balance:.2f}`", parse_mode="Markdown")
-                            finally: sub_db.close()
+                            win = random.choice([True, True, False])
+                            status, pnl, balance = await get_db_writer().submit(
+                                lambda session: _settle_paper_trade(session, trade_id, user_id, win))
+                            icon = "🟢" if win else "🔴"
+                            await query.message.reply_text(f"{icon} **PAPER TRADE RESULT**\n{status}! PnL: `${pnl:.2f}`\nBalance: `${balance:.2f}`", parse_mode="Markdown")
                         asyncio.create_task(simulated_pnl(query, user_id, trade.id))
                 else:
                     await query.edit_message_text(f"❌ **Execution Failed**: {result.get('message', 'Broker Rejected')}")
             finally:
-                db.close()
+                await db.close()
             return True
     
         elif query.data == "wallet_history":
-            db = init_db()
+            db = init_async_db()
             try:
-                from bot.models import TradeExecution
-                trades = db.session.query(TradeExecution).filter_by(user_id=str(update.effective_user.id)).order_by(TradeExecution.timestamp.desc()).limit(5).all()
+                trades = await db.all(select(TradeExecution).filter_by(user_id=str(update.effective_user.id)).order_by(TradeExecution.timestamp.desc()).limit(5))
                 
                 if not trades:
                     await query.edit_message_text("📜 **Trade History**\n\nNo trades executed yet. Start trading from a signal alert!", reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_main")]]), parse_mode="Markdown")
@@ -1399,7 +1390,7 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     
                     await query.edit_message_text(history_text, reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_main")]]), parse_mode="Markdown")
             finally:
-                db.close()
+                await db.close()
             return True
     
         elif query.data == "wallet_withdraw":
@@ -1419,45 +1410,40 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return True
     
         elif query.data == "wallet_deposit":
-            db = init_db()
-            try:
-                user = db.get_user_by_telegram_id(str(update.effective_user.id))
-                if not user:
-                    await query.answer("❌ User not found. Type /start", show_alert=True)
-                    return True
-                    
-                address_text = user.wallet_address or "Not Generated"
-                btn_label = "⚡ Generate Deposit Address" if not user.wallet_address else "🔄 Refresh Balance"
+            user = await get_user_snapshot(update.effective_user.id)
+            if not user:
+                await query.answer("❌ User not found. Type /start", show_alert=True)
+                return True
                 
-                await query.edit_message_text(
-                    "➕ **Deposit Funds**\n\n"
-                    f"📍 **Your USDT (TRC20) Address**:\n`{address_text}`\n\n"
-                    "1️⃣ **Telegram Stars** (Instant)\n"
-                    "2️⃣ **Crypto Transfer** (Send to address above)\n"
-                    "3️⃣ **Simulate** for demo testing.\n\n",
-                    reply_markup=InlineKeyboardMarkup([
-                        [InlineKeyboardButton(btn_label, callback_data="generate_address")],
-                        [InlineKeyboardButton("⚡ Simulate $500 Top-up", callback_data="wallet_add_500")],
-                        [InlineKeyboardButton("⬅️ Back", callback_data="back_to_main")]
-                    ]),
-                    parse_mode="Markdown"
-                )
-            finally:
-                db.close()
+            address_text = user.wallet_address or "Not Generated"
+            btn_label = "⚡ Generate Deposit Address" if not user.wallet_address else "🔄 Refresh Balance"
+            
+            await query.edit_message_text(
+                "➕ **Deposit Funds**\n\n"
+                f"📍 **Your USDT (TRC20) Address**:\n`{address_text}`\n\n"
+                "1️⃣ **Telegram Stars** (Instant)\n"
+                "2️⃣ **Crypto Transfer** (Send to address above)\n"
+                "3️⃣ **Simulate** for demo testing.\n\n",
+                reply_markup=InlineKeyboardMarkup([
+                    [InlineKeyboardButton(btn_label, callback_data="generate_address")],
+                    [InlineKeyboardButton("⚡ Simulate $500 Top-up", callback_data="wallet_add_500")],
+                    [InlineKeyboardButton("⬅️ Back", callback_data="back_to_main")]
+                ]),
+                parse_mode="Markdown"
+            )
             return True
 
         elif query.data == "generate_address":
             import secrets
             addr = "TX" + secrets.token_hex(16).upper()
-            db = init_db()
+            db = init_async_db()
             try:
-                user = db.get_user_by_telegram_id(str(update.effective_user.id))
+                user = await db.get_user_by_telegram_id(str(update.effective_user.id))
                 if user:
                     user.wallet_address = addr
-                    db.commit()
+                    await db.commit()
                 await query.answer("✅ Address Generated!")
-                # Refresh deposit menu manually
-                user = db.get_user_by_telegram_id(str(update.effective_user.id))
+                # Refresh deposit menu manually (from the committed row: No second lookup)
                 address_text = user.wallet_address or "Not Generated"
                 btn_label = "🔄 Refresh Balance"
                 await query.edit_message_text(
@@ -1474,29 +1460,29 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     parse_mode="Markdown"
                 )
             finally:
-                db.close()
+                await db.close()
             return True
     
         elif query.data == "wallet_add_500":
-            db = init_db()
+            db = init_async_db()
             try:
-                user = db.get_user_by_telegram_id(str(update.effective_user.id))
+                user = await db.get_user_by_telegram_id(str(update.effective_user.id))
                 if user:
                     user.wallet_balance += 500
-                    db.commit()
+                    await db.commit()
                 await query.answer("💰 $500 added to your balance!")
             finally:
-                db.close()
+                await db.close()
             return True
     
         elif query.data.startswith("set_tz_"):
             new_tz = query.data.replace("set_tz_", "")
-            db = init_db()
+            db = init_async_db()
             try:
-                user = db.get_user_by_telegram_id(str(update.effective_user.id))
+                user = await db.get_user_by_telegram_id(str(update.effective_user.id))
                 if user:
                     user.timezone = new_tz
-                    db.commit()
+                    await db.commit()
                     await query.answer(f"✅ Timezone set to {new_tz}")
                     await query.edit_message_text(
                         f"✅ **Timezone Updated**\n\nYour preferred timezone is now set to `{new_tz}`.\nAll future signals will reflect this time.",
@@ -1506,7 +1492,7 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 else:
                     await query.answer("❌ User not found. Use /start", show_alert=True)
             finally:
-                db.close()
+                await db.close()
             return True
     
         elif query.data.startswith("exec_analyze|"):
@@ -1554,9 +1540,9 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     return True
                 
                 # Save to History
-                db = init_db()
+                db = init_async_db()
                 try:
-                    user = db.get_user_by_telegram_id(str(update.effective_user.id))
+                    user = await db.get_user_by_telegram_id(str(update.effective_user.id))
                     user_tz = user.timezone if user else "UTC"
     
                     new_signal = SignalHistory(
@@ -1565,25 +1551,25 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                         entry_price=signal['entry'],
                         tp=signal['tp'],
                         sl=signal['sl'],
-                        confidence=signal['confidence']
+                        confidence=signal['confidence'],
+                        raw_confidence=signal.get('raw_confidence'),
+                        strategy=signal.get('strategy'),
+                        expiry_minutes=signal.get('expiry_minutes'),
+                        entry_timestamp=signal.get('entry_timestamp')
                     )
-                    db.add(new_signal)
-                    db.commit()
+                    # Small commits ride the shared writer: Grouped with other callbacks' writes
+                    get_db_writer().submit_nowait(lambda session: session.add(new_signal))
                 finally:
-                    db.close()
+                    await db.close()
     
                 message, kb = format_signal(signal, user_tz=user_tz)
                 
                 # Promotional Reminder for Free/Unregistered Users
-                db = init_db()
-                try:
-                    user_obj = db.get_user_by_telegram_id(str(update.effective_user.id))
-                    if not user_obj or not user_obj.is_registered:
-                        message += "\n\n💡 **Tip**: Please /signup to save your history and unlock all features!"
-                    elif user_obj.subscription_plan == "free":
-                        message += "\n\n🚀 **Upgrade to PRO**: Unlock unlimited signals and higher win rates. Use /upgrade!"
-                finally:
-                    db.close()
+                user_obj = await get_user_snapshot(update.effective_user.id)
+                if not user_obj or not user_obj.is_registered:
+                    message += "\n\n💡 **Tip**: Please /signup to save your history and unlock all features!"
+                elif user_obj.subscription_plan == "free":
+                    message += "\n\n🚀 **Upgrade to PRO**: Unlock unlimited signals and higher win rates. Use /upgrade!"
 
                 await query.edit_message_text(text=message, reply_markup=kb, parse_mode="Markdown")
     
@@ -1613,14 +1599,12 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         elif query.data == "back_to_main":
             from bot.ui import get_welcome_menu_keyboard, get_registered_menu_keyboard
             user_id = str(update.effective_user.id)
-            db = init_db()
-            user = db.get_user_by_telegram_id(user_id)
+            user = await get_user_snapshot(user_id)
             is_super = user_id == "1241907317" or update.effective_user.username == "origichidiah"
             if (user and user.is_registered) or is_super:
                 await query.edit_message_text("🦁 **TradeSigx Main Menu**\nWelcome back! What would you like to do?", reply_markup=get_registered_menu_keyboard())
             else:
                 await query.edit_message_text("🦁 **TradeSigx Welcome Menu**\nChoose an option:", reply_markup=get_welcome_menu_keyboard())
-            db.close()
             return True
     
         elif query.data == "connect_deriv":
@@ -6,15 +6,15 @@ import logging
 import datetime
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from utils.db import init_db
+from utils.async_db import init_async_db
 
 async def start_kyc(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start KYC verification process"""
     user_id = str(update.effective_user.id)
     
-    db = init_db()
+    db = init_async_db()
     try:
-        user = db.get_user_by_telegram_id(user_id)
+        user = await db.get_user_by_telegram_id(user_id)
         
         if not user or not user.is_registered:
             await update.message.reply_text("❌ Please complete registration first with /signup")
@@ -57,7 +57,7 @@ async def start_kyc(update: Update, context: ContextTypes.DEFAULT_TYPE):
             parse_mode="Markdown"
         )
     finally:
-        db.close()
+        await db.close()
 
 async def handle_kyc_photo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
     """Handle KYC document photo uploads. Returns True if handled."""
@@ -75,15 +75,15 @@ async def handle_kyc_photo(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     photo = update.message.photo[-1]
     file_id = photo.file_id
     
-    db = init_db()
+    db = init_async_db()
     try:
-        user = db.get_user_by_telegram_id(user_id)
+        user = await db.get_user_by_telegram_id(user_id)
         if not user:
             return False
         
         if kyc_step == 'id_document':
             user.kyc_id_document = file_id
-            db.commit()
+            await db.commit()
             
             context.user_data['kyc_step'] = 'selfie'
             
@@ -103,7 +103,7 @@ async def handle_kyc_photo(update: Update, context: ContextTypes.DEFAULT_TYPE) -
             user.kyc_selfie = file_id
             user.kyc_status = "pending"
             user.kyc_submitted_at = datetime.datetime.utcnow()
-            db.commit()
+            await db.commit()
             
             context.user_data.pop('kyc_step', None)
             
@@ -133,7 +133,7 @@ async def handle_kyc_photo(update: Update, context: ContextTypes.DEFAULT_TYPE) -
             
             return True
     finally:
-        db.close()
+        await db.close()
     
     return False
 
@@ -149,9 +149,9 @@ async def kyc_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Check KYC status"""
     user_id = str(update.effective_user.id)
     
-    db = init_db()
+    db = init_async_db()
     try:
-        user = db.get_user_by_telegram_id(user_id)
+        user = await db.get_user_by_telegram_id(user_id)
         
         if not user:
             await update.message.reply_text("❌ Please register first with /signup")
@@ -199,7 +199,7 @@ async def kyc_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
             parse_mode="Markdown"
         )
     finally:
-        db.close()
+        await db.close()
 
 async def handle_kyc_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
     """Handle KYC-related callbacks"""
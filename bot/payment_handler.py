@@ -8,7 +8,8 @@ import secrets
 import datetime
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, LabeledPrice
 from telegram.ext import ContextTypes
-from utils.db import init_db, User, PaymentTransaction
+from utils.db import User, PaymentTransaction
+from utils.async_db import init_async_db
 
 # Plan pricing (in USD)
 PLAN_PRICES = {
@@ -41,9 +42,9 @@ async def show_upgrade_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show available subscription plans"""
     user_id = str(update.effective_user.id)
     
-    db = init_db()
+    db = init_async_db()
     try:
-        user = db.get_user_by_telegram_id(user_id)
+        user = await db.get_user_by_telegram_id(user_id)
         current_plan = user.subscription_plan if user else "free"
         
         text = (
@@ -82,7 +83,7 @@ async def show_upgrade_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
         else:
             await update.message.reply_text(text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode="Markdown")
     finally:
-        db.close()
+        await db.close()
 
 async def handle_payment_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
     """Handle payment-related callbacks. Returns True if handled."""
@@ -127,9 +128,9 @@ async def handle_payment_callback(update: Update, context: ContextTypes.DEFAULT_
         plan = data.replace("pay_method_paystack_", "")
         prices = PLAN_PRICES.get(plan, {})
         
-        db = init_db()
+        db = init_async_db()
         try:
-            user = db.get_user_by_telegram_id(user_id)
+            user = await db.get_user_by_telegram_id(user_id)
             if not user or not user.email:
                 await query.edit_message_text(
                     "❌ Please complete your registration with a valid email first.\n"
@@ -141,7 +142,7 @@ async def handle_payment_callback(update: Update, context: ContextTypes.DEFAULT_
             ref = f"TSX-{secrets.token_hex(8).upper()}"
             
             # Create payment record
-            db.create_payment(
+            await db.create_payment(
                 user_id=user.id, 
                 amount=prices.get('ngn', 0), 
                 method="paystack", 
@@ -172,7 +173,7 @@ async def handle_payment_callback(update: Update, context: ContextTypes.DEFAULT_
             
             await query.edit_message_text(text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode="Markdown")
         finally:
-            db.close()
+            await db.close()
         return True
     
     # Crypto Payment
@@ -182,10 +183,10 @@ async def handle_payment_callback(update: Update, context: ContextTypes.DEFAULT_
         
         ref = f"TSX-{secrets.token_hex(8).upper()}"
         
-        db = init_db()
+        db = init_async_db()
         try:
-            user = db.get_user_by_telegram_id(user_id)
-            db.create_payment(
+            user = await db.get_user_by_telegram_id(user_id)
+            await db.create_payment(
                 user_id=user.id if user else 0, 
                 amount=prices.get('usd', 0), 
                 method="crypto", 
@@ -193,7 +194,7 @@ async def handle_payment_callback(update: Update, context: ContextTypes.DEFAULT_
                 ref=ref
             )
         finally:
-            db.close()
+            await db.close()
         
         text = (
             f"🪙 **CRYPTO PAYMENT**\n"
@@ -228,10 +229,10 @@ async def handle_payment_callback(update: Update, context: ContextTypes.DEFAULT_
         
         ref = f"TSX-{secrets.token_hex(8).upper()}"
         
-        db = init_db()
+        db = init_async_db()
         try:
-            user = db.get_user_by_telegram_id(user_id)
-            db.create_payment(
+            user = await db.get_user_by_telegram_id(user_id)
+            await db.create_payment(
                 user_id=user.id if user else 0, 
                 amount=prices.get('ngn', 0), 
                 method="bank_transfer", 
@@ -239,7 +240,7 @@ async def handle_payment_callback(update: Update, context: ContextTypes.DEFAULT_
                 ref=ref
             )
         finally:
-            db.close()
+            await db.close()
         
         text = (
             f"🏦 **BANK TRANSFER**\n"
@@ -338,13 +339,13 @@ async def handle_successful_payment(update: Update, context: ContextTypes.DEFAUL
         user_id = parts[0]
         plan = parts[1]
         
-        db = init_db()
+        db = init_async_db()
         try:
-            user = db.get_user_by_telegram_id(user_id)
+            user = await db.get_user_by_telegram_id(user_id)
             if user:
                 user.subscription_plan = plan
                 user.plan_expires_at = datetime.datetime.utcnow() + datetime.timedelta(days=30)
-                db.commit()
+                await db.commit()
                 
                 await update.message.reply_text(
                     f"🎉 **PAYMENT SUCCESSFUL!**\n\n"
@@ -354,7 +355,7 @@ async def handle_successful_payment(update: Update, context: ContextTypes.DEFAUL
                     parse_mode="Markdown"
                 )
         finally:
-            db.close()
+            await db.close()
     except Exception as e:
         logging.error(f"Payment processing error: {e}")
 
@@ -367,9 +368,9 @@ async def verify_payment_command(update: Update, context: ContextTypes.DEFAULT_T
     
     ref = args[0].upper()
     
-    db = init_db()
+    db = init_async_db()
     try:
-        payment = db.get_payment_by_ref(ref)
+        payment = await db.get_payment_by_ref(ref)
         if not payment:
             await update.message.reply_text("❌ Payment reference not found.")
             return
@@ -388,14 +389,14 @@ async def verify_payment_command(update: Update, context: ContextTypes.DEFAULT_T
             parse_mode="Markdown"
         )
     finally:
-        db.close()
+        await db.close()
 
-def activate_user_plan(user_id: str, plan: str, db) -> bool:
+async def activate_user_plan(user_id: str, plan: str, db) -> bool:
     """Activate a user's subscription plan"""
-    user = db.get_user_by_telegram_id(user_id)
+    user = await db.get_user_by_telegram_id(user_id)
     if user:
         user.subscription_plan = plan
         user.plan_expires_at = datetime.datetime.utcnow() + datetime.timedelta(days=30)
-        db.commit()
+        await db.commit()
         return True
     return False
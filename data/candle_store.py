@@ -0,0 +1,138 @@
+import os
+import time
+import sqlite3
+import asyncio
+import logging
+import threading
+import numpy as np
+import pandas as pd
+
+from data.candle_stream import frame_epochs
+
+# Lives next to tradesigx.db on the Render disk so it survives restarts/redeploys
+CANDLE_STORE_PATH = os.getenv("CANDLE_STORE_PATH") or ('/data/candles.db' if os.path.exists('/data') else 'candles.db')
+CANDLE_STORE_MAX_ROWS = int(os.getenv("CANDLE_STORE_MAX_ROWS", 5000)) # Per (symbol, granularity)
+CANDLE_STORE_WINDOW = int(os.getenv("CANDLE_STORE_WINDOW", 200)) # Rows handed to the engines
+CANDLE_STORE_MMAP_MB = int(os.getenv("CANDLE_STORE_MMAP_MB", 64))
+
+INTERVAL_SECONDS = {"1m": 60, "2m": 120, "5m": 300, "15m": 900, "30m": 1800, "60m": 3600, "1h": 3600, "4h": 14400, "1d": 86400}
+
+
+class CandleStore:
+    """
+    Append-only OHLCV history per (symbol, granularity) in a separate SQLite file.
+    Rows are clustered by epoch (WITHOUT ROWID) and read through mmap, so a window
+    read is one index range scan that doesn't hold the whole history in RAM.
+    """
+
+    def __init__(self, path: str = CANDLE_STORE_PATH, max_rows: int = CANDLE_STORE_MAX_ROWS):
+        self.path = path
+        self.max_rows = max_rows
+        self.lock = threading.Lock()
+        self.stats = {'reads': 0, 'writes': 0, 'rows_written': 0, 'tail_fetches': 0, 'full_fetches': 0}
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(f"PRAGMA mmap_size={CANDLE_STORE_MMAP_MB * 1024 * 1024}")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS candles (
+                symbol TEXT NOT NULL,
+                granularity INTEGER NOT NULL,
+                epoch INTEGER NOT NULL,
+                open REAL, high REAL, low REAL, close REAL, volume REAL,
+                PRIMARY KEY (symbol, granularity, epoch)
+            ) WITHOUT ROWID
+        """)
+
+    def last_epoch(self, symbol: str, granularity: int):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT MAX(epoch) FROM candles WHERE symbol=? AND granularity=?", (symbol, granularity)
+            ).fetchone()
+        return row[0] if row else None
+
+    def read(self, symbol: str, granularity: int, limit: int = CANDLE_STORE_WINDOW) -> pd.DataFrame:
+        """Latest `limit` candles, oldest first, as an 'epoch'-indexed frame (volume only if stored)."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT epoch, open, high, low, close, volume FROM candles "
+                "WHERE symbol=? AND granularity=? ORDER BY epoch DESC LIMIT ?", (symbol, granularity, limit)
+            ).fetchall()
+        self.stats['reads'] += 1
+        if not rows:
+            return pd.DataFrame()
+        arr = np.array(rows[::-1], dtype=float)
+        index = pd.to_datetime(arr[:, 0].astype('int64'), unit='s')
+        index.name = 'epoch'
+        df = pd.DataFrame(arr[:, 1:], index=index, columns=['open', 'high', 'low', 'close', 'volume'])
+        if df['volume'].isna().all():
+            df = df.drop(columns='volume')
+        return df
+
+    def write(self, symbol: str, granularity: int, df: pd.DataFrame) -> int:
+        """Upserts a provider frame (the live bar is revised in place) and trims old history."""
+        if df is None or df.empty:
+            return 0
+        epochs = frame_epochs(df)
+        cols = [df[c].to_numpy(dtype=float) if c in df.columns else np.full(len(df), np.nan)
+                for c in ('open', 'high', 'low', 'close', 'volume')]
+        rows = [(symbol, granularity, int(e), *(None if np.isnan(v) else float(v) for v in vals))
+                for e, *vals in zip(epochs, *cols)]
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany("INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                # Cap per-series history: Drop everything older than the newest max_rows
+                self.conn.execute(
+                    "DELETE FROM candles WHERE symbol=? AND granularity=? AND epoch < ("
+                    "SELECT epoch FROM candles WHERE symbol=? AND granularity=? ORDER BY epoch DESC LIMIT 1 OFFSET ?)",
+                    (symbol, granularity, symbol, granularity, self.max_rows - 1)
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        self.stats['writes'] += 1
+        self.stats['rows_written'] += len(rows)
+        return len(rows)
+
+    def merge(self, symbol: str, granularity: int, df: pd.DataFrame, limit: int = CANDLE_STORE_WINDOW) -> pd.DataFrame:
+        self.write(symbol, granularity, df)
+        return self.read(symbol, granularity, limit)
+
+    async def fetch_through(self, symbol: str, granularity: int, fetch, limit: int = CANDLE_STORE_WINDOW) -> pd.DataFrame:
+        """
+        Read-through fetch: `fetch(start_epoch)` is only asked for the bars from the last stored
+        one onwards (None = full window). Returns the merged window, or an empty frame if the provider failed.
+        """
+        last = await asyncio.to_thread(self.last_epoch, symbol, granularity)
+        # A short gap is bridged by one tail request; longer outages refetch the normal window
+        if last is not None and time.time() - last < granularity * limit:
+            self.stats['tail_fetches'] += 1
+            fresh = await fetch(last)
+        else:
+            self.stats['full_fetches'] += 1
+            fresh = await fetch(None)
+        if fresh is None or fresh.empty:
+            return pd.DataFrame()
+        try:
+            return await asyncio.to_thread(self.merge, symbol, granularity, fresh, limit)
+        except Exception as e:
+            logging.error(f"Candle Store: Write failed for {symbol}@{granularity}s: {e}")
+            return fresh
+
+    def list_series(self):
+        """[(symbol, granularity, rows)] for every stored series (backtest inputs)."""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT symbol, granularity, COUNT(*) FROM candles GROUP BY symbol, granularity ORDER BY symbol, granularity"
+            ).fetchall()
+
+    def get_stats(self):
+        with self.lock:
+            series = self.conn.execute("SELECT COUNT(*) FROM (SELECT 1 FROM candles GROUP BY symbol, granularity)").fetchone()[0]
+        return {**self.stats, "series": series, "path": self.path}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
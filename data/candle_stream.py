@@ -0,0 +1,245 @@
+import os
+import time
+import asyncio
+import logging
+import numpy as np
+import pandas as pd
+
+# Rolling window per watched symbol (matches the 200-candle history we used to refetch)
+STREAM_BUFFER_SIZE = int(os.getenv("CANDLE_BUFFER_SIZE", 200))
+DERIV_GRANULARITY = 300 # 5 min, same as get_synthetic_data
+CRYPTO_INTERVAL = "15m"
+CRYPTO_GRANULARITY = 900
+CRYPTO_POLL_SECONDS = int(os.getenv("CRYPTO_POLL_SECONDS", 30))
+MIN_STREAM_ROWS = 20 # Below this the buffer is still warming up
+LIVE_INDICATORS = os.getenv("LIVE_INDICATORS", "1") == "1"
+
+
+def frame_epochs(df: pd.DataFrame) -> np.ndarray:
+    """Bar open times in epoch seconds, for ccxt ('timestamp' ms column) or datetime-indexed frames."""
+    if 'timestamp' in df.columns:
+        return df['timestamp'].to_numpy(dtype='int64') // 1000
+    idx = df.index
+    if not isinstance(idx, pd.DatetimeIndex):
+        raise ValueError("Frame has neither a timestamp column nor a DatetimeIndex")
+    if idx.tz is not None:
+        idx = idx.tz_convert('UTC').tz_localize(None)
+    return np.asarray((idx - pd.Timestamp(0)) // pd.Timedelta(seconds=1), dtype='int64')
+
+
+class CandleBuffer:
+    """Fixed-size OHLCV ring buffer. The live bar is revised in place; a new open time appends."""
+    FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, capacity: int = STREAM_BUFFER_SIZE, granularity: int = DERIV_GRANULARITY, stale_after: float = None):
+        self.capacity = capacity
+        self.granularity = granularity
+        self.stale_after = stale_after or 2 * granularity
+        self.epochs = np.zeros(capacity, dtype='int64')
+        self.values = np.full((len(self.FIELDS), capacity), np.nan)
+        self.start = 0
+        self.size = 0
+        self.has_volume = False
+        self.version = 0
+        self.updated_at = 0
+        self._frame = None
+        self._frame_version = -1
+        self.indicators = None # Optional LiveIndicators kept in step with every upsert
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def last_epoch(self):
+        return int(self.epochs[(self.start + self.size - 1) % self.capacity]) if self.size else None
+
+    def upsert(self, epoch: int, o: float, h: float, l: float, c: float, v: float = None, notify: bool = True) -> bool:
+        """Applies one candle. Returns True when it opened a new bar."""
+        last = self.last_epoch
+        if last is not None and epoch < last:
+            return False # Late/duplicate history, already covered
+        is_new = last is None or epoch > last
+        if is_new:
+            pos = (self.start + self.size) % self.capacity
+            if self.size < self.capacity:
+                self.size += 1
+            else:
+                self.start = (self.start + 1) % self.capacity
+        else:
+            pos = (self.start + self.size - 1) % self.capacity
+        self.epochs[pos] = epoch
+        self.values[:, pos] = (o, h, l, c, np.nan if v is None else v)
+        if v is not None:
+            self.has_volume = True
+        self.version += 1
+        self.updated_at = time.time()
+        if self.indicators is not None and notify:
+            self.indicators.on_bar(is_new)
+        return is_new
+
+    def load(self, df: pd.DataFrame):
+        """Seeds (or tops up) the buffer from a provider frame."""
+        if df is None or df.empty:
+            return
+        epochs = frame_epochs(df)
+        cols = [df[f].to_numpy(dtype=float) if f in df.columns else None for f in self.FIELDS]
+        # Seeds/resyncs reseed the live indicators once; small poll deltas step them bar by bar
+        bulk = len(df) >= MIN_STREAM_ROWS
+        for i in np.argsort(epochs, kind='stable'):
+            self.upsert(int(epochs[i]), cols[0][i], cols[1][i], cols[2][i], cols[3][i],
+                        None if cols[4] is None else cols[4][i], notify=not bulk)
+        if bulk and self.indicators is not None:
+            self.indicators.reseed()
+
+    def is_fresh(self, now: float = None) -> bool:
+        now = now or time.time()
+        return self.size >= MIN_STREAM_ROWS and (now - self.updated_at) < self.stale_after
+
+    def to_frame(self) -> pd.DataFrame:
+        """Chronological DataFrame view (memoized until the next update)."""
+        if self._frame_version == self.version:
+            return self._frame
+        order = (self.start + np.arange(self.size)) % self.capacity
+        data = {f: self.values[i, order] for i, f in enumerate(self.FIELDS) if f != 'volume' or self.has_volume}
+        if self.indicators is not None and self.indicators.warm:
+            # Live indicator columns ride along, so generate_signal can skip the recompute
+            data.update(self.indicators.columns(order))
+        index = pd.to_datetime(self.epochs[order], unit='s')
+        index.name = 'epoch'
+        self._frame = pd.DataFrame(data, index=index)
+        self._frame_version = self.version
+        return self._frame
+
+
+class CandleStreamManager:
+    """
+    Keeps a rolling candle buffer per watched symbol:
+    - Deriv symbols (synthetics + mapped forex/indices) via ticks_history subscribe=1 on the shared pool
+    - Crypto via small ccxt 'since' polls (one delta per poll instead of the whole window)
+    """
+
+    def __init__(self, capacity: int = STREAM_BUFFER_SIZE):
+        self.capacity = capacity
+        self.buffers = {}
+        self.tasks = {}
+        self.stats = {'deltas': 0, 'resubscribes': 0, 'hits': 0}
+
+    def watch(self, symbol: str, asset_type: str = None):
+        """Starts streaming a symbol (idempotent). Yahoo-only symbols are skipped."""
+        if symbol in self.tasks:
+            return
+        from data.collector import DataCollector
+        asset_type = asset_type or DataCollector.detect_asset_type(symbol)
+        deriv_symbol = symbol if asset_type == "synthetic" else DataCollector.DERIV_MAP.get(symbol)
+
+        if deriv_symbol:
+            buf = CandleBuffer(self.capacity, DERIV_GRANULARITY)
+            runner = self._run_deriv(symbol, deriv_symbol, buf)
+        elif asset_type == "crypto":
+            buf = CandleBuffer(self.capacity, CRYPTO_GRANULARITY, stale_after=3 * CRYPTO_POLL_SECONDS)
+            runner = self._run_crypto(symbol, buf)
+        else:
+            logging.info(f"Candle Stream: {symbol} has no streaming route (Yahoo only). Skipping.")
+            return
+        if LIVE_INDICATORS:
+            from engine.live_indicators import LiveIndicators
+            buf.indicators = LiveIndicators(buf)
+        self.buffers[symbol] = buf
+        self.tasks[symbol] = asyncio.create_task(runner)
+
+    def watch_many(self, assets):
+        for symbol, asset_type in assets:
+            self.watch(symbol, asset_type)
+
+    def get(self, symbol: str, granularity: int = None):
+        """
+        O(1) lookup for hot symbols. Returns None while cold/stale, or when the buffer's bar size isn't
+        'granularity' (seconds), so callers fall back to a fetch.
+        """
+        buf = self.buffers.get(symbol)
+        if buf is None or not buf.is_fresh():
+            return None
+        if granularity is not None and buf.granularity != granularity:
+            return None
+        self.stats['hits'] += 1
+        return buf.to_frame()
+
+    def get_indicators(self, symbol: str):
+        """Live indicator state for a streamed symbol (None if not streamed or still cold)."""
+        buf = self.buffers.get(symbol)
+        ind = buf.indicators if buf is not None else None
+        return ind if ind is not None and ind.warm else None
+
+    def _on_ohlc(self, buf: CandleBuffer, msg: dict):
+        ohlc = msg.get('ohlc')
+        if not ohlc:
+            return
+        buf.upsert(int(ohlc['open_time']), float(ohlc['open']), float(ohlc['high']),
+                   float(ohlc['low']), float(ohlc['close']))
+        self.stats['deltas'] += 1
+
+    async def _run_deriv(self, symbol: str, deriv_symbol: str, buf: CandleBuffer):
+        from utils.engines import get_deriv_pool
+        backoff = 1
+        while True:
+            sub = None
+            try:
+                request = {
+                    "ticks_history": deriv_symbol,
+                    "count": self.capacity,
+                    "end": "latest",
+                    "style": "candles",
+                    "granularity": buf.granularity
+                }
+                first, sub = await get_deriv_pool().subscribe(request, lambda msg: self._on_ohlc(buf, msg))
+                if 'error' in first:
+                    # e.g. market closed / symbol not offered: Back off hard
+                    logging.warning(f"Candle Stream: {symbol} subscribe refused: {first['error'].get('message')}")
+                    await asyncio.sleep(min(300, backoff * 30))
+                    backoff = min(backoff * 2, 10)
+                    continue
+                if 'candles' in first:
+                    buf.load(pd.DataFrame(first['candles']).assign(
+                        epoch=lambda d: pd.to_datetime(d['epoch'], unit='s')).set_index('epoch'))
+                backoff = 1
+                logging.info(f"Candle Stream: {symbol} live ({len(buf)} candles buffered).")
+                await sub.closed.wait()
+                self.stats['resubscribes'] += 1
+            except asyncio.CancelledError:
+                if sub is not None:
+                    await sub.forget()
+                raise
+            except Exception as e:
+                logging.warning(f"Candle Stream: {symbol} stream error: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+    async def _run_crypto(self, symbol: str, buf: CandleBuffer):
+        from data.collector import DataCollector
+        while True:
+            try:
+                # Seed once, then only ask for the bars since the live one (revised + any new)
+                since = buf.last_epoch * 1000 if len(buf) else None
+                df = await DataCollector.get_crypto_data(symbol, interval=CRYPTO_INTERVAL, since=since,
+                                                         limit=3 if since else self.capacity)
+                if not df.empty:
+                    buf.load(df)
+                    self.stats['deltas'] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"Candle Stream: {symbol} poll error: {e}")
+            await asyncio.sleep(CRYPTO_POLL_SECONDS)
+
+    def get_stats(self):
+        return {**self.stats, "watched": len(self.buffers),
+                "fresh": sum(1 for b in self.buffers.values() if b.is_fresh())}
+
+    async def stop(self):
+        for task in self.tasks.values():
+            task.cancel()
+        for task in self.tasks.values():
+            try: await task
+            except BaseException: pass
+        self.tasks.clear()
+        self.buffers.clear()
@@ -1,11 +1,12 @@
 import yfinance as yf
 import pandas as pd
-import ccxt
 import os
 import time
 import logging
 import asyncio
 import requests
+from data.candle_store import INTERVAL_SECONDS, CANDLE_STORE_WINDOW
+from utils.metrics import span, timed
 
 # Global session for yfinance to mitigate fc.yahoo.com issues
 yf_session = requests.Session()
@@ -28,11 +29,16 @@ renew_yf_session()
 # Global semaphore to prevent rate limiting
 data_semaphore = asyncio.Semaphore(5)
 
-# Global Data Cache: symbol -> {'data': df, 'timestamp': time}
+# Global Data Cache: (symbol, interval) -> {'data': df, 'timestamp': time}
 _data_cache = {}
 CACHE_TTL = 60 # 60 seconds cache for market data
 MAX_CACHE_SIZE = 20 # Reduced for 512MB RAM stability
 
+# Single-flight: (symbol, interval) -> in-flight upstream fetch shared by concurrent callers
+_inflight = {}
+_fetch_stats = {'requests': 0, 'stream_hits': 0, 'cache_hits': 0, 'coalesced': 0, 'upstream': 0,
+                'yahoo_batches': 0, 'yahoo_batched_symbols': 0}
+
 class DataCollector:
     # Mapping from Yahoo Symbols/Logic to Deriv Symbols
     DERIV_MAP = {
@@ -48,6 +54,7 @@ class DataCollector:
     }
 
     @staticmethod
+    @timed("provider_fetch", provider="yahoo")
     async def get_forex_data(symbol: str, interval: str = "15m", retries: int = 2):
         """Fetches data from Yahoo Finance (Primary), with yf.download fallback."""
         def fetch_yf_strategy1():
@@ -89,71 +96,240 @@ class DataCollector:
         return pd.DataFrame()
 
     @staticmethod
-    async def get_synthetic_data(symbol: str, is_real_market: bool = False):
-        """Fetches candles via Deriv WS. Uses AUTHORIZE for real market assets."""
-        app_id = os.getenv("DERIV_APP_ID") or "121681"
-        token = os.getenv("DERIV_API_TOKEN")
-        
+    @timed("provider_fetch", provider="yahoo_batch")
+    async def get_forex_data_batch(symbols, interval: str = "15m"):
+        """One multi-ticker Yahoo download split back into {ticker: df} (missing tickers are omitted)."""
+        if not symbols:
+            return {}
+
+        def fetch_bulk():
+            return yf.download(symbols, period="2d", interval=interval, group_by='ticker',
+                               session=yf_session, timeout=20, progress=False)
+
         try:
-            import websockets
-            import json
-            uri = f"wss://ws.binaryws.com/websockets/v3?app_id={app_id}"
+            data = await asyncio.to_thread(fetch_bulk)
+        except Exception as e:
+            logging.error(f"Yahoo Batch Exception for {symbols}: {e}")
+            return {}
+        _fetch_stats['yahoo_batches'] += 1
+        _fetch_stats['yahoo_batched_symbols'] += len(symbols)
+        if data is None or data.empty:
+            return {}
+
+        frames = {}
+        for sym in symbols:
+            if isinstance(data.columns, pd.MultiIndex):
+                if sym not in data.columns.get_level_values(0):
+                    continue
+                df = data[sym]
+            else:
+                df = data # Single ticker reply is flat
+            df = df.dropna(how='all')
+            if df.empty:
+                continue
+            df = df.copy()
+            df.columns = [c.lower() for c in df.columns]
+            for col in ['open', 'high', 'low', 'close', 'volume']:
+                if col not in df.columns: df[col] = 0
+            frames[sym] = df
+        return frames
+
+    @staticmethod
+    @timed("provider_fetch", provider="deriv")
+    async def get_synthetic_data(symbol: str, is_real_market: bool = False, start: int = None):
+        """Fetches candles via the shared Deriv WS pool (sockets are pre-authorized for real market assets).
+        'start' (epoch) limits the reply to the candles from that point on."""
+        try:
+            from utils.engines import get_deriv_pool
+            request = {
+                "ticks_history": symbol, 
+                "count": 200, # Reduced from 500 for RAM
+                "end": "latest", 
+                "style": "candles", 
+                "granularity": 300 # 5 min
+            }
+            if start:
+                request["start"] = int(start)
+            data = await get_deriv_pool().request(request, timeout=10)
             
-            async with websockets.connect(uri, close_timeout=5) as ws:
-                # MANDATORY: Authorize if we have a token (Required for Forex/Indices)
-                if token:
-                    auth_req = {"authorize": token}
-                    await ws.send(json.dumps(auth_req))
-                    await ws.recv() # Wait for auth confirmation
-                
-                request = {
-                    "ticks_history": symbol, 
-                    "count": 200, # Reduced from 500 for RAM
-                    "end": "latest", 
-                    "style": "candles", 
-                    "granularity": 300 # 5 min
-                }
-                await asyncio.wait_for(ws.send(json.dumps(request)), timeout=5)
-                resp = await asyncio.wait_for(ws.recv(), timeout=10)
-                data = json.loads(resp)
-                
-                if 'candles' in data:
-                    df = pd.DataFrame(data['candles'])
-                    df.columns = [c.lower() for c in df.columns]
-                    # Mapping Deriv epoch to datetime index
-                    df['epoch'] = pd.to_datetime(df['epoch'], unit='s')
-                    df.set_index('epoch', inplace=True)
-                    for c in ['open', 'high', 'low', 'close']:
-                        df[c] = pd.to_numeric(df[c], errors='coerce')
-                    return df
-                elif 'error' in data:
-                    msg = data['error'].get('message', 'Unknown')
-                    logging.warning(f"Deriv API Error for {symbol}: {msg}")
-                    # Special handling for "Too many requests" or "Market closed"
+            if 'candles' in data:
+                df = pd.DataFrame(data['candles'])
+                df.columns = [c.lower() for c in df.columns]
+                # Mapping Deriv epoch to datetime index
+                df['epoch'] = pd.to_datetime(df['epoch'], unit='s')
+                df.set_index('epoch', inplace=True)
+                for c in ['open', 'high', 'low', 'close']:
+                    df[c] = pd.to_numeric(df[c], errors='coerce')
+                return df
+            elif 'error' in data:
+                msg = data['error'].get('message', 'Unknown')
+                logging.warning(f"Deriv API Error for {symbol}: {msg}")
+                # Special handling for "Too many requests" or "Market closed"
         except Exception as e:
             logging.error(f"Deriv WS Failure for {symbol}: {e}")
         return pd.DataFrame()
 
     @staticmethod
-    async def fetch_data(symbol: str, asset_type: str = None):
-        """Unified entry point with Deriv-first priority for blocked assets."""
-        global _data_cache
+    def detect_asset_type(symbol: str) -> str:
+        if "/" in symbol or "USDT" in symbol: return "crypto"
+        elif any(c in symbol for c in ["HZ", "R_", "C10", "BOOM", "CRASH"]): return "synthetic"
+        return "forex"
+
+    @staticmethod
+    async def fetch_data(symbol: str, asset_type: str = None, interval: str = "15m"):
+        """
+        Unified entry point with Deriv-first priority for blocked assets.
+        Concurrent callers for the same (symbol, interval) share one upstream request.
+        ('interval' applies to the Yahoo/ccxt routes; Deriv candles are 5m.)
+        """
+        _fetch_stats['requests'] += 1
+        cached = DataCollector._get_cached(symbol, interval, asset_type)
+        if cached is not None:
+            return cached
         
-        if symbol in _data_cache:
-            entry = _data_cache[symbol]
-            if time.time() - entry['timestamp'] < CACHE_TTL:
-                return entry['data']
+        key = (symbol, interval)
+        # SINGLE-FLIGHT: Join the fetch another caller already started for this key
+        task = _inflight.get(key)
+        if task is not None:
+            _fetch_stats['coalesced'] += 1
+            source = "coalesced"
+        else:
+            task = asyncio.ensure_future(DataCollector._fetch_upstream(symbol, asset_type, interval))
+            DataCollector._register_inflight(key, task)
+            source = "upstream"
+        # Shielded: A caller timing out (e.g. bulk scan wait_for) must not cancel it for the others
+        with span("fetch_data", source=source):
+            return await asyncio.shield(task)
+
+    @staticmethod
+    def _get_cached(symbol: str, interval: str, asset_type: str = None, count: bool = True):
+        # HOT PATH: Streamed symbols are served straight from their rolling candle buffer,
+        # but only when it holds the bars the upstream route would return (crypto streams 15m, Deriv 5m)
+        # ('count' off for look-ahead checks whose symbol is counted when it is actually served)
+        from utils.engines import get_candle_streams
+        streamed = get_candle_streams().get(symbol, DataCollector.route_granularity(symbol, interval, asset_type))
+        if streamed is not None:
+            if count: _fetch_stats['stream_hits'] += 1
+            return streamed
         
-        # Cleanup old cache pre-emptively
-        if len(_data_cache) > MAX_CACHE_SIZE:
+        entry = _data_cache.get((symbol, interval))
+        if entry and time.time() - entry['timestamp'] < CACHE_TTL:
+            if count: _fetch_stats['cache_hits'] += 1
+            return entry['data']
+        return None
+
+    @staticmethod
+    def route_granularity(symbol: str, interval: str, asset_type: str = None) -> int:
+        """Bar size (seconds) _fetch_upstream delivers: Deriv routes are always 5m, the rest honour 'interval'."""
+        asset_type = asset_type or DataCollector.detect_asset_type(symbol)
+        if asset_type == "synthetic" or (asset_type == "forex" and symbol in DataCollector.DERIV_MAP):
+            return 300
+        return INTERVAL_SECONDS.get(interval, 0)
+
+    @staticmethod
+    def yahoo_symbol(symbol: str) -> str:
+        """Normalizes app symbols to Yahoo tickers."""
+        if symbol.upper() == "GOLD": return "GC=F"
+        if symbol.upper() == "USOIL": return "CL=F"
+        if "USD" in symbol and "=" not in symbol and "/" not in symbol: return symbol + "=X"
+        return symbol
+
+    @staticmethod
+    async def fetch_data_batch(assets, interval: str = "15m"):
+        """
+        Multi-asset fetch for scans: {symbol: df} (empty frame on failure).
+        Everything goes through fetch_data (streams, cache, single-flight, Deriv-first routing) except
+        forex symbols bound for Yahoo, which share ONE multi-ticker yf.download. Those are registered
+        as in-flight while the batch runs, so concurrent fetch_data callers join it.
+        'assets' holds symbols or (symbol, asset_type) pairs.
+        """
+        pairs = [a if isinstance(a, (tuple, list)) else (a, None) for a in assets]
+        results = {}
+        yahoo = {} # symbol -> future registered in _inflight
+
+        for symbol, asset_type in pairs:
+            asset_type = asset_type or DataCollector.detect_asset_type(symbol)
+            key = (symbol, interval)
+            if (asset_type != "forex" or symbol in DataCollector.DERIV_MAP or symbol in yahoo
+                    or key in _inflight or DataCollector._get_cached(symbol, interval, asset_type, count=False) is not None):
+                continue
+            _fetch_stats['requests'] += 1
+            future = asyncio.get_running_loop().create_future()
+            DataCollector._register_inflight(key, future)
+            yahoo[symbol] = future
+
+        async def one(symbol, asset_type):
+            results[symbol] = await DataCollector.fetch_data(symbol, asset_type, interval)
+
+        # Shielded like fetch_data: Callers that joined the batch must not be cancelled with this one
+        batch = asyncio.ensure_future(DataCollector._fetch_yahoo_batch(yahoo, interval))
+        await asyncio.gather(asyncio.shield(batch), *[one(s, t) for s, t in pairs if s not in yahoo])
+        for symbol, future in yahoo.items():
+            results[symbol] = future.result()
+
+        return {s: results.get(s, pd.DataFrame()) for s, _ in pairs}
+
+    @staticmethod
+    async def _fetch_yahoo_batch(futures: dict, interval: str):
+        """Resolves each symbol's in-flight future from one Yahoo batch; misses retry through fetch_data."""
+        if not futures:
+            return
+        tickers = {s: DataCollector.yahoo_symbol(s) for s in futures}
+        granularity = INTERVAL_SECONDS.get(interval, 900)
+        missing = []
+        try:
+            async with data_semaphore:
+                _fetch_stats['upstream'] += 1
+                frames = await DataCollector.get_forex_data_batch(sorted(set(tickers.values())), interval=interval)
+            for symbol, yf_sym in tickers.items():
+                df = frames.get(yf_sym)
+                if df is None or df.empty:
+                    missing.append(symbol)
+                    continue
+                async def downloaded(start, df=df):
+                    return df
+                df = await DataCollector._through_store(yf_sym, granularity, downloaded)
+                DataCollector._cache_put((symbol, interval), df)
+                futures[symbol].set_result(df)
+        except Exception as e:
+            logging.error(f"Yahoo batch fetch error for {list(tickers)}: {e}")
+            missing = [s for s, future in futures.items() if not future.done()]
+
+        async def retry(symbol):
+            # Missing from the batch reply: The per-symbol upstream route (semaphore, store, cache) under the
+            # key's existing in-flight future, so joined callers get it and the request isn't counted twice
+            futures[symbol].set_result(await DataCollector._fetch_upstream(symbol, "forex", interval))
+
+        try:
+            await asyncio.gather(*[retry(s) for s in missing])
+        finally:
+            for future in futures.values(): # Never leave a joined caller waiting
+                if not future.done():
+                    future.set_result(pd.DataFrame())
+
+    @staticmethod
+    def _register_inflight(key, future):
+        _inflight[key] = future
+        future.add_done_callback(lambda f: _inflight.pop(key, None) if _inflight.get(key) is f else None)
+
+    @staticmethod
+    def _cache_put(key, df):
+        """Stores a non-empty frame, evicting the oldest entries beyond MAX_CACHE_SIZE."""
+        if df is None or df.empty:
+            return
+        while len(_data_cache) >= MAX_CACHE_SIZE and key not in _data_cache:
             oldest = min(_data_cache.keys(), key=lambda k: _data_cache[k]['timestamp'])
             del _data_cache[oldest]
+        _data_cache[key] = {'data': df, 'timestamp': time.time()}
+
+    @staticmethod
+    async def _fetch_upstream(symbol: str, asset_type: str, interval: str):
+        key = (symbol, interval)
 
         async with data_semaphore:
+            _fetch_stats['upstream'] += 1
             if not asset_type:
-                if "/" in symbol or "USDT" in symbol: asset_type = "crypto"
-                elif any(c in symbol for c in ["HZ", "R_", "C10", "BOOM", "CRASH"]): asset_type = "synthetic"
-                else: asset_type = "forex"
+                asset_type = DataCollector.detect_asset_type(symbol)
 
             df = pd.DataFrame()
             try:
@@ -164,27 +340,28 @@ class DataCollector:
                     # Try Deriv FIRST for Indices/Common Forex if we have a mapping
                     if deriv_symbol:
                         logging.info(f"Prioritizing Deriv for {symbol} -> {deriv_symbol}")
-                        df = await DataCollector.get_synthetic_data(deriv_symbol, is_real_market=True)
+                        df = await DataCollector._through_store(deriv_symbol, 300,
+                            lambda start: DataCollector.get_synthetic_data(deriv_symbol, is_real_market=True, start=start))
                     
                     if df.empty:
-                        # Normalize for Yahoo
-                        yf_sym = symbol
-                        if yf_sym.upper() == "GOLD": yf_sym = "GC=F"
-                        elif yf_sym.upper() == "USOIL": yf_sym = "CL=F"
-                        elif "USD" in yf_sym and "=" not in yf_sym and "/" not in yf_sym: yf_sym += "=X"
-                        
-                        df = await DataCollector.get_forex_data(yf_sym)
+                        yf_sym = DataCollector.yahoo_symbol(symbol)
+                        # Yahoo has no cheap tail query: The 2d window is merged into the stored history
+                        df = await DataCollector._through_store(yf_sym, INTERVAL_SECONDS.get(interval, 900),
+                            lambda start: DataCollector.get_forex_data(yf_sym, interval=interval))
                 
                 elif asset_type == "synthetic":
-                    df = await DataCollector.get_synthetic_data(symbol)
+                    df = await DataCollector._through_store(symbol, 300,
+                        lambda start: DataCollector.get_synthetic_data(symbol, start=start))
                 
                 elif asset_type == "crypto":
                     # Handle CCXT with YF fallback
                     from bot.handlers import ai_gen # Lazy import
-                    df = await DataCollector.get_crypto_data(symbol)
+                    df = await DataCollector._through_store(symbol, INTERVAL_SECONDS.get(interval, 900),
+                        lambda start: DataCollector.get_crypto_data(symbol, interval=interval,
+                                                                    since=start * 1000 if start else None,
+                                                                    limit=CANDLE_STORE_WINDOW))
 
-                if not df.empty:
-                    _data_cache[symbol] = {'data': df, 'timestamp': time.time()}
+                DataCollector._cache_put(key, df)
                 return df
 
             except Exception as e:
@@ -192,23 +369,31 @@ class DataCollector:
                 return pd.DataFrame()
 
     @staticmethod
-    async def get_crypto_data(symbol: str, interval: str = "15m"):
-        """CCXT-based crypto fetcher"""
-        import ccxt.async_support as ccxt_async
-        exchanges = [ccxt_async.binance(), ccxt_async.kucoin()]
+    async def _through_store(store_symbol: str, granularity: int, fetch):
+        """Reads stored history first and only asks the provider for the missing tail."""
+        from utils.engines import get_candle_store
+        store = get_candle_store()
+        if store is None:
+            return await fetch(None)
+        return await store.fetch_through(store_symbol, granularity, fetch)
+
+    @staticmethod
+    def get_fetch_stats():
+        """Counters for fetch_data; 'coalesced' = upstream calls saved by single-flight."""
+        return {**_fetch_stats, "in_flight": len(_inflight), "cached": len(_data_cache)}
+
+    @staticmethod
+    @timed("provider_fetch", provider="ccxt")
+    async def get_crypto_data(symbol: str, interval: str = "15m", since: int = None, limit: int = 50):
+        """CCXT-based crypto fetcher. 'since' (ms) fetches only the candles after that point."""
+        from utils.engines import get_exchange_registry
         if "/" not in symbol:
             symbol = f"{symbol.replace('USDT', '')}/USDT"
 
-        for ex in exchanges:
-            try:
-                # Reduced limit from 100 to 50 for RAM
-                ohlcv = await asyncio.wait_for(ex.fetch_ohlcv(symbol, timeframe=interval, limit=50), timeout=10)
-                if ohlcv:
-                    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                    await ex.close()
-                    return df
-            except: pass
-            finally: await ex.close()
+        # Shared venues (kept-alive sessions, markets loaded once), fastest first
+        venue, ohlcv = await get_exchange_registry().fetch_ohlcv(symbol, timeframe=interval, since=since, limit=limit)
+        if ohlcv:
+            return pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
         
         # YF fallback for crypto
         yf_sym = symbol.replace("/", "-").replace("USDT", "USD")
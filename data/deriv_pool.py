@@ -0,0 +1,228 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import itertools
+
+DERIV_WS_URI = "wss://ws.binaryws.com/websockets/v3?app_id={app_id}"
+
+
+class _DerivConnection:
+    """A single authorized Deriv socket. Responses are routed back to callers by req_id."""
+
+    def __init__(self, pool, index: int):
+        self.pool = pool
+        self.index = index
+        self.ws = None
+        self.reader_task = None
+        self.pending = {}  # req_id -> Future
+        self.streams = {}  # req_id -> DerivSubscription
+        self.connect_lock = asyncio.Lock()
+        self.failures = 0
+        self.next_attempt = 0
+
+    @property
+    def is_open(self):
+        return self.ws is not None and not self.ws.closed
+
+    async def ensure_open(self):
+        if self.is_open:
+            return
+        async with self.connect_lock:
+            if self.is_open:
+                return
+            # Backoff: Don't hammer binaryws while it is refusing us
+            wait = self.next_attempt - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                await self._connect()
+                self.failures = 0
+            except Exception:
+                await self.close()
+                self.failures += 1
+                self.next_attempt = time.monotonic() + min(30, 0.5 * (2 ** self.failures))
+                raise
+
+    async def _connect(self):
+        import websockets
+        self.ws = await asyncio.wait_for(
+            websockets.connect(self.pool.uri, close_timeout=5, ping_interval=20, max_size=2 ** 22),
+            timeout=10
+        )
+        self.pool.stats['connects'] += 1
+        self.reader_task = asyncio.create_task(self._reader(self.ws))
+
+        # MANDATORY: Authorize once per socket (Required for Forex/Indices)
+        if self.pool.token:
+            auth = await self.send({"authorize": self.pool.token}, timeout=10)
+            if 'error' in auth:
+                logging.warning(f"Deriv Pool: Authorization rejected on socket {self.index}: {auth['error'].get('message')}")
+        logging.info(f"Deriv Pool: Socket {self.index} online (authorized={bool(self.pool.token)}).")
+
+    async def _reader(self, ws):
+        try:
+            async for raw in ws:
+                try:
+                    msg = json.loads(raw)
+                except ValueError:
+                    continue
+                req_id = msg.get('req_id')
+                fut = self.pending.pop(req_id, None)
+                if fut and not fut.done():
+                    fut.set_result(msg)
+                elif req_id in self.streams:
+                    self.streams[req_id]._dispatch(msg)
+        except Exception as e:
+            logging.warning(f"Deriv Pool: Socket {self.index} reader stopped: {e}")
+        finally:
+            self._fail_pending(ConnectionError("Deriv socket closed"))
+            self._end_streams()
+
+    def _end_streams(self):
+        streams, self.streams = self.streams, {}
+        for sub in streams.values():
+            sub.closed.set()
+
+    def _fail_pending(self, exc):
+        pending, self.pending = self.pending, {}
+        for fut in pending.values():
+            if not fut.done():
+                fut.set_exception(exc)
+
+    async def send(self, payload: dict, timeout: float = 10, stream=None):
+        req_id = next(self.pool._req_ids)
+        fut = asyncio.get_running_loop().create_future()
+        self.pending[req_id] = fut
+        if stream is not None:
+            # Follow-up messages carry the same req_id as the opening request
+            stream.req_id = req_id
+            stream.connection = self
+            self.streams[req_id] = stream
+        try:
+            await asyncio.wait_for(self.ws.send(json.dumps({**payload, "req_id": req_id})), timeout=5)
+            return await asyncio.wait_for(fut, timeout=timeout)
+        except BaseException:
+            self.streams.pop(req_id, None)
+            raise
+        finally:
+            self.pending.pop(req_id, None)
+
+    async def close(self):
+        if self.ws is not None:
+            try:
+                await self.ws.close()
+            except Exception:
+                pass
+        if self.reader_task:
+            self.reader_task.cancel()
+            try: await self.reader_task
+            except BaseException: pass
+        self.ws = None
+        self.reader_task = None
+        self._fail_pending(ConnectionError("Deriv pool closed"))
+        self._end_streams()
+
+
+class DerivSubscription:
+    """A live `subscribe: 1` stream. `closed` is set when its socket goes away."""
+
+    def __init__(self, on_message):
+        self.on_message = on_message
+        self.closed = asyncio.Event()
+        self.req_id = None
+        self.connection = None
+        self.subscription_id = None
+
+    def _dispatch(self, msg):
+        try:
+            self.on_message(msg)
+        except Exception as e:
+            logging.error(f"Deriv Pool: Stream handler error (req_id={self.req_id}): {e}")
+
+    async def forget(self):
+        conn = self.connection
+        if conn is not None:
+            conn.streams.pop(self.req_id, None)
+            if self.subscription_id and conn.is_open:
+                try:
+                    await conn.send({"forget": self.subscription_id}, timeout=5)
+                except Exception:
+                    pass
+        self.closed.set()
+
+
+class DerivConnectionPool:
+    """
+    Long-lived, authorized Deriv WebSocket pool.
+    Many ticks_history requests are multiplexed on each socket using req_id,
+    and dead sockets are reconnected transparently on the next request.
+    """
+
+    def __init__(self, app_id: str = None, token: str = None, size: int = None, uri: str = None):
+        self.app_id = app_id or os.getenv("DERIV_APP_ID") or "121681"
+        self.token = token if token is not None else os.getenv("DERIV_API_TOKEN")
+        self.uri = uri or os.getenv("DERIV_WS_URI") or DERIV_WS_URI.format(app_id=self.app_id)
+        self.size = max(1, size or int(os.getenv("DERIV_POOL_SIZE", 2)))
+        self.connections = [_DerivConnection(self, i) for i in range(self.size)]
+        self._req_ids = itertools.count(1)
+        self.stats = {'requests': 0, 'errors': 0, 'reconnects': 0, 'connects': 0}
+
+    def _pick(self):
+        # Least-loaded socket first; open sockets win ties so we don't dial needlessly
+        return min(self.connections, key=lambda c: (len(c.pending), not c.is_open))
+
+    async def request(self, payload: dict, timeout: float = 10, retries: int = 1):
+        """Sends one request on a pooled socket and returns the matching response."""
+        from websockets.exceptions import ConnectionClosed
+        self.stats['requests'] += 1
+        for attempt in range(retries + 1):
+            conn = self._pick()
+            try:
+                await conn.ensure_open()
+                return await conn.send(payload, timeout=timeout)
+            except asyncio.TimeoutError:
+                # Slow answer is not a dead socket: Surface it to the caller as-is
+                self.stats['errors'] += 1
+                raise
+            except (ConnectionError, OSError, ConnectionClosed) as e:
+                # Socket died under us: Drop it and retry on a fresh one
+                self.stats['reconnects'] += 1
+                await conn.close()
+                if attempt >= retries:
+                    self.stats['errors'] += 1
+                    raise
+                logging.warning(f"Deriv Pool: Retrying on fresh socket after: {e}")
+            except Exception:
+                self.stats['errors'] += 1
+                raise
+
+    async def subscribe(self, payload: dict, on_message, timeout: float = 10):
+        """
+        Opens a streaming request (e.g. ticks_history with subscribe=1).
+        Returns (first_response, DerivSubscription); later messages go to on_message.
+        """
+        conn = self._pick()
+        await conn.ensure_open()
+        sub = DerivSubscription(on_message)
+        first = await conn.send({**payload, "subscribe": 1}, timeout=timeout, stream=sub)
+        if 'error' in first:
+            conn.streams.pop(sub.req_id, None)
+            sub.closed.set()
+        else:
+            sub.subscription_id = (first.get('subscription') or {}).get('id')
+        return first, sub
+
+    def get_stats(self):
+        return {
+            **self.stats,
+            "size": self.size,
+            "open_sockets": sum(1 for c in self.connections if c.is_open),
+            "in_flight": sum(len(c.pending) for c in self.connections),
+            "streams": sum(len(c.streams) for c in self.connections),
+        }
+
+    async def close(self):
+        for conn in self.connections:
+            await conn.close()
@@ -0,0 +1,111 @@
+import os
+import time
+import asyncio
+import logging
+
+# Fallback order until we have latency samples (env: comma-separated ccxt ids)
+CRYPTO_EXCHANGES = [e.strip() for e in os.getenv("CRYPTO_EXCHANGES", "binance,kucoin").split(",") if e.strip()]
+LATENCY_ALPHA = 0.2 # EWMA weight of the newest sample
+ERROR_PENALTY = 5.0 # Seconds added to the ranking score per recent error
+ERROR_HALF_LIFE = float(os.getenv("EXCHANGE_ERROR_HALF_LIFE", 120)) # Seconds for the error penalty to halve, traffic or not
+
+
+class _Venue:
+    """One long-lived ccxt async exchange plus its health stats."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.exchange = None
+        self.markets_loaded = False
+        self.lock = asyncio.Lock()
+        self.latency = None # EWMA seconds
+        self.recent_errors = 0.0 # Halves per success and per ERROR_HALF_LIFE (as of errors_at)
+        self.errors_at = time.monotonic()
+        self.calls = 0
+        self.errors = 0
+
+    async def get(self):
+        if self.exchange is not None and self.markets_loaded:
+            return self.exchange
+        async with self.lock:
+            if self.exchange is None:
+                import ccxt.async_support as ccxt_async
+                self.exchange = getattr(ccxt_async, self.name)({'enableRateLimit': True})
+            if not self.markets_loaded:
+                # Once per process: Market metadata is reused by every later call
+                await asyncio.wait_for(self.exchange.load_markets(), timeout=20)
+                self.markets_loaded = True
+        return self.exchange
+
+    def decayed_errors(self, now: float = None):
+        # Time decay: A venue ranked last after an outage is never tried first, so success alone can't clear it
+        now = time.monotonic() if now is None else now
+        return self.recent_errors * 0.5 ** ((now - self.errors_at) / ERROR_HALF_LIFE)
+
+    def record(self, elapsed: float, ok: bool):
+        self.calls += 1
+        now = time.monotonic()
+        self.recent_errors, self.errors_at = self.decayed_errors(now), now
+        if ok:
+            self.latency = elapsed if self.latency is None else (1 - LATENCY_ALPHA) * self.latency + LATENCY_ALPHA * elapsed
+            self.recent_errors *= 0.5
+        else:
+            self.errors += 1
+            self.recent_errors += 1
+
+    @property
+    def score(self):
+        # Only meaningful among measured venues: ExchangeRegistry.ranked() orders unmeasured ones by position
+        return (self.latency or 0.0) + self.decayed_errors() * ERROR_PENALTY
+
+    async def close(self):
+        if self.exchange is not None:
+            try:
+                await self.exchange.close()
+            except Exception:
+                pass
+        self.exchange = None
+        self.markets_loaded = False
+
+
+class ExchangeRegistry:
+    """
+    Shared ccxt async exchanges: Created once, markets loaded once, HTTP sessions kept alive.
+    Venues are tried fastest/healthiest first based on live latency + error stats.
+    """
+
+    def __init__(self, names=None):
+        self.venues = [_Venue(n) for n in (names or CRYPTO_EXCHANGES)]
+
+    def ranked(self):
+        # Measured venues by score, then unmeasured ones in configured fallback order
+        # (an unmeasured venue would otherwise score 0 and jump ahead of a measured primary)
+        order = {id(v): i for i, v in enumerate(self.venues)}
+        return sorted(self.venues, key=lambda v: (v.latency is None, v.score, order[id(v)]))
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = "15m", since: int = None, limit: int = 50, timeout: float = 10):
+        """Returns (venue_name, ohlcv) from the first venue that answers, or (None, [])."""
+        for venue in self.ranked():
+            start = time.perf_counter()
+            try:
+                ex = await venue.get()
+                ohlcv = await asyncio.wait_for(ex.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit), timeout=timeout)
+                venue.record(time.perf_counter() - start, ok=bool(ohlcv))
+                if ohlcv:
+                    return venue.name, ohlcv
+            except Exception as e:
+                venue.record(time.perf_counter() - start, ok=False)
+                logging.warning(f"Exchange Registry: {venue.name} failed for {symbol}: {e}")
+        return None, []
+
+    def get_stats(self):
+        return {
+            v.name: {
+                "latency_ms": round(v.latency * 1000, 1) if v.latency is not None else None,
+                "calls": v.calls, "errors": v.errors, "markets_loaded": v.markets_loaded
+            } for v in self.ranked()
+        }
+
+    async def close(self):
+        for venue in self.venues:
+            await venue.close()
@@ -1,3 +1,5 @@
+import asyncio
+import numpy as np
 import pandas as pd
 import pytz
 import logging
@@ -6,8 +8,28 @@ from engine.technical_analysis import TechnicalAnalysis
 from engine.market_structure import MarketStructure
 from engine.sentiment_analysis import SentimentAnalysis
 from engine.strategies import StrategyEngine
+from engine.indicators import trailing_mean, shift
+from engine.snapshot import BarSnapshot
+from utils.metrics import span
+
+TREND_NAMES = {1: "Bullish", -1: "Bearish", 0: "Neutral"}
+VOLATILITY_NAMES = {1: "HIGH", -1: "LOW", 0: "NORMAL"}
 
 class AISignalGenerator:
+    # Raw-score component weights and the premium-signal gate (swept by engine/optimizer.py)
+    SCORE_WEIGHTS = {"ta": 0.40, "sentiment": 0.15, "volume": 0.20, "momentum": 0.25}
+    MIN_CONFIDENCE = 65
+    # Smart expiry per volatility level: (confidence above, minutes) rows, first match wins
+    # High volatility = shorter expiry, low volatility = longer expiry
+    EXPIRY_TABLE = {
+        "HIGH": ((80, 5), (60, 3), (-1, 1)),
+        "LOW": ((85, 15), (65, 10), (-1, 5)),
+        "NORMAL": ((85, 15), (60, 5), (-1, 1)),
+    }
+    # Raw confidence -> observed win rate lookup (engine/calibration.py); None shows the raw value
+    CALIBRATOR = None
+    ENTRY_LEAD_MINUTES = 5.0 # Preparation time between a signal and its entry
+
     def __init__(self):
         self.sentiment_engine = SentimentAnalysis()
 
@@ -17,51 +39,190 @@ class AISignalGenerator:
         Combines technicals, structure, sentiment, volume analysis, and momentum.
         'fast_scan' skips slow/heavy external API calls like news sentiment for bulk analysis.
         'manual_duration' allows user to override the AI-selected expiry.
+        The I/O (news sentiment) stays here; the CPU work runs in compute_signal via the shared compute pool.
         """
         if df.empty:
             return None
 
+        # Sentiment Analysis (News & Social) - SKIP IF FAST_SCAN (Saves RAM/Speed)
+        sentiment_score = 0
+        if not fast_scan:
+            try:
+                with span("ai_stage", stage="sentiment"):
+                    sentiment_score = await self.sentiment_engine.get_sentiment(asset)
+            except Exception:
+                sentiment_score = 0
+
+        from utils.engines import get_compute_pool
+        # Includes the hop to the compute pool (thread/process queueing), unlike the CPU stages below
+        with span("ai_stage", stage="compute"):
+            return await get_compute_pool().signal(self, asset, df, sentiment_score, manual_duration)
+
+    def compute_signal(self, asset: str, df: pd.DataFrame, sentiment_score: float = 0, manual_duration: str = None):
+        """Pure CPU core of generate_signal (no I/O, safe to run in a worker thread or process)."""
+        if df.empty:
+            return None
+
         # 1. Technical Analysis (Base Layer)
         try:
-            df = TechnicalAnalysis.calculate_indicators(df)
-            ta_score = TechnicalAnalysis.get_signal_strength(df)
+            # Live stream frames arrive with incrementally updated indicators: No recompute needed
+            if not TechnicalAnalysis.has_indicators(df):
+                with span("ai_stage", stage="indicators"):
+                    df = TechnicalAnalysis.calculate_indicators(df)
+            # Last-bar snapshot: Built once, shared by every scoring layer below
+            snap = BarSnapshot(df)
+            with span("ai_stage", stage="ta_strength"):
+                ta_score = TechnicalAnalysis.get_signal_strength(df, snap)
             emergency_mode = False
         except Exception as e:
             logging.warning(f"TA Indicator Failure for {asset}: {e}. Entering EMERGENCY PRICE-ONLY MODE.")
             ta_score = 0.1 if df['close'].iloc[-1] > df['close'].iloc[-5:].mean() else -0.1
             emergency_mode = True
+            snap = BarSnapshot(df)
         
         # 2. Market Structure (Trend Detection)
-        structure = MarketStructure.detect_structure(df)
+        with span("ai_stage", stage="structure"):
+            structure = MarketStructure.detect_structure(df, snap)
         
-        # 3. Sentiment Analysis (News & Social) - SKIP IF FAST_SCAN (Saves RAM/Speed)
-        sentiment_score = 0
-        if not fast_scan:
-            try:
-                sentiment_score = await self.sentiment_engine.get_sentiment(asset)
-            except Exception:
-                sentiment_score = 0
-        
-        # 4. VOLUME ANALYSIS (Critical for smart trading)
-        volume_signal = self._analyze_volume(df)
+        # 3. Sentiment arrives from the async shell (0 on fast scans)
         
-        # 5. MOMENTUM & VELOCITY (Sensitivity to rapid changes)
-        momentum_score = self._calculate_momentum(df)
-        
-        # 6. VOLATILITY AWARENESS (ATR-based risk management)
-        volatility_level = self._get_volatility_level(df)
+        with span("ai_stage", stage="scoring"):
+            # 4. VOLUME ANALYSIS (Critical for smart trading)
+            volume_signal = self._analyze_volume(df, snap)
+            
+            # 5. MOMENTUM & VELOCITY (Sensitivity to rapid changes)
+            momentum_score = self._calculate_momentum(df, snap)
+            
+            # 6. VOLATILITY AWARENESS (ATR-based risk management)
+            volatility_level = self._get_volatility_level(df, snap)
         
         # 7. MULTI-STRATEGY QUALIFICATION [NEW]
-        strat_name, strat_dir = StrategyEngine.evaluate(df)
+        with span("ai_stage", stage="strategies"):
+            strat_name, strat_dir = StrategyEngine.evaluate(df, snap)
         
+        last_close = snap.close
+        atr = snap.atr if snap.atr is not None else last_close * 0.02
+        with span("ai_stage", stage="finalize"):
+            return self._finalize_signal(
+                asset, ta_score, sentiment_score, volume_signal, momentum_score, volatility_level,
+                strat_name, strat_dir, structure, last_close, atr, manual_duration
+            )
+
+    async def generate_signals_batch(self, frames, fast_scan: bool = True, manual_duration: str = None):
+        """
+        Cross-asset generate_signal: {asset: signal or None} for a dict (or pairs) of asset -> frame.
+        Equal-length frames are stacked into (assets, bars) arrays and run through indicators, TA strength,
+        strategies, structure, volume, momentum and volatility in one vectorized pass per length group.
+        Short or gappy frames take the regular per-asset path.
+        """
+        items = list(frames.items()) if isinstance(frames, dict) else list(frames)
+        sentiments = {}
+        if not fast_scan:
+            wanted = [asset for asset, df in items if df is not None and not df.empty]
+            with span("ai_stage", stage="batch_sentiment"):
+                scores = await asyncio.gather(*[self.sentiment_engine.get_sentiment(a) for a in wanted], return_exceptions=True)
+            sentiments = {a: (0 if isinstance(sc, Exception) else sc) for a, sc in zip(wanted, scores)}
+
+        from utils.engines import get_compute_pool
+        with span("ai_stage", stage="batch_compute"):
+            return await get_compute_pool().signals_batch(self, items, sentiments, manual_duration)
+
+    def compute_signals_batch(self, items, sentiments: dict = None, manual_duration: str = None):
+        """Pure CPU core of generate_signals_batch over (asset, frame) pairs."""
+        sentiments = sentiments or {}
+        results = {}
+        groups = {}
+        for asset, df in items:
+            if df is None or df.empty:
+                results[asset] = None
+            elif TechnicalAnalysis.batchable(df):
+                groups.setdefault(len(df), []).append((asset, df))
+            else:
+                results[asset] = self.compute_signal(asset, df, sentiments.get(asset, 0), manual_duration)
+
+        for bars, members in groups.items():
+            with span("ai_stage", stage="batch_indicators"):
+                cols, has_volume = TechnicalAnalysis.stack_frames([df for _, df in members])
+            with span("ai_stage", stage="batch_scoring"):
+                ta_scores = TechnicalAnalysis.get_signal_strength_batch(cols)[:, -1]
+                codes, directions = StrategyEngine.evaluate_batch(cols, has_volume)
+                trend, support, resistance = MarketStructure.detect_structure_batch(cols)
+                volume_signals = self._analyze_volume_batch(cols, has_volume, bars)[:, -1]
+                momentum_scores = self._calculate_momentum_batch(cols)[:, -1]
+                volatility = self._get_volatility_level_batch(cols, bars)[:, -1]
+
+            for i, (asset, _) in enumerate(members):
+                structure = {
+                    "trend": TREND_NAMES[int(trend[i, -1])], "last_bos": None, "last_choch": None,
+                    "support": support[i, -1], "resistance": resistance[i, -1]
+                }
+                strat_dir = {1: "BUY", -1: "SELL"}.get(int(directions[i, -1]), "STAY")
+                results[asset] = self._finalize_signal(
+                    asset, ta_scores[i], sentiments.get(asset, 0), volume_signals[i], momentum_scores[i],
+                    VOLATILITY_NAMES[int(volatility[i])], StrategyEngine.STRATEGY_NAMES[codes[i, -1]], strat_dir,
+                    structure, cols['close'][i, -1], cols['atr'][i, -1], manual_duration
+                )
+        return {asset: results.get(asset) for asset, _ in items}
+
+    def score_components(self, cols, has_volume, frame_bars):
+        """Parameter-free per-bar inputs of score_series (computed once and reused across optimizer configs)."""
+        return {
+            "ta": TechnicalAnalysis.get_signal_strength_batch(cols),
+            "volume": self._analyze_volume_batch(cols, has_volume, frame_bars),
+            "momentum": self._calculate_momentum_batch(cols),
+            "volatility": self._get_volatility_level_batch(cols, frame_bars),
+        }
+
+    def combine_scores(self, components, codes, strat_dirs, sentiment_score=0.0, weights=None, min_confidence=None, expiry_table=None):
+        """
+        _finalize_signal's direction / confidence / gate / expiry logic over score_components() arrays.
+        Returns arrays: direction (+1 BUY / -1 SELL), confidence, qualified (passes the gate), strategy
+        (codes into StrategyEngine.STRATEGY_NAMES), volatility (codes into VOLATILITY_NAMES), expiry_minutes.
+        """
+        w = weights or self.SCORE_WEIGHTS
+        gate = self.MIN_CONFIDENCE if min_confidence is None else min_confidence
+        raw_score = (
+            components["ta"] * w["ta"] +
+            sentiment_score * w["sentiment"] +
+            components["volume"] * w["volume"] +
+            components["momentum"] * w["momentum"]
+        )
+        direction = np.where(strat_dirs != 0, strat_dirs, np.where(raw_score >= 0, 1, -1))
+        aligned = ((direction == 1) & (raw_score > 0)) | ((direction == -1) & (raw_score < 0))
+        confidence = np.minimum(99, np.where(aligned, 65 + np.abs(raw_score) * 35, np.abs(raw_score) * 60))
+        return {
+            "direction": direction, "confidence": confidence, "qualified": confidence >= gate,
+            "strategy": codes, "volatility": components["volatility"],
+            "expiry_minutes": self._smart_expiry_batch(confidence, components["volatility"], expiry_table),
+        }
+
+    def score_series(self, cols, has_volume, frame_bars, sentiment_score=0.0, weights=None, min_confidence=None,
+                     thresholds=None, expiry_table=None):
+        """_finalize_signal's scoring at every bar of (assets, bars) arrays, for replaying history (see combine_scores)."""
+        codes, strat_dirs = StrategyEngine.evaluate_batch(cols, has_volume, thresholds)
+        return self.combine_scores(
+            self.score_components(cols, has_volume, frame_bars), codes, strat_dirs,
+            sentiment_score, weights, min_confidence, expiry_table
+        )
+
+    @classmethod
+    def entry_fields(cls) -> dict:
+        """Fresh entry time (ENTRY_LEAD_MINUTES from now), also used to re-base cached signals."""
+        entry_time = datetime.now(pytz.UTC) + timedelta(minutes=cls.ENTRY_LEAD_MINUTES)
+        return {"entry_time": entry_time.strftime("%H:%M:%S"), "entry_timestamp": int(entry_time.timestamp())}
+
+    def _finalize_signal(self, asset, ta_score, sentiment_score, volume_signal, momentum_score, volatility_level,
+                         strat_name, strat_dir, structure, last_close, atr, manual_duration=None):
+        """Turns the component scores into the final signal dict (shared by the single and batch paths)."""
         # Calculate Final Confidence (0 to 100)
         # ENHANCED WEIGHTING: Strategy confirmed by Technicals
         
+        w = self.SCORE_WEIGHTS
         raw_score = (
-            (ta_score * 0.40) + 
-            (sentiment_score * 0.15) +
-            (volume_signal * 0.20) +
-            (momentum_score * 0.25)
+            (ta_score * w["ta"]) + 
+            (sentiment_score * w["sentiment"]) +
+            (volume_signal * w["volume"]) +
+            (momentum_score * w["momentum"])
         )
         
         # DIRECTION LOGIC: Strategy is primary, but we FORCE a bias for "Anytime Signals"
@@ -80,7 +241,7 @@ class AISignalGenerator:
         confidence = min(99, confidence)
         
         # RELIABILITY FILTER: Strict threshold for Premium Signals
-        if confidence < 65:
+        if confidence < self.MIN_CONFIDENCE:
             return None # No garbage signals allowed
         
         # SMART EXPIRY based on volatility and confidence (or manual override)
@@ -90,13 +251,13 @@ class AISignalGenerator:
         else:
             expiry, expiry_minutes = self._smart_expiry(confidence, volatility_level)
         
-        # Calculate fresh entry time (increased lead time to 5.0 minutes for preparation)
-        entry_time = datetime.now(pytz.UTC) + timedelta(minutes=5.0)
+        # CALIBRATION: Gate and expiry stay on the raw score, the published confidence is the fitted win rate
+        raw_confidence = confidence
+        if self.CALIBRATOR is not None:
+            confidence = self.CALIBRATOR.calibrate(confidence, strat_name, asset)
         
-        # ADVANCED TP/SL using ATR
-        last_close = df['close'].iloc[-1]
-        atr = df['atr'].iloc[-1] if 'atr' in df.columns else last_close * 0.02
         
+        # ADVANCED TP/SL using ATR (last_close / atr come from the caller)
         # Metadata based on asset type
         is_otc = "OTC" in asset.upper()
         market_type = "OTC Proprietary" if is_otc else "Real Global Market"
@@ -107,12 +268,12 @@ class AISignalGenerator:
             "asset": asset,
             "direction": direction,
             "confidence": round(confidence, 2),
+            "raw_confidence": round(raw_confidence, 2),
             "market_type": market_type,
             "trade_type": trade_type,
             "expiry": expiry,
             "expiry_minutes": expiry_minutes,
-            "entry_time": entry_time.strftime("%H:%M:%S"),
-            "entry_timestamp": int(entry_time.timestamp()),
+            **self.entry_fields(),
             "entry": last_close,
             "tp": self._calc_smart_tp(last_close, direction, atr),
             "sl": self._calc_smart_sl(last_close, direction, atr),
@@ -128,58 +289,87 @@ class AISignalGenerator:
         
         return signal
 
-    def _analyze_volume(self, df):
+    def _analyze_volume(self, df, snap: BarSnapshot = None):
         """Volume analysis for smart entry confirmation"""
-        if 'volume' not in df.columns:
+        snap = snap or BarSnapshot(df)
+        if snap.volume is None:
             return 0
         
-        recent_vol = df['volume'].iloc[-5:].mean()
-        avg_vol = df['volume'].mean()
+        recent_vol = snap.volume_recent
+        avg_vol = snap.volume_avg
         
         # High volume = strong signal
         if recent_vol > avg_vol * 1.5:
-            return 0.8 if df['close'].iloc[-1] > df['close'].iloc[-2] else -0.8
+            return 0.8 if snap.close > snap.prev_close else -0.8
         elif recent_vol > avg_vol * 1.2:
-            return 0.4 if df['close'].iloc[-1] > df['close'].iloc[-2] else -0.4
+            return 0.4 if snap.close > snap.prev_close else -0.4
         return 0
 
-    def _calculate_momentum(self, df):
+    def _calculate_momentum(self, df, snap: BarSnapshot = None):
         """Calculate price momentum/velocity for sensitivity"""
         if len(df) < 10:
             return 0
+        snap = snap or BarSnapshot(df)
         
         # Rate of change over last 5-10 periods
-        price_change = (df['close'].iloc[-1] - df['close'].iloc[-10]) / df['close'].iloc[-10]
+        price_change = (snap.close - snap.close_10_back) / snap.close_10_back
         
         # Normalize to -1 to 1 range
         momentum = max(min(price_change * 20, 1), -1)
         return momentum
 
-    def _get_volatility_level(self, df):
+    def _get_volatility_level(self, df, snap: BarSnapshot = None):
         """Measure current volatility for risk management"""
-        if 'atr' in df.columns:
-            atr = df['atr'].iloc[-1]
-            atr_avg = df['atr'].mean()
+        snap = snap or BarSnapshot(df)
+        if snap.atr is not None:
+            atr = snap.atr
+            atr_avg = snap.atr_avg
             return "HIGH" if atr > atr_avg * 1.3 else ("LOW" if atr < atr_avg * 0.7 else "NORMAL")
         return "NORMAL"
 
+    def _analyze_volume_batch(self, cols, has_volume, frame_bars):
+        """Vectorized _analyze_volume per bar; 'avg' spans the trailing frame_bars (the whole frame at the last bar)."""
+        volume, close = cols['volume'], cols['close']
+        recent = trailing_mean(volume, 5)
+        avg = trailing_mean(volume, frame_bars)
+        rising = close > shift(close)
+        with np.errstate(invalid='ignore'):
+            signal = np.where(recent > avg * 1.5, np.where(rising, 0.8, -0.8),
+                              np.where(recent > avg * 1.2, np.where(rising, 0.4, -0.4), 0.0))
+        return np.where(np.asarray(has_volume)[:, None], signal, 0.0)
+
+    def _calculate_momentum_batch(self, cols):
+        """Vectorized _calculate_momentum per bar (0 until 10 bars)."""
+        close = cols['close']
+        back = shift(close, 9)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            momentum = np.clip((close - back) / back * 20, -1, 1)
+        momentum[..., :9] = 0
+        return momentum
+
+    def _get_volatility_level_batch(self, cols, frame_bars):
+        """Vectorized _get_volatility_level per bar: +1 HIGH / -1 LOW / 0 NORMAL (see VOLATILITY_NAMES)."""
+        atr = cols['atr']
+        avg = trailing_mean(atr, frame_bars)
+        return np.where(atr > avg * 1.3, 1, np.where(atr < avg * 0.7, -1, 0))
+
     def _smart_expiry(self, confidence, volatility):
-        """SMART expiry based on confidence AND volatility"""
-        if volatility == "HIGH":
-            # High volatility = shorter expiry
-            if confidence > 80: return "5 Minutes", 5
-            elif confidence > 60: return "3 Minutes", 3
-            else: return "1 Minute", 1
-        elif volatility == "LOW":
-            # Low volatility = longer expiry
-            if confidence > 85: return "15 Minutes", 15
-            elif confidence > 65: return "10 Minutes", 10
-            else: return "5 Minutes", 5
-        else:
-            # Normal volatility
-            if confidence > 85: return "15 Minutes", 15
-            elif confidence > 60: return "5 Minutes", 5
-            else: return "1 Minute", 1
+        """SMART expiry based on confidence AND volatility (EXPIRY_TABLE)"""
+        rows = self.EXPIRY_TABLE.get(volatility, self.EXPIRY_TABLE["NORMAL"])
+        minutes = next((m for floor, m in rows if confidence > floor), rows[-1][1])
+        return ("1 Minute" if minutes == 1 else f"{minutes} Minutes"), minutes
+
+    def _smart_expiry_batch(self, confidence, volatility, table=None):
+        """Vectorized _smart_expiry (minutes) for volatility codes +1 HIGH / -1 LOW / 0 NORMAL."""
+        table = table or self.EXPIRY_TABLE
+        out = np.zeros(np.shape(confidence), dtype=int)
+        for code, name in VOLATILITY_NAMES.items():
+            rows = table.get(name, table["NORMAL"])
+            minutes = np.full(out.shape, rows[-1][1])
+            for floor, m in reversed(rows):
+                minutes = np.where(confidence > floor, m, minutes)
+            out = np.where(volatility == code, minutes, out)
+        return out
 
     def _parse_manual_duration(self, duration_str: str) -> int:
         """Parses durations like '5s', '1m', '15m' into minutes (or ticks for seconds)."""
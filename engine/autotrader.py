@@ -1,7 +1,9 @@
 import asyncio
 import logging
 from datetime import datetime
-from utils.db import DBManager, User, TradeExecution
+from sqlalchemy import select
+from utils.db import User, TradeExecution
+from utils.async_db import AsyncDBManager
 from data.collector import DataCollector
 from engine.ai_generator import AISignalGenerator
 from brokers.deriv_broker import DerivBroker
@@ -22,29 +24,50 @@ class AutoTrader:
         self.is_running = True
         logging.info("AutoTrader Engine Started.")
         
-        while self.is_running:
-            try:
-                await self._run_scan_cycle()
-            except Exception as e:
-                logging.error(f"AutoTrader Cycle Error: {e}")
-            # Lion RAM Shield: Purge all caches and reclaim memory
-            from bot.handlers import global_gc
-            global_gc()
-            
-            # Wait for next cycle (e.g., every 5 minutes)
-            await asyncio.sleep(300)
+        # With the scan scheduler running, trade on its fresh closed-bar signals instead of rescanning
+        from utils.engines import get_scan_scheduler
+        scheduler = get_scan_scheduler()
+        queue = scheduler.subscribe() if scheduler.active else None
+        try:
+            while self.is_running:
+                if queue is not None:
+                    try:
+                        # The timeout still refreshes the tracked user assets every 5 minutes
+                        published = await asyncio.wait_for(queue.get(), timeout=300)
+                    except asyncio.TimeoutError:
+                        published = {}
+                    try:
+                        await self._run_scan_cycle(published)
+                    except Exception as e:
+                        logging.error(f"AutoTrader Cycle Error: {e}")
+                    continue
+                
+                try:
+                    await self._run_scan_cycle()
+                except Exception as e:
+                    logging.error(f"AutoTrader Cycle Error: {e}")
+                # Lion RAM Shield: Purge caches once RSS is over budget
+                from bot.handlers import global_gc
+                global_gc()
+                
+                # Wait for next cycle (e.g., every 5 minutes)
+                await asyncio.sleep(300)
+        finally:
+            scheduler.unsubscribe(queue)
 
     async def stop(self):
         self.is_running = False
         logging.info("AutoTrader Engine Stopped.")
 
-    async def _run_scan_cycle(self):
-        """Optimized: Scans unique assets once and distributes results to all users."""
-        db = DBManager()
-        users = db.session.query(User).filter(User.autotrade_enabled == True).all()
+    async def _run_scan_cycle(self, published: dict = None):
+        """
+        Optimized: Scans unique assets once and distributes results to all users.
+        'published' is a scan scheduler batch ({symbol: signal}); the users' assets are tracked instead of fetched.
+        """
+        async with AsyncDBManager() as db:
+            users = await db.all(select(User).where(User.autotrade_enabled == True))
         
         if not users:
-            db.close()
             return
 
         # 1. Identify unique assets to scan
@@ -54,52 +77,46 @@ class AutoTrader:
             all_unique_assets.update(assets)
 
         if not all_unique_assets:
-            db.close()
             return
 
-        logging.info(f"AutoTrader: Batched scanning for {len(all_unique_assets)} unique assets across {len(users)} users.")
+        # 2a. Scheduler-fed: Only assets with a new closed bar carry a (fresh) signal
+        if published is not None:
+            from utils.engines import get_scan_scheduler
+            get_scan_scheduler().track(all_unique_assets)
+            scan_results = {asset: signal for asset, signal in published.items() if signal and asset in all_unique_assets}
+        else:
+            logging.info(f"AutoTrader: Batched scanning for {len(all_unique_assets)} unique assets across {len(users)} users.")
 
-        # 2. Sequential Scanning (Permanent RAM Shield)
-        scan_results = {}
-        import gc
-        for asset in all_unique_assets:
+            # 2b. Pipelined Scanning: Overlapping fetches + micro-batched vectorized evaluation for every unique asset
+            scan_results = {}
             try:
-                # Use sequential scan to prevent OOM
-                df = await DataCollector.fetch_data(asset)
-                if df.empty: continue
-                
-                signal = await self.ai.generate_signal(asset, df, fast_scan=True)
-                if signal:
-                    scan_results[asset] = signal
-                
-                # Cleanup and reclaim RAM immediately
-                del df
-                gc.collect() 
+                from engine.scan_pipeline import ScanPipeline
+                from engine.scan_scheduler import SCAN_FAST_SCAN # Score like the scheduler-fed path (2a)
+                signals = await ScanPipeline(self.ai).run(list(all_unique_assets), fast_scan=SCAN_FAST_SCAN)
+                scan_results = {asset: signal for asset, signal in signals.items() if signal}
             except Exception as e:
-                logging.error(f"AutoTrader Sequential Scan Error ({asset}): {e}")
-                continue
+                logging.error(f"AutoTrader Batched Scan Error: {e}")
 
         # 3. Distribute Results and Execute
         today = datetime.now().strftime("%Y-%m-%d")
-        for user in users:
-            user_assets = [a.strip() for a in user.autotrade_assets.split(",")]
-            for asset in user_assets:
-                signal = scan_results.get(asset)
-                if not signal: continue
+        async with AsyncDBManager() as db:
+            for user in users:
+                user_assets = [a.strip() for a in user.autotrade_assets.split(",")]
+                for asset in user_assets:
+                    signal = scan_results.get(asset)
+                    if not signal: continue
 
-                # Decision Logic
-                if signal['confidence'] >= user.autotrade_min_confidence:
-                    # Check daily limit using SQLAlchemy ORM class
-                    trade_count = db.session.query(TradeExecution).filter(
-                        TradeExecution.user_id == str(user.telegram_id),
-                        TradeExecution.timestamp >= datetime.strptime(today, "%Y-%m-%d")
-                    ).count()
+                    # Decision Logic (the user's threshold is on the raw score, not the calibrated win rate)
+                    if signal['raw_confidence'] >= user.autotrade_min_confidence:
+                        # Check daily limit using SQLAlchemy ORM class
+                        trade_count = await db.count(TradeExecution,
+                            TradeExecution.user_id == str(user.telegram_id),
+                            TradeExecution.timestamp >= datetime.strptime(today, "%Y-%m-%d")
+                        )
                     
-                    if trade_count < user.autotrade_max_trades:
-                        logging.info(f"AutoTrader: Executing {signal['direction']} for {user.telegram_id} on {asset} (Conf: {signal['confidence']}%)")
-                        await self._execute_for_user(user, signal)
-        
-        db.close()
+                        if trade_count < user.autotrade_max_trades:
+                            logging.info(f"AutoTrader: Executing {signal['direction']} for {user.telegram_id} on {asset} (Conf: {signal['confidence']}%)")
+                            await self._execute_for_user(user, signal)
 
     async def _execute_for_user(self, user, signal):
         """Executes the trade based on user's broker connectivity."""
@@ -119,7 +136,7 @@ class AutoTrader:
         if result['status'] == "success":
             logging.info(f"AutoTrader: Trade successful for {user.telegram_id}: {result['contract_id']}")
             # We could log this to trade_executions table if needed, 
-            # but currently we don't have a direct helper in DBManager for it yet.
+            # but currently we don't have a direct helper in AsyncDBManager for it yet.
         else:
             logging.warning(f"AutoTrader: Trade failed for {user.telegram_id}: {result.get('message')}")
 
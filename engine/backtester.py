@@ -0,0 +1,198 @@
+import math
+import time
+import logging
+import numpy as np
+import pandas as pd
+
+from engine.indicators import compute_indicators, COLUMNS, ROW, MIN_BARS
+from engine.ai_generator import AISignalGenerator, VOLATILITY_NAMES
+from engine.strategies import StrategyEngine
+from data.candle_store import CANDLE_STORE_WINDOW
+
+TPSL_MAX_HOLD = 120 # Bars a TP/SL trade may stay open before it is closed at market
+
+
+def history_arrays(df: pd.DataFrame):
+    """(cols, has_volume) for one frame, shaped (1, bars) like the batch scoring functions expect."""
+    cols = {c: df[c].to_numpy(dtype=float)[None, :] for c in ('open', 'high', 'low', 'close')}
+    has_volume = 'volume' in df.columns
+    cols['volume'] = df['volume'].to_numpy(dtype=float)[None, :] if has_volume else np.full(cols['close'].shape, np.nan)
+    out = compute_indicators(cols['high'], cols['low'], cols['close'])
+    cols.update({name: out[ROW[name]] for name in COLUMNS})
+    return cols, np.array([has_volume])
+
+
+def binary_outcomes(close: np.ndarray, entry: np.ndarray, direction: np.ndarray, expiry_bars: np.ndarray):
+    """
+    Fixed-expiry (binary option) result per signal: the close `expiry_bars` after entry vs. the entry close.
+    Returns (outcome +1 WIN / -1 LOSS / 0 DRAW, signed move in %, valid); signals expiring past the data are invalid.
+    """
+    exit_idx = entry + expiry_bars
+    valid = exit_idx < len(close)
+    exit_close = close[np.minimum(exit_idx, len(close) - 1)]
+    move = (exit_close - close[entry]) / close[entry] * 100 * direction
+    return np.sign(move).astype(int), move, valid
+
+
+def doubling_tables(x: np.ndarray, levels: int, func, neutral: float):
+    """tables[k][i] = func over x[i:i + 2**k] (neutral past the end), for first-touch binary lifting."""
+    tables = [np.append(x, neutral)]
+    for k in range(1, levels):
+        prev, span = tables[-1], 1 << (k - 1)
+        tables.append(func(prev, np.append(prev[span:], np.full(span, neutral))))
+    return tables
+
+
+def first_touch(tables, entry: np.ndarray, horizon, threshold: np.ndarray, above: bool) -> np.ndarray:
+    """
+    First offset (1..horizon) after entry whose bar reaches threshold (x >= threshold if above, else <=);
+    horizon + 1 when it is never reached. One gather per table level instead of scanning every bar.
+    'horizon' is one bar count or one per entry (the tables need 2**(levels-1) >= the largest).
+    """
+    n = len(tables[0]) - 1
+    clear = np.zeros(len(entry), dtype=int) # Bars after entry known not to touch
+    for k in reversed(range(len(tables))):
+        span = 1 << k
+        idx = np.minimum(entry + 1 + clear, n)
+        block = tables[k][idx]
+        # NaN thresholds (no ATR yet) never touch
+        untouched = ~(block >= threshold) if above else ~(block <= threshold)
+        clear = np.where((clear + span <= horizon) & untouched, clear + span, clear)
+    return clear + 1
+
+
+def tp_sl_outcomes(high, low, close, entry, direction, tp, sl, horizon: int = TPSL_MAX_HOLD):
+    """
+    First touch of TP or SL within `horizon` bars after entry (same-bar touches count as SL, conservatively).
+    Returns (outcome +1 TP / -1 SL / 0 TIMEOUT, signed move in %, bars held).
+    """
+    levels = max(1, horizon.bit_length())
+    buy = direction == 1
+    # BUY: TP on highs, SL on lows; SELL the other way round
+    on_high = first_touch(doubling_tables(high, levels, np.maximum, -np.inf), entry, horizon, np.where(buy, tp, sl), above=True)
+    on_low = first_touch(doubling_tables(low, levels, np.minimum, np.inf), entry, horizon, np.where(buy, sl, tp), above=False)
+    first_tp, first_sl = np.where(buy, on_high, on_low), np.where(buy, on_low, on_high)
+
+    won = first_tp < first_sl
+    lost = ~won & (first_sl <= horizon)
+    last = np.minimum(horizon, len(close) - 1 - entry) # Timeout: Closed at market on the final bar available
+    exit_price = np.where(won, tp, np.where(lost, sl, close[entry + last]))
+    held = np.where(won, first_tp, np.where(lost, first_sl, last))
+    move = (exit_price - close[entry]) / close[entry] * 100 * direction
+    return np.where(won, 1, np.where(lost, -1, 0)), move, held
+
+
+class Backtester:
+    """
+    Replays candle history through the live signal pipeline (TechnicalAnalysis, StrategyEngine and the
+    AISignalGenerator scoring/gate) bar by bar, using one indicator pass per series and vectorized
+    scoring + outcome evaluation instead of calling generate_signal per bar.
+    Whole-frame averages use the trailing `frame_bars` (the window the live fetch hands the engines).
+    Indicators run over the full history, like the live candle stream.
+    """
+
+    def __init__(self, ai: AISignalGenerator = None, frame_bars: int = CANDLE_STORE_WINDOW, min_confidence: float = None,
+                 weights: dict = None, every: int = 1, expiry_minutes: int = None, max_hold: int = TPSL_MAX_HOLD,
+                 thresholds: dict = None, expiry_table: dict = None):
+        self.ai = ai or AISignalGenerator()
+        self.frame_bars = frame_bars
+        self.min_confidence = min_confidence
+        self.weights = weights
+        self.every = max(1, every) # Scan cadence in bars
+        self.expiry_minutes = expiry_minutes # Fixed expiry override (manual_duration)
+        self.max_hold = max_hold
+        self.thresholds = thresholds # StrategyEngine.THRESHOLDS override
+        self.expiry_table = expiry_table # AISignalGenerator.EXPIRY_TABLE override
+
+    def run(self, symbol: str, df: pd.DataFrame, granularity: int, cols=None) -> pd.DataFrame:
+        """One trade row per qualified signal of the series. `cols` reuses precomputed history_arrays()."""
+        warmup = max(self.frame_bars, MIN_BARS)
+        if df is None or len(df) <= warmup:
+            return pd.DataFrame()
+        if cols is None:
+            df = df.dropna(subset=['open', 'high', 'low', 'close']) # The kernel needs gap-free candles
+            cols, has_volume = history_arrays(df)
+        else:
+            cols, has_volume = cols
+        scores = self.ai.score_series(cols, has_volume, self.frame_bars, weights=self.weights, min_confidence=self.min_confidence,
+                                      thresholds=self.thresholds, expiry_table=self.expiry_table)
+
+        bars = np.arange(len(df))
+        picked = scores['qualified'][0] & (bars >= warmup) & (bars % self.every == 0)
+        entry = bars[picked]
+        if not len(entry):
+            return pd.DataFrame()
+
+        close, high, low, atr = (cols[c][0] for c in ('close', 'high', 'low', 'atr'))
+        direction = scores['direction'][0, entry]
+        expiry = np.full(len(entry), self.expiry_minutes) if self.expiry_minutes else scores['expiry_minutes'][0, entry]
+        expiry_bars = np.maximum(1, np.ceil(expiry * 60 / granularity)).astype(int)
+        binary, binary_move, valid = binary_outcomes(close, entry, direction, expiry_bars)
+
+        # ATR-based TP/SL exactly as _calc_smart_tp / _calc_smart_sl
+        price = close[entry]
+        tp = price + direction * atr[entry] * 2.5
+        sl = price - direction * atr[entry] * 1.2
+        tpsl, tpsl_move, held = tp_sl_outcomes(high, low, close, entry, direction, tp, sl, self.max_hold)
+
+        trades = pd.DataFrame({
+            "symbol": symbol,
+            "time": df.index[entry],
+            "direction": np.where(direction == 1, "BUY", "SELL"),
+            "confidence": np.round(scores['confidence'][0, entry], 2),
+            "strategy": np.asarray(StrategyEngine.STRATEGY_NAMES)[scores['strategy'][0, entry]],
+            # Codes 0/+1/-1 index NORMAL/HIGH/LOW directly (-1 is the last entry)
+            "volatility": np.array([VOLATILITY_NAMES[c] for c in (0, 1, -1)])[scores['volatility'][0, entry]],
+            "expiry_minutes": expiry,
+            "entry": price,
+            "binary_outcome": binary,
+            "binary_move": binary_move,
+            "tp": tp,
+            "sl": sl,
+            "tpsl_outcome": tpsl,
+            "tpsl_move": tpsl_move,
+            "bars_held": held,
+        })
+        # Binary signals whose expiry lies beyond the data have no result yet
+        return trades[valid].reset_index(drop=True)
+
+    def run_many(self, frames: dict, granularity: int) -> pd.DataFrame:
+        """Backtests {symbol: df} and concatenates the trades."""
+        results = []
+        for symbol, df in frames.items():
+            start = time.perf_counter()
+            trades = self.run(symbol, df, granularity)
+            logging.info(f"Backtest: {symbol} {len(df)} bars -> {len(trades)} signals in {time.perf_counter() - start:.2f}s")
+            if not trades.empty:
+                results.append(trades)
+        return pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+
+    @staticmethod
+    def summarize(trades: pd.DataFrame, by: str = "strategy") -> pd.DataFrame:
+        """
+        Win rates per group: binary (draws excluded) and TP/SL (timeouts excluded), plus the average signed moves.
+        'by' is any trade column, e.g. strategy, symbol, volatility or a confidence bucket.
+        """
+        if trades.empty:
+            return pd.DataFrame()
+        t = trades.assign(
+            binary_win=trades['binary_outcome'] == 1, binary_decided=trades['binary_outcome'] != 0,
+            tp_hit=trades['tpsl_outcome'] == 1, tpsl_decided=trades['tpsl_outcome'] != 0,
+        )
+        groups = [t.groupby(by), t.assign(**{by: "ALL"}).groupby(by)]
+        rows = []
+        for g in groups:
+            rows.append(pd.DataFrame({
+                "signals": g.size(),
+                "binary_win_rate": g['binary_win'].sum() / g['binary_decided'].sum().replace(0, math.nan) * 100,
+                "avg_binary_move": g['binary_move'].mean(),
+                "tp_rate": g['tp_hit'].sum() / g['tpsl_decided'].sum().replace(0, math.nan) * 100,
+                "avg_tpsl_move": g['tpsl_move'].mean(),
+                "avg_bars_held": g['bars_held'].mean(),
+            }))
+        return pd.concat(rows).round(2)
+
+    @staticmethod
+    def confidence_buckets(trades: pd.DataFrame, edges=(65, 75, 85, 100)) -> pd.Series:
+        """Confidence band labels for summarize(by=...)."""
+        return pd.cut(trades['confidence'], bins=list(edges), right=False).astype(str)
@@ -0,0 +1,119 @@
+import os
+import json
+import bisect
+import logging
+import datetime
+import numpy as np
+
+from engine.ai_generator import AISignalGenerator
+
+# Fitted by scripts/fit_calibration.py on resolved signals; missing file = raw confidence is shown
+CALIBRATION_PATH = os.getenv("CALIBRATION_PATH") or ('/data/calibration.json' if os.path.exists('/data') else 'calibration.json')
+CALIBRATION_MIN_SAMPLES = int(os.getenv("CALIBRATION_MIN_SAMPLES", 50)) # Per (strategy, asset class) table
+CALIBRATION_MIN_BLOCK = 20 # Signals per step, so a few lucky extremes can't read as 100%
+
+ANY = "*"
+
+
+def asset_class(symbol: str) -> str:
+    from data.collector import DataCollector
+    return DataCollector.detect_asset_type(symbol)
+
+
+def fit_isotonic(confidence: np.ndarray, won: np.ndarray, min_block: int = CALIBRATION_MIN_BLOCK):
+    """
+    Pool-adjacent-violators fit of win rate vs. raw confidence, with at least `min_block` signals per step.
+    Returns (knots, values): the highest raw confidence of each block and its win rate in %, both ascending.
+    """
+    xs, inverse = np.unique(np.asarray(confidence, dtype=float), return_inverse=True)
+    wins = np.bincount(inverse, weights=np.asarray(won, dtype=float))
+    counts = np.bincount(inverse).astype(float)
+
+    # Blocks as [upper knot, wins, count]; merge backwards while the rate decreases or a block is too small
+    blocks = []
+
+    def merge():
+        x_hi, w_hi, c_hi = blocks.pop()
+        blocks[-1] = [x_hi, blocks[-1][1] + w_hi, blocks[-1][2] + c_hi]
+
+    for x, w, c in zip(xs, wins, counts):
+        blocks.append([x, w, c])
+        while len(blocks) > 1 and (blocks[-2][2] < min_block or blocks[-2][1] / blocks[-2][2] >= blocks[-1][1] / blocks[-1][2]):
+            merge()
+    # Pooling a short top block into its neighbour keeps the rates ascending
+    while len(blocks) > 1 and blocks[-1][2] < min_block:
+        merge()
+    knots = [round(float(b[0]), 2) for b in blocks]
+    values = [round(float(b[1] / b[2] * 100), 2) for b in blocks]
+    return knots, values
+
+
+def fit_calibration(confidence, strategy, classes, won, min_samples: int = CALIBRATION_MIN_SAMPLES) -> dict:
+    """
+    Isotonic tables per (strategy, asset class), per strategy and overall, for every group with
+    at least `min_samples` decided signals (draws excluded by the caller).
+    """
+    confidence, won = np.asarray(confidence, dtype=float), np.asarray(won, dtype=bool)
+    strategy, classes = np.asarray(strategy, dtype=object), np.asarray(classes, dtype=object)
+    groups = {f"{ANY}|{ANY}": np.ones(len(confidence), dtype=bool)}
+    for name in set(strategy):
+        groups[f"{name}|{ANY}"] = strategy == name
+        for cls in set(classes[strategy == name]):
+            groups[f"{name}|{cls}"] = (strategy == name) & (classes == cls)
+
+    tables = {}
+    for key, mask in groups.items():
+        if mask.sum() >= min_samples:
+            knots, values = fit_isotonic(confidence[mask], won[mask])
+            tables[key] = {"knots": knots, "values": values, "samples": int(mask.sum())}
+    return {
+        "fitted_at": datetime.datetime.utcnow().isoformat(),
+        "samples": int(len(confidence)),
+        "min_samples": min_samples,
+        "tables": tables,
+    }
+
+
+class ConfidenceCalibrator:
+    """
+    Precomputed step lookup raw confidence -> observed win rate. Picks the most specific table
+    (strategy + asset class, then strategy, then overall); applying it is one binary search.
+    """
+
+    def __init__(self, tables: dict):
+        self.tables = {key: (t["knots"], t["values"]) for key, t in tables.items() if t.get("knots")}
+        self._classes = {} # symbol -> asset class
+
+    def table_for(self, strategy: str, symbol: str):
+        cls = self._classes.get(symbol)
+        if cls is None:
+            cls = self._classes[symbol] = asset_class(symbol)
+        for key in (f"{strategy}|{cls}", f"{strategy}|{ANY}", f"{ANY}|{ANY}"):
+            table = self.tables.get(key)
+            if table is not None:
+                return table
+        return None
+
+    def calibrate(self, confidence: float, strategy: str, symbol: str) -> float:
+        table = self.table_for(strategy, symbol)
+        if table is None:
+            return confidence
+        knots, values = table
+        # First block whose upper knot covers the raw value; beyond the last knot keeps the top rate
+        return min(99, values[min(bisect.bisect_left(knots, confidence), len(values) - 1)])
+
+
+def load_calibration(path: str = CALIBRATION_PATH):
+    """Installs the fitted tables on AISignalGenerator. Returns the calibrator, or None (raw confidence stays)."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            fitted = json.load(f)
+        calibrator = ConfidenceCalibrator(fitted["tables"])
+        AISignalGenerator.CALIBRATOR = calibrator if calibrator.tables else None
+        logging.info(f"Calibration: {len(calibrator.tables)} tables from {path} ({fitted.get('samples')} signals, fitted {fitted.get('fitted_at')})")
+        return AISignalGenerator.CALIBRATOR
+    except Exception as e:
+        logging.error(f"Calibration: Could not load {path}: {e}. Using raw confidence.")
+        return None
@@ -0,0 +1,180 @@
+import os
+import time
+import asyncio
+import logging
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+# inline = on the event loop (tiny instances), thread = worker threads (NumPy kernels release the GIL),
+# process = worker processes fed through shared memory
+SIGNAL_COMPUTE_MODE = os.getenv("SIGNAL_COMPUTE_MODE", "thread").lower()
+SIGNAL_COMPUTE_WORKERS = int(os.getenv("SIGNAL_COMPUTE_WORKERS", 2))
+
+_INDEX_NONE, _INDEX_DATETIME = 0, 1
+
+
+def pack_frames(items):
+    """
+    Copies the numeric columns of (asset, frame) pairs into one shared memory block.
+    Returns (block, layout); layout rows are (asset, offset, rows, columns, index kind), None for empty frames.
+    """
+    prepared, total = [], 0
+    for asset, df in items:
+        if df is None or df.empty:
+            prepared.append((asset, None))
+            continue
+        numeric = df.select_dtypes(include='number')
+        values = numeric.to_numpy(dtype=float)
+        if isinstance(df.index, pd.DatetimeIndex):
+            idx = df.index.tz_convert('UTC').tz_localize(None) if df.index.tz is not None else df.index
+            index, kind = idx.asi8, _INDEX_DATETIME
+        else:
+            index, kind = np.arange(len(df), dtype='int64'), _INDEX_NONE
+        prepared.append((asset, (values, index, list(numeric.columns), kind)))
+        total += values.nbytes + index.nbytes
+
+    block = shared_memory.SharedMemory(create=True, size=max(total, 1))
+    layout, offset = [], 0
+    for asset, frame in prepared:
+        if frame is None:
+            layout.append((asset, None))
+            continue
+        values, index, columns, kind = frame
+        rows = len(index)
+        np.ndarray(rows, dtype='int64', buffer=block.buf, offset=offset)[:] = index
+        np.ndarray(values.shape, dtype=float, buffer=block.buf, offset=offset + index.nbytes)[:] = values
+        layout.append((asset, (offset, rows, columns, kind)))
+        offset += index.nbytes + values.nbytes
+    return block, layout
+
+
+def unpack_frames(name: str, layout):
+    """Worker side of pack_frames: (asset, frame) pairs copied out of the block, which is closed again."""
+    try:
+        block = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError: # Python < 3.13: No track flag
+        block = shared_memory.SharedMemory(name=name)
+    items = []
+    try:
+        for asset, entry in layout:
+            if entry is None:
+                items.append((asset, pd.DataFrame()))
+                continue
+            offset, rows, columns, kind = entry
+            index = np.ndarray(rows, dtype='int64', buffer=block.buf, offset=offset).copy()
+            values = np.ndarray((rows, len(columns)), dtype=float, buffer=block.buf, offset=offset + rows * 8).copy()
+            index = pd.to_datetime(index) if kind == _INDEX_DATETIME else None
+            items.append((asset, pd.DataFrame(values, index=index, columns=columns)))
+    finally:
+        block.close()
+    return items
+
+
+# --- Process workers: One generator per process, configured like the parent ---
+_worker_ai = None
+
+
+def _init_worker(config: dict, calibration: dict):
+    global _worker_ai
+    from engine.signal_config import apply_config
+    from engine.ai_generator import AISignalGenerator
+    apply_config(config)
+    if calibration:
+        from engine.calibration import ConfidenceCalibrator
+        AISignalGenerator.CALIBRATOR = ConfidenceCalibrator(calibration)
+    _worker_ai = AISignalGenerator()
+
+
+def _worker_batch(name: str, layout, sentiments: dict, manual_duration):
+    return _worker_ai.compute_signals_batch(unpack_frames(name, layout), sentiments, manual_duration)
+
+
+class ComputePool:
+    """
+    Runs the CPU core of signal generation (AISignalGenerator.compute_signal / compute_signals_batch)
+    off the event loop, so bulk scans don't stall Telegram polling, the API and WebSocket heartbeats.
+    Process mode ships candles as raw float arrays in shared memory instead of pickled DataFrames.
+    """
+
+    def __init__(self, mode: str = SIGNAL_COMPUTE_MODE, workers: int = SIGNAL_COMPUTE_WORKERS):
+        if mode not in ("inline", "thread", "process"):
+            logging.warning(f"Compute Pool: Unknown SIGNAL_COMPUTE_MODE '{mode}', using inline.")
+            mode = "inline"
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.executor = None
+        self.stats = {'calls': 0, 'assets': 0, 'busy_seconds': 0.0, 'fallbacks': 0, 'restarts': 0}
+
+    def _executor(self):
+        if self.executor is None:
+            if self.mode == "thread":
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="signal-compute")
+            else:
+                import multiprocessing
+                from engine.signal_config import current_config
+                from engine.ai_generator import AISignalGenerator
+                calibrator = AISignalGenerator.CALIBRATOR
+                calibration = {key: {"knots": k, "values": v} for key, (k, v) in calibrator.tables.items()} if calibrator else None
+                # forkserver: Workers start from a clean single-threaded server, not a copy of the running bot
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context(method),
+                    initializer=_init_worker, initargs=(current_config(), calibration)
+                )
+            logging.info(f"🧮 Compute Pool: {self.workers} {self.mode} workers for signal computation")
+        return self.executor
+
+    async def signal(self, ai, asset: str, df: pd.DataFrame, sentiment_score: float = 0, manual_duration: str = None):
+        results = await self.signals_batch(ai, [(asset, df)], {asset: sentiment_score}, manual_duration, single=True)
+        return results.get(asset)
+
+    async def signals_batch(self, ai, items, sentiments: dict = None, manual_duration: str = None, single: bool = False):
+        """{asset: signal or None} for (asset, frame) pairs, computed according to the pool mode."""
+        items = list(items)
+        self.stats['calls'] += 1
+        self.stats['assets'] += len(items)
+        start = time.perf_counter()
+        try:
+            if self.mode == "inline":
+                return self._inline(ai, items, sentiments, manual_duration, single)
+            loop = asyncio.get_running_loop()
+            if self.mode == "thread":
+                return await loop.run_in_executor(
+                    self._executor(), self._inline, ai, items, sentiments, manual_duration, single
+                )
+            return await self._in_process(loop, ai, items, sentiments, manual_duration)
+        finally:
+            self.stats['busy_seconds'] += time.perf_counter() - start
+
+    @staticmethod
+    def _inline(ai, items, sentiments, manual_duration, single):
+        if single:
+            asset, df = items[0]
+            return {asset: ai.compute_signal(asset, df, (sentiments or {}).get(asset, 0), manual_duration)}
+        return ai.compute_signals_batch(items, sentiments, manual_duration)
+
+    async def _in_process(self, loop, ai, items, sentiments, manual_duration):
+        block, layout = pack_frames(items)
+        try:
+            return await loop.run_in_executor(self._executor(), _worker_batch, block.name, layout, sentiments, manual_duration)
+        except BrokenProcessPool as e:
+            # A worker died (e.g. OOM-killed): Serve this call inline, rebuild the pool for the next one
+            logging.error(f"Compute Pool: Worker pool broke ({e}). Computing inline and restarting the pool.")
+            self.stats['fallbacks'] += 1
+            self.stats['restarts'] += 1
+            self.executor = None
+            return ai.compute_signals_batch(items, sentiments, manual_duration)
+        finally:
+            block.close()
+            block.unlink()
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def get_stats(self):
+        return {**self.stats, "mode": self.mode, "workers": self.workers, "busy_seconds": round(self.stats['busy_seconds'], 3)}
@@ -0,0 +1,268 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Output layout (same column names the 'ta' pipeline produced)
+COLUMNS = (
+    'RSI_14', 'MACD_12_26_9', 'MACDs_12_26_9',
+    'BBL_20_2.0', 'BBM_20_2.0', 'BBU_20_2.0',
+    'EMA_9', 'EMA_21', 'EMA_50', 'EMA_200',
+    'STOCHk_14_3_3', 'STOCHd_14_3_3',
+    'ADX_14', 'ADX_pos', 'ADX_neg', 'atr',
+)
+ROW = {name: i for i, name in enumerate(COLUMNS)}
+
+RSI_WINDOW = 14
+MACD_FAST, MACD_SLOW, MACD_SIGN = 12, 26, 9
+BB_WINDOW, BB_DEV = 20, 2
+EMA_WINDOWS = (9, 21, 50, 200)
+STOCH_WINDOW, STOCH_SMOOTH = 14, 3
+ADX_WINDOW = 14
+ATR_WINDOW = 14
+# ADX/ATR need two full windows of history ('ta' raises below this)
+MIN_BARS = 2 * ADX_WINDOW
+
+_CHUNK = 64
+_chunk_cache = {}
+
+
+def _chunk_matrices(c: float):
+    """T[j, k] = c^(j-k) (k <= j) and P[j] = c^(j+1) for one recurrence chunk."""
+    mats = _chunk_cache.get(c)
+    if mats is None:
+        j = np.arange(_CHUNK)
+        lag = j[:, None] - j[None, :]
+        T = np.where(lag >= 0, c ** np.maximum(lag, 0), 0.0)
+        mats = _chunk_cache[c] = (np.ascontiguousarray(T.T), c ** (j + 1))
+    return mats
+
+
+def linear_filter(x: np.ndarray, c: float, b: float, y0, out: np.ndarray) -> np.ndarray:
+    """
+    y[t] = c * y[t-1] + b * x[t] along the last axis with y[-1] = y0, written into `out`.
+    Solved in closed form per 64-bar chunk (one small matmul each), so every
+    EWM/Wilder smoothing below runs without a Python loop over bars and on 2-D stacks alike.
+    """
+    n = x.shape[-1]
+    if n == 0:
+        return out
+    TT, P = _chunk_matrices(c)
+    prev = np.asarray(y0, dtype=float)
+    for s in range(0, n, _CHUNK):
+        e = min(s + _CHUNK, n)
+        L = e - s
+        seg = out[..., s:e]
+        np.matmul(x[..., s:e], TT[:L, :L], out=seg)
+        seg *= b
+        seg += prev[..., None] * P[:L]
+        prev = seg[..., -1]
+    return out
+
+
+def _ema_raw(x: np.ndarray, window: int, out: np.ndarray, start: int = 0) -> np.ndarray:
+    """Unmasked EWM recursion seeded at x[start] (out[..., :start] is left untouched)."""
+    a = 2.0 / (window + 1)
+    out[..., start] = x[..., start]
+    linear_filter(x[..., start + 1:], 1 - a, a, x[..., start], out[..., start + 1:])
+    return out
+
+
+def ema(x: np.ndarray, window: int, out: np.ndarray, start: int = 0) -> np.ndarray:
+    """pandas ewm(span=window, adjust=False, min_periods=window), seeded at the first valid bar `start`."""
+    n = x.shape[-1]
+    out[...] = np.nan
+    if n <= start:
+        return out
+    _ema_raw(x, window, out, start)
+    out[..., :min(n, start + window - 1)] = np.nan
+    return out
+
+
+def _rsi_averages(close: np.ndarray, window: int):
+    """Wilder average gain/loss series. Bar 0 has no change ('ta' counts it as 0.0), so both start at 0."""
+    diff = np.diff(close, axis=-1)
+    up = np.zeros(close.shape)
+    dn = np.zeros(close.shape)
+    np.maximum(diff, 0.0, out=up[..., 1:])
+    np.maximum(-diff, 0.0, out=dn[..., 1:])
+    a = 1.0 / window
+    linear_filter(up[..., 1:], 1 - a, a, up[..., 0], up[..., 1:])
+    linear_filter(dn[..., 1:], 1 - a, a, dn[..., 0], dn[..., 1:])
+    return up, dn
+
+
+def rsi(close: np.ndarray, window: int, out: np.ndarray) -> np.ndarray:
+    """Wilder RSI (ewm alpha=1/window); RSI is 100 when the average loss is 0."""
+    n = close.shape[-1]
+    up, dn = _rsi_averages(close, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(100.0, 1.0 + up / dn, out=out)
+    np.subtract(100.0, out, out=out)
+    out[dn == 0] = 100.0
+    out[..., :min(n, window - 1)] = np.nan
+    return out
+
+
+def rolling(x: np.ndarray, window: int, func, out: np.ndarray, **kwargs) -> np.ndarray:
+    """Trailing-window reduction (NaN until the window is full)."""
+    n = x.shape[-1]
+    out[...] = np.nan
+    if n >= window:
+        func(sliding_window_view(x, window, axis=-1), axis=-1, out=out[..., window - 1:], **kwargs)
+    return out
+
+
+def trailing(x: np.ndarray, window: int, func, pad: float) -> np.ndarray:
+    """func over x[..., max(0, t-window+1):t+1] at every bar t (pandas `.tail(window)` evaluated per bar)."""
+    window = max(1, min(window, x.shape[-1]))
+    padded = np.concatenate([np.full(x.shape[:-1] + (window - 1,), pad), x], axis=-1)
+    return func(sliding_window_view(padded, window, axis=-1), axis=-1)
+
+
+def trailing_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """NaN-skipping mean of the trailing window at every bar (NaN if the window holds no values)."""
+    valid = ~np.isnan(x)
+    total = trailing(np.where(valid, x, 0.0), window, np.sum, 0.0)
+    count = trailing(valid.astype(float), window, np.sum, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return total / count
+
+
+def shift(x: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Value `periods` bars back along the last axis (NaN before the start)."""
+    out = np.full(x.shape, np.nan)
+    out[..., periods:] = x[..., :-periods]
+    return out
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int, out: np.ndarray) -> np.ndarray:
+    """Wilder ATR. Like 'ta', bars before the first full window are 0."""
+    tr = high - low
+    prev = close[..., :-1]
+    np.maximum(tr[..., 1:], np.abs(high[..., 1:] - prev), out=tr[..., 1:])
+    np.maximum(tr[..., 1:], np.abs(low[..., 1:] - prev), out=tr[..., 1:])
+    out[...] = 0.0
+    out[..., window - 1] = tr[..., :window].mean(axis=-1)
+    linear_filter(tr[..., window:], (window - 1) / window, 1.0 / window, out[..., window - 1], out[..., window:])
+    return out
+
+
+def _wilder_sum(x: np.ndarray, window: int, m: int) -> np.ndarray:
+    """'ta' ADX running sums: s[0] = sum(x[1..w]), s[i] = s[i-1] - s[i-1]/w + x[w+i], last slot left at 0."""
+    s = np.zeros(x.shape[:-1] + (m,))
+    s[..., 0] = x[..., 1:window + 1].sum(axis=-1)
+    linear_filter(x[..., window + 1:], 1 - 1.0 / window, 1.0, s[..., 0], s[..., 1:m - 1])
+    return s
+
+
+def _adx_components(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int):
+    """Wilder sums (TR, +DM, -DM) and DX in 'ta' slot order: slot i belongs to bar window + i."""
+    m = close.shape[-1] - window + 1
+    prev_close = close[..., :-1]
+    dm = np.zeros(close.shape)
+    dm[..., 1:] = np.maximum(high[..., 1:], prev_close) - np.minimum(low[..., 1:], prev_close)
+
+    up = np.zeros(close.shape)
+    down = np.zeros(close.shape)
+    up[..., 1:] = high[..., 1:] - high[..., :-1]
+    down[..., 1:] = low[..., :-1] - low[..., 1:]
+    pos = np.where((up > down) & (up > 0), up, 0.0)
+    neg = np.where((down > up) & (down > 0), down, 0.0)
+
+    trs = _wilder_sum(dm, window, m)
+    dip = _wilder_sum(pos, window, m)
+    din = _wilder_sum(neg, window, m)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dip_pct = np.where(trs != 0, 100 * dip / trs, 0.0)
+        din_pct = np.where(trs != 0, 100 * din / trs, 0.0)
+        total = dip_pct + din_pct
+        dx = np.where(total != 0, 100 * np.abs(dip_pct - din_pct) / total, 0.0)
+    return trs, dip, din, dip_pct, din_pct, dx
+
+
+def adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int,
+        out_adx: np.ndarray, out_pos: np.ndarray, out_neg: np.ndarray):
+    """ADX / +DI / -DI with the exact index alignment of ta.trend.ADXIndicator (0 where undefined)."""
+    m = close.shape[-1] - window + 1
+    _, _, _, dip_pct, din_pct, dx = _adx_components(high, low, close, window)
+
+    out_adx[...] = 0.0
+    smoothed = out_adx[..., window - 1:] # adx series is left-padded with window-1 zeros
+    smoothed[..., window] = dx[..., :window].mean(axis=-1)
+    linear_filter(dx[..., window:m - 1], (window - 1) / window, 1.0 / window, smoothed[..., window], smoothed[..., window + 1:])
+
+    out_pos[...] = 0.0
+    out_neg[...] = 0.0
+    out_pos[..., window + 1:] = dip_pct[..., 1:m - 1]
+    out_neg[..., window + 1:] = din_pct[..., 1:m - 1]
+
+
+def compute_indicators(high: np.ndarray, low: np.ndarray, close: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Full indicator set for contiguous float64 arrays shaped (..., bars).
+    Returns `out` shaped (len(COLUMNS), ..., bars), rows ordered as COLUMNS.
+    Inputs must be finite. ADX/ATR rows stay NaN below MIN_BARS bars.
+    """
+    n = close.shape[-1]
+    if out is None:
+        out = np.empty((len(COLUMNS),) + close.shape)
+
+    rsi(close, RSI_WINDOW, out[ROW['RSI_14']])
+
+    macd = out[ROW['MACD_12_26_9']]
+    slow = out[ROW['MACDs_12_26_9']] # Borrowed as scratch until the signal line overwrites it
+    ema(close, MACD_FAST, macd)
+    ema(close, MACD_SLOW, slow)
+    macd -= slow
+    ema(macd, MACD_SIGN, out[ROW['MACDs_12_26_9']], start=MACD_SLOW - 1)
+
+    mid = rolling(close, BB_WINDOW, np.mean, out[ROW['BBM_20_2.0']])
+    std = rolling(close, BB_WINDOW, np.std, out[ROW['BBU_20_2.0']])
+    np.multiply(std, BB_DEV, out=std)
+    np.subtract(mid, std, out=out[ROW['BBL_20_2.0']])
+    np.add(mid, std, out=out[ROW['BBU_20_2.0']])
+
+    for w in EMA_WINDOWS:
+        ema(close, w, out[ROW[f'EMA_{w}']])
+
+    k = out[ROW['STOCHk_14_3_3']]
+    lo = rolling(low, STOCH_WINDOW, np.min, np.empty(close.shape))
+    hi = rolling(high, STOCH_WINDOW, np.max, np.empty(close.shape))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(100 * (close - lo), hi - lo, out=k)
+    rolling(k, STOCH_SMOOTH, np.mean, out[ROW['STOCHd_14_3_3']])
+
+    if n >= MIN_BARS:
+        adx(high, low, close, ADX_WINDOW, out[ROW['ADX_14']], out[ROW['ADX_pos']], out[ROW['ADX_neg']])
+        atr(high, low, close, ATR_WINDOW, out[ROW['atr']])
+    else:
+        out[ROW['ADX_14']:] = np.nan
+    return out
+
+
+def recursion_state(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> dict:
+    """
+    Raw recursion values at the last bar of 1-D arrays (at least MIN_BARS long),
+    i.e. everything engine/live_indicators.py needs to continue the series one bar at a time.
+    """
+    n = close.shape[-1]
+    state = {'t': n - 1, 'high': float(high[-1]), 'low': float(low[-1]), 'close': float(close[-1])}
+    series = {}
+    for w in EMA_WINDOWS + (MACD_FAST, MACD_SLOW):
+        series[w] = _ema_raw(close, w, np.empty(n))
+        state[f'ema_{w}'] = float(series[w][-1])
+    macd = series[MACD_FAST] - series[MACD_SLOW]
+    state['macd_signal'] = float(_ema_raw(macd, MACD_SIGN, np.empty(n), start=MACD_SLOW - 1)[-1])
+
+    up, dn = _rsi_averages(close, RSI_WINDOW)
+    state['rsi_up'], state['rsi_dn'] = float(up[-1]), float(dn[-1])
+
+    state['atr'] = float(atr(high, low, close, ATR_WINDOW, np.empty(n))[-1])
+
+    trs, dip, din, _, _, _ = _adx_components(high, low, close, ADX_WINDOW)
+    # The last 'ta' slot is an unused 0; the last real bar lives in slot m-2
+    state['trs'], state['dip'], state['din'] = float(trs[-2]), float(dip[-2]), float(din[-2])
+    adx_out = np.empty((3, n))
+    adx(high, low, close, ADX_WINDOW, adx_out[0], adx_out[1], adx_out[2])
+    state['adx'] = float(adx_out[0, -1])
+    return state
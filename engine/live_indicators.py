@@ -0,0 +1,148 @@
+import math
+import numpy as np
+
+from engine.indicators import (
+    COLUMNS, ROW, MIN_BARS, compute_indicators, recursion_state,
+    RSI_WINDOW, MACD_FAST, MACD_SLOW, MACD_SIGN, BB_WINDOW, BB_DEV,
+    EMA_WINDOWS, STOCH_WINDOW, STOCH_SMOOTH, ADX_WINDOW, ATR_WINDOW,
+)
+
+# One extra bar so the committed state (everything but the live bar) already covers ADX/ATR warm-up
+SEED_BARS = MIN_BARS + 1
+NAN = float('nan')
+
+
+def _div(num: float, den: float) -> float:
+    """Float division with NumPy's 0-denominator results (nan / +-inf) instead of ZeroDivisionError."""
+    if den != 0:
+        return num / den
+    return NAN if num == 0 or num != num else math.copysign(math.inf, num)
+
+
+def step(state: dict, high: float, low: float, close: float, closes, highs, lows, prev_k):
+    """
+    Advances every indicator recursion by one bar.
+    closes/highs/lows: the trailing BB/Stoch windows ending at this bar; prev_k: the previous STOCH_SMOOTH-1 %K values.
+    Returns (indicator row ordered as COLUMNS, state including this bar).
+    """
+    t = state['t'] + 1
+    pc, ph, pl = state['close'], state['high'], state['low']
+    new = {'t': t, 'high': high, 'low': low, 'close': close}
+    row = [NAN] * len(COLUMNS)
+
+    for w in EMA_WINDOWS + (MACD_FAST, MACD_SLOW):
+        a = 2.0 / (w + 1)
+        new[f'ema_{w}'] = (1 - a) * state[f'ema_{w}'] + a * close
+    for w in EMA_WINDOWS:
+        if t >= w - 1:
+            row[ROW[f'EMA_{w}']] = new[f'ema_{w}']
+
+    macd = new[f'ema_{MACD_FAST}'] - new[f'ema_{MACD_SLOW}']
+    a = 2.0 / (MACD_SIGN + 1)
+    new['macd_signal'] = (1 - a) * state['macd_signal'] + a * macd
+    row[ROW['MACD_12_26_9']] = macd
+    if t >= MACD_SLOW + MACD_SIGN - 2:
+        row[ROW['MACDs_12_26_9']] = new['macd_signal']
+
+    a = 1.0 / RSI_WINDOW
+    new['rsi_up'] = (1 - a) * state['rsi_up'] + a * max(close - pc, 0.0)
+    new['rsi_dn'] = (1 - a) * state['rsi_dn'] + a * max(pc - close, 0.0)
+    row[ROW['RSI_14']] = 100.0 if new['rsi_dn'] == 0 else 100.0 - 100.0 / (1.0 + new['rsi_up'] / new['rsi_dn'])
+
+    mid = float(np.mean(closes))
+    std = float(np.std(closes)) * BB_DEV
+    row[ROW['BBM_20_2.0']], row[ROW['BBL_20_2.0']], row[ROW['BBU_20_2.0']] = mid, mid - std, mid + std
+
+    lo, hi = float(np.min(lows)), float(np.max(highs))
+    k = _div(100 * (close - lo), hi - lo)
+    row[ROW['STOCHk_14_3_3']] = k
+    row[ROW['STOCHd_14_3_3']] = (sum(prev_k) + k) / STOCH_SMOOTH
+
+    tr = max(high - low, abs(high - pc), abs(low - pc))
+    new['atr'] = state['atr'] * (ATR_WINDOW - 1) / ATR_WINDOW + tr / ATR_WINDOW
+    row[ROW['atr']] = new['atr']
+
+    w = ADX_WINDOW
+    dm = max(high, pc) - min(low, pc)
+    up, down = high - ph, pl - low
+    pos = up if (up > down and up > 0) else 0.0
+    neg = down if (down > up and down > 0) else 0.0
+    new['trs'] = state['trs'] - state['trs'] / w + dm
+    new['dip'] = state['dip'] - state['dip'] / w + pos
+    new['din'] = state['din'] - state['din'] / w + neg
+    dip_pct = 100 * new['dip'] / new['trs'] if new['trs'] != 0 else 0.0
+    din_pct = 100 * new['din'] / new['trs'] if new['trs'] != 0 else 0.0
+    total = dip_pct + din_pct
+    dx = 100 * abs(dip_pct - din_pct) / total if total != 0 else 0.0
+    new['adx'] = state['adx'] * (w - 1) / w + dx / w
+    row[ROW['ADX_14']], row[ROW['ADX_pos']], row[ROW['ADX_neg']] = new['adx'], dip_pct, din_pct
+    return row, new
+
+
+class LiveIndicators:
+    """
+    Incremental indicator state for one (symbol, timeframe) candle buffer.
+    Seeded once from the NumPy kernel; after that an appended bar or a live-bar revision
+    is one O(1) step (BB/Stoch read their fixed 20/14-bar windows) instead of a full recompute.
+    The recursions run over the whole streamed history, so values equal a kernel run over
+    every bar seen since seeding (not one reseeded at the start of the rolling window).
+    """
+
+    def __init__(self, buf):
+        self.buf = buf
+        self.rows = np.full((len(COLUMNS), buf.capacity), np.nan) # Aligned with the buffer's ring slots
+        self.committed = None # State through the last closed bar
+        self.pending = None # State including the live bar (committed when the next bar opens)
+        self.stats = {'seeds': 0, 'steps': 0}
+
+    @property
+    def warm(self):
+        return self.committed is not None
+
+    def _positions(self, count: int):
+        buf = self.buf
+        return (buf.start + buf.size - count + np.arange(count)) % buf.capacity
+
+    def reseed(self):
+        """Full kernel pass over the buffer (initial load / resubscribe). Cold until SEED_BARS candles."""
+        buf = self.buf
+        self.committed = self.pending = None
+        if buf.size < SEED_BARS:
+            return
+        order = self._positions(buf.size)
+        high, low, close = (np.ascontiguousarray(buf.values[buf.FIELDS.index(f), order]) for f in ('high', 'low', 'close'))
+        if not (np.isfinite(high).all() and np.isfinite(low).all() and np.isfinite(close).all()):
+            return # Gappy history: Callers fall back to the full pipeline
+        self.rows[:, order] = compute_indicators(high, low, close)
+        self.committed = recursion_state(high[:-1], low[:-1], close[:-1])
+        self.pending = recursion_state(high, low, close)
+        self.stats['seeds'] += 1
+
+    def on_bar(self, is_new: bool):
+        """Called by the buffer after each upsert (new bar appended or live bar revised)."""
+        if not self.warm:
+            self.reseed()
+            return
+        if is_new:
+            self.committed = self.pending
+        buf = self.buf
+        pos = self._positions(max(BB_WINDOW, STOCH_WINDOW))
+        vals = buf.values
+        h, l, c = (buf.FIELDS.index(f) for f in ('high', 'low', 'close'))
+        last = pos[-1]
+        high, low, close = float(vals[h, last]), float(vals[l, last]), float(vals[c, last])
+        if not (math.isfinite(high) and math.isfinite(low) and math.isfinite(close)):
+            self.committed = self.pending = None
+            return
+        k_slots = pos[-STOCH_SMOOTH:-1]
+        row, self.pending = step(
+            self.committed, high, low, close,
+            vals[c, pos[-BB_WINDOW:]], vals[h, pos[-STOCH_WINDOW:]], vals[l, pos[-STOCH_WINDOW:]],
+            [float(v) for v in self.rows[ROW['STOCHk_14_3_3'], k_slots]]
+        )
+        self.rows[:, last] = row
+        self.stats['steps'] += 1
+
+    def columns(self, order):
+        """Indicator columns for the given (chronological) ring slots."""
+        return {name: self.rows[i, order] for i, name in enumerate(COLUMNS)}
@@ -1,17 +1,16 @@
 import pandas as pd
 import numpy as np
+from engine.indicators import trailing
+from engine.snapshot import BarSnapshot
 
 class MarketStructure:
     @staticmethod
-    def detect_structure(df: pd.DataFrame):
+    def detect_structure(df: pd.DataFrame, snap: BarSnapshot = None):
         """
         Detects Break of Structure (BOS) and Change of Character (CHoCH).
         This is a simplified version of Smart Money Concepts (SMC).
+        'snap' is the shared last-bar snapshot (built here if not passed).
         """
-        closes = df['close'].values
-        highs = df['high'].values
-        lows = df['low'].values
-        
         structure = {
             "trend": "Neutral",
             "last_bos": None,
@@ -23,18 +22,12 @@ class MarketStructure:
         if len(df) < 20:
             return structure
 
-        # Find local peaks/valleys
-        # Simplified: uses rolling windows
-        df['hh'] = df['high'].rolling(window=5, center=True).max()
-        df['ll'] = df['low'].rolling(window=5, center=True).min()
+        last = snap or BarSnapshot(df)
         
         # Trend detection based on EMAs with NaN protection
-        if 'EMA_50' in df.columns and 'EMA_200' in df.columns:
-            ema50 = df['EMA_50'].iloc[-1]
-            ema200 = df['EMA_200'].iloc[-1]
-            
-            if not pd.isna(ema50) and not pd.isna(ema200):
-                if ema50 > ema200:
+        if last.ema_50 is not None and last.ema_200 is not None:
+            if not BarSnapshot.isna(last.ema_50) and not BarSnapshot.isna(last.ema_200):
+                if last.ema_50 > last.ema_200:
                     structure['trend'] = "Bullish"
                 else:
                     structure['trend'] = "Bearish"
@@ -42,7 +35,23 @@ class MarketStructure:
                 structure['trend'] = "Neutral" # Safety fallback
 
         # Resistance/Support
-        structure['resistance'] = df['high'].tail(20).max()
-        structure['support'] = df['low'].tail(20).min()
+        structure['resistance'] = last.high_20
+        structure['support'] = last.low_20
         
         return structure
+
+    @staticmethod
+    def detect_structure_batch(cols: dict):
+        """
+        Vectorized detect_structure at every bar of (assets, bars) arrays.
+        Returns (trend +1 Bullish / -1 Bearish / 0 Neutral, support, resistance); NaN levels before 20 bars.
+        """
+        ema50, ema200 = cols['EMA_50'], cols['EMA_200']
+        with np.errstate(invalid='ignore'):
+            trend = np.where(np.isnan(ema50) | np.isnan(ema200), 0, np.where(ema50 > ema200, 1, -1))
+        resistance = trailing(cols['high'], 20, np.max, -np.inf)
+        support = trailing(cols['low'], 20, np.min, np.inf)
+        trend[..., :19] = 0
+        resistance[..., :19] = np.nan
+        support[..., :19] = np.nan
+        return trend, support, resistance
@@ -0,0 +1,275 @@
+import math
+import json
+import time
+import itertools
+import logging
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from engine.ai_generator import AISignalGenerator
+from engine.strategies import StrategyEngine
+from engine.backtester import history_arrays, tp_sl_outcomes, TPSL_MAX_HOLD
+from engine.indicators import MIN_BARS
+from engine.signal_config import merge_config, DEFAULT_CONFIG
+from data.candle_store import CANDLE_STORE_WINDOW
+
+# "section.key" -> candidate values (expiry.<LEVEL> takes whole row tables)
+DEFAULT_GRID = {
+    "weights.ta": [0.3, 0.4, 0.5],
+    "weights.volume": [0.1, 0.2, 0.3],
+    "weights.momentum": [0.15, 0.25, 0.35],
+    "thresholds.cross_adx": [15, 20, 25],
+    "thresholds.bos_pct": [0.002, 0.003, 0.005],
+    "min_confidence": [65, 70, 75, 80],
+}
+OBJECTIVES = ("win_rate", "tp_rate", "avg_move")
+
+# Per-bar tallies summed over each window
+_STATS = ("signals", "wins", "decided", "move", "tp_hits", "tpsl_decided", "tpsl_move")
+
+
+def expand_grid(grid: dict):
+    """Cartesian product of the grid as partial configs. The first entry is always the current defaults."""
+    keys = list(grid)
+    combos = [{}]
+    for values in itertools.product(*(grid[k] for k in keys)):
+        config = {}
+        for key, value in zip(keys, values):
+            section, _, name = key.partition(".")
+            if name:
+                config.setdefault(section, {})[name] = value
+            else:
+                config[section] = value
+        combos.append(config)
+    return combos
+
+
+def walk_forward_splits(start: int, end: int, folds: int = 4, train_segments: int = 3):
+    """
+    Rolling walk-forward windows over bars [start, end): the range is cut into folds + train_segments
+    equal segments; fold i trains on `train_segments` consecutive segments and tests on the next one.
+    Returns [((train_start, train_end), (test_start, test_end))].
+    """
+    size = (end - start) // (folds + train_segments)
+    if size < 1:
+        return []
+    return [
+        ((start + i * size, start + (i + train_segments) * size),
+         (start + (i + train_segments) * size, start + (i + train_segments + 1) * size))
+        for i in range(folds)
+    ]
+
+
+class _SweepSeries:
+    """
+    One series prepared for the sweep: indicators, parameter-free score components and the
+    outcomes of a BUY and a SELL at every bar are computed once; a config then only re-runs
+    the strategy thresholds (cached per threshold set) and the cheap score combination.
+    """
+
+    def __init__(self, payload: dict, settings: dict):
+        self.ai = AISignalGenerator()
+        self.granularity = payload["granularity"]
+        df = pd.DataFrame(payload["arrays"])
+        self.cols, self.has_volume = history_arrays(df)
+        self.n = n = len(df)
+        self.components = self.ai.score_components(self.cols, self.has_volume, settings["frame_bars"])
+        self.strategies = {}
+
+        bars = np.arange(n)
+        self.eligible = (bars >= max(settings["frame_bars"], MIN_BARS)) & (bars % settings["every"] == 0)
+        close, high, low, atr = (self.cols[c][0] for c in ("close", "high", "low", "atr"))
+        self.close = close
+        # TP/SL result of entering either way at every bar
+        self.tpsl = {}
+        for d in (1, -1):
+            direction = np.full(n, d)
+            tp, sl = close + direction * atr * 2.5, close - direction * atr * 1.2
+            outcome, move, _ = tp_sl_outcomes(high, low, close, bars, direction, tp, sl, settings["max_hold"])
+            self.tpsl[d] = (outcome, move)
+        self.binary = {} # expiry bars -> unsigned % move (NaN past the data)
+
+    def _binary_move(self, expiry_bars: int):
+        if expiry_bars not in self.binary:
+            move = np.full(self.n, np.nan)
+            move[:-expiry_bars] = (self.close[expiry_bars:] - self.close[:-expiry_bars]) / self.close[:-expiry_bars] * 100
+            self.binary[expiry_bars] = move
+        return self.binary[expiry_bars]
+
+    def tallies(self, config: dict, windows) -> np.ndarray:
+        """(windows, len(_STATS)) sums for one full config."""
+        key = tuple(sorted(config["thresholds"].items()))
+        if key not in self.strategies:
+            self.strategies[key] = StrategyEngine.evaluate_batch(self.cols, self.has_volume, config["thresholds"])
+        codes, strat_dirs = self.strategies[key]
+        expiry_table = {level: tuple(tuple(r) for r in rows) for level, rows in config["expiry"].items()}
+        scores = self.ai.combine_scores(self.components, codes, strat_dirs, weights=config["weights"],
+                                        min_confidence=config["min_confidence"], expiry_table=expiry_table)
+
+        direction = scores["direction"][0]
+        expiry_bars = np.maximum(1, np.ceil(scores["expiry_minutes"][0] * 60 / self.granularity)).astype(int)
+        move = np.full(self.n, np.nan)
+        for k in np.unique(expiry_bars):
+            sel = expiry_bars == k
+            move[sel] = self._binary_move(int(k))[sel]
+        move *= direction
+        picked = scores["qualified"][0] & self.eligible & ~np.isnan(move)
+
+        buy = direction == 1
+        tpsl_out = np.where(buy, self.tpsl[1][0], self.tpsl[-1][0])
+        tpsl_move = np.where(buy, self.tpsl[1][1], self.tpsl[-1][1])
+        per_bar = np.vstack([
+            picked, picked & (move > 0), picked & (move != 0), np.where(picked, move, 0.0),
+            picked & (tpsl_out == 1), picked & (tpsl_out != 0), np.where(picked, tpsl_move, 0.0),
+        ]).astype(float)
+        cums = np.concatenate([np.zeros((len(_STATS), 1)), np.cumsum(per_bar, axis=1)], axis=1)
+        return np.array([cums[:, b] - cums[:, a] for a, b in windows])
+
+
+# Per-process state for ProcessPoolExecutor workers
+_worker = {}
+
+
+def _init_worker(payloads, settings):
+    _worker.update(payloads=payloads, settings=settings, series={})
+
+
+def _sweep_chunk(series_idx: int, combos):
+    """Tallies of `combos` (full configs) on one series: (len(combos), windows, len(_STATS))."""
+    cache = _worker["series"]
+    if series_idx not in cache:
+        cache.clear() # Tasks are queued series by series: keep one prepared series per worker
+        cache[series_idx] = _SweepSeries(_worker["payloads"][series_idx], _worker["settings"])
+    series = cache[series_idx]
+    windows = _worker["settings"]["windows"][series_idx]
+    return series_idx, np.array([series.tallies(config, windows) for config in combos])
+
+
+def _metric(tallies: np.ndarray, objective: str, min_signals: int) -> np.ndarray:
+    """Objective per (..., window) from summed tallies; NaN where a window has too few signals."""
+    t = {name: tallies[..., i] for i, name in enumerate(_STATS)}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if objective == "win_rate":
+            value = t["wins"] / t["decided"] * 100
+        elif objective == "tp_rate":
+            value = t["tp_hits"] / t["tpsl_decided"] * 100
+        else:
+            value = t["move"] / t["signals"]
+    return np.where(t["signals"] >= min_signals, value, np.nan)
+
+
+class WalkForwardOptimizer:
+    """
+    Sweeps scoring weights, strategy thresholds, the confidence gate and the expiry tables over candle
+    history with rolling walk-forward splits, spread across a process pool (one task per series x config chunk).
+    Configs are ranked in-sample (all train windows pooled), so the deployed rank 1 is never chosen on the
+    test windows; the pooled test metric is only reported, and 'walk_forward' estimates the selection's edge.
+    """
+
+    def __init__(self, grid: dict = None, folds: int = 4, train_segments: int = 3, objective: str = "win_rate",
+                 min_signals: int = 30, workers: int = None, frame_bars: int = CANDLE_STORE_WINDOW, every: int = 1,
+                 max_hold: int = TPSL_MAX_HOLD):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"objective must be one of {OBJECTIVES}")
+        self.grid = grid or DEFAULT_GRID
+        self.folds = folds
+        self.train_segments = train_segments
+        self.objective = objective
+        self.min_signals = min_signals
+        self.workers = workers
+        self.settings = {"frame_bars": frame_bars, "every": max(1, every), "max_hold": max_hold}
+
+    def run(self, frames: dict, granularity: int) -> dict:
+        """Sweeps {symbol: df}; returns the ranked report (see save())."""
+        started = time.perf_counter()
+        warmup = max(self.settings["frame_bars"], MIN_BARS)
+        payloads, windows, symbols = [], [], []
+        for symbol, df in frames.items():
+            df = df.dropna(subset=["open", "high", "low", "close"])
+            splits = walk_forward_splits(warmup, len(df), self.folds, self.train_segments)
+            if not splits:
+                logging.warning(f"Optimizer: {symbol} too short for {self.folds} walk-forward folds, skipped")
+                continue
+            arrays = {c: df[c].to_numpy(dtype=float) for c in ("open", "high", "low", "close", "volume") if c in df.columns}
+            payloads.append({"granularity": granularity, "arrays": arrays})
+            windows.append([w for split in splits for w in split]) # train0, test0, train1, test1, ...
+            symbols.append(symbol)
+        if not payloads:
+            raise ValueError("No series long enough for walk-forward optimization")
+
+        overrides = expand_grid(self.grid)
+        configs = [merge_config(o) for o in overrides]
+        settings = {**self.settings, "windows": windows}
+        tallies = np.zeros((len(configs), len(payloads), 2 * self.folds, len(_STATS)))
+
+        workers = self.workers or 1
+        chunk = max(1, math.ceil(len(configs) / (workers * 4)))
+        tasks = [(i, start) for i in range(len(payloads)) for start in range(0, len(configs), chunk)]
+        if workers == 1:
+            _init_worker(payloads, settings)
+            for i, start in tasks:
+                _, result = _sweep_chunk(i, configs[start:start + chunk])
+                tallies[start:start + chunk, i] = result
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(payloads, settings)) as pool:
+                futures = {pool.submit(_sweep_chunk, i, configs[start:start + chunk]): start for i, start in tasks}
+                for future, start in futures.items():
+                    i, result = future.result()
+                    tallies[start:start + chunk, i] = result
+
+        # Pool the series, then score each fold's train / test window
+        pooled = tallies.sum(axis=1) # (configs, 2 * folds, stats)
+        scores = _metric(pooled, self.objective, self.min_signals)
+        train, test = scores[:, 0::2], scores[:, 1::2]
+        # Pooled over all train (resp. test) windows, so thin folds can't dominate
+        train_all = _metric(pooled[:, 0::2].sum(axis=1), self.objective, self.min_signals)
+        test_all = _metric(pooled[:, 1::2].sum(axis=1), self.objective, self.min_signals)
+        test_signals = pooled[:, 1::2, 0].sum(axis=1)
+
+        # Walk-forward estimate: Each fold's in-sample winner judged on its unseen test window
+        picks = []
+        for fold in range(self.folds):
+            column = np.where(np.isnan(train[:, fold]), -np.inf, train[:, fold])
+            best = int(np.argmax(column))
+            picks.append({"fold": fold, "config": best, "train": _round(train[best, fold]), "test": _round(test[best, fold])})
+
+        # Rank in-sample only (ties keep grid order, baseline first): Test windows stay unseen by the selection
+        order = sorted(range(len(configs)), key=lambda c: (-_nan_low(train_all[c]), c))
+        ranked = [{
+            "rank": r + 1, "objective": self.objective, "test": _round(test_all[c]), "train": _round(train_all[c]),
+            "test_signals": int(test_signals[c]), "folds_test": [_round(v) for v in test[c]],
+            "overrides": overrides[c], "config": configs[c],
+        } for r, c in enumerate(order)]
+
+        return {
+            "generated_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "objective": self.objective, "granularity": granularity, "symbols": symbols,
+            "folds": self.folds, "train_segments": self.train_segments, "min_signals": self.min_signals,
+            "grid": self.grid, "configs": len(configs), "seconds": round(time.perf_counter() - started, 1),
+            "baseline": {"test": _round(test_all[0]), "train": _round(train_all[0]), "config": DEFAULT_CONFIG},
+            "walk_forward": {"picks": picks, "test": _round(_nanmean([test[p["config"], p["fold"]] for p in picks]))},
+            "ranked": ranked,
+        }
+
+    @staticmethod
+    def save(report: dict, path: str, top: int = 20):
+        """Writes the report with the `top` ranked configs (engine/signal_config.py loads 'ranked')."""
+        with open(path, "w") as f:
+            json.dump({**report, "ranked": report["ranked"][:top]}, f, indent=2)
+
+
+def _nanmean(values, axis=None):
+    """np.nanmean without the all-NaN RuntimeWarning (NaN where nothing is left)."""
+    values = np.asarray(values, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.nansum(values, axis=axis) / (~np.isnan(values)).sum(axis=axis)
+
+
+def _round(value, digits: int = 3):
+    return None if value is None or (isinstance(value, float) and math.isnan(value)) else round(float(value), digits)
+
+
+def _nan_low(value) -> float:
+    return -math.inf if value is None or math.isnan(value) else value
@@ -0,0 +1,210 @@
+import os
+import time
+import asyncio
+import logging
+import datetime
+import numpy as np
+
+from data.candle_stream import frame_epochs
+from engine.backtester import doubling_tables, first_touch
+
+OUTCOME_INTERVAL = os.getenv("OUTCOME_INTERVAL", "5m") # Candle size the outcomes are resolved on
+OUTCOME_RESOLVE_SECONDS = int(os.getenv("OUTCOME_RESOLVE_SECONDS", 120)) # Pause between resolver passes
+OUTCOME_MAX_AGE_HOURS = float(os.getenv("OUTCOME_MAX_AGE_HOURS", 12)) # Older pending rows become UNRESOLVED
+OUTCOME_BATCH = int(os.getenv("OUTCOME_BATCH", 500)) # Pending rows per pass
+
+CONFIDENCE_BANDS = ((65, 75), (75, 85), (85, 101)) # Same bands as Backtester.confidence_buckets
+
+
+def resolve_outcomes(df, entry_ts, expiry_ts, entry, direction, tp, sl, now: float):
+    """
+    Vectorized outcome of every signal of one asset against its candles.
+    Entry is the candle containing entry_ts, expiry the candle containing expiry_ts (its close is the exit price);
+    TP/SL is the first touch across those candles, a same-candle touch counts as SL.
+    Returns (resolvable, move %, tp_sl +1 TP / -1 SL / 0 NONE, seconds to the touch or -1).
+    """
+    epochs = frame_epochs(df)
+    close, high, low = (df[c].to_numpy(dtype=float) for c in ('close', 'high', 'low'))
+    granularity = int(np.median(np.diff(epochs))) if len(epochs) > 1 else 0
+
+    i0 = np.searchsorted(epochs, entry_ts, side='right') - 1
+    i1 = np.searchsorted(epochs, expiry_ts, side='right') - 1
+    # The data must cover the entry and expiry candles, and the expiry candle must have closed
+    resolvable = (granularity > 0) & (i0 >= 0) & (expiry_ts < epochs[i1] + granularity) & (epochs[i1] + granularity <= now)
+    resolvable &= np.isfinite(close[i1]) & (entry > 0)
+
+    move = (close[i1] - entry) / np.where(entry > 0, entry, np.nan) * 100 * direction
+
+    # first_touch scans the bars after 'start', so start one candle before the entry candle
+    start, horizon = i0 - 1, np.maximum(i1 - i0 + 1, 1)
+    levels = max(1, int(horizon.max()).bit_length()) if len(horizon) else 1
+    buy = direction == 1
+    on_high = first_touch(doubling_tables(high, levels, np.maximum, -np.inf), start, horizon, np.where(buy, tp, sl), above=True)
+    on_low = first_touch(doubling_tables(low, levels, np.minimum, np.inf), start, horizon, np.where(buy, sl, tp), above=False)
+    first_tp, first_sl = np.where(buy, on_high, on_low), np.where(buy, on_low, on_high)
+
+    won = first_tp < first_sl
+    lost = ~won & (first_sl <= horizon)
+    hit_idx = np.minimum(start + np.where(won, first_tp, first_sl), len(epochs) - 1)
+    time_to_hit = np.where(won | lost, np.maximum(epochs[hit_idx] - entry_ts, 0), -1)
+    return resolvable, move, np.where(won, 1, np.where(lost, -1, 0)), time_to_hit
+
+
+class OutcomeTracker:
+    """
+    Background resolver for SignalHistory: Pending signals whose expiry has passed are batched by asset,
+    each asset's candles are fetched once and every signal is resolved in one vectorized pass
+    (binary result at expiry + first TP/SL touch), then written back in one bulk update.
+    """
+
+    def __init__(self, interval: str = OUTCOME_INTERVAL, max_age_hours: float = OUTCOME_MAX_AGE_HOURS, batch: int = OUTCOME_BATCH):
+        self.interval = interval
+        self.max_age = max_age_hours * 3600
+        self.batch = batch
+        self.stats = {'passes': 0, 'resolved': 0, 'unresolved': 0, 'last_pass_seconds': 0.0}
+
+    @staticmethod
+    def _pending(now: int, limit: int):
+        """Open rows whose expiry lies in the past (legacy rows without entry_timestamp are skipped)."""
+        from sqlalchemy import func
+        from utils.db import init_db, SignalHistory
+        db = init_db()
+        try:
+            rows = db.session.query(
+                SignalHistory.id, SignalHistory.asset, SignalHistory.direction, SignalHistory.entry_price,
+                SignalHistory.tp, SignalHistory.sl, SignalHistory.entry_timestamp, SignalHistory.expiry_minutes
+            ).filter(
+                SignalHistory.outcome.is_(None),
+                SignalHistory.entry_timestamp.isnot(None),
+                SignalHistory.entry_timestamp + func.coalesce(SignalHistory.expiry_minutes, 0) * 60 <= now,
+            ).order_by(SignalHistory.id).limit(limit).all()
+        finally:
+            db.close()
+        return rows
+
+    @staticmethod
+    def _write(updates):
+        from utils.db import init_db, SignalHistory
+        db = init_db()
+        try:
+            db.session.bulk_update_mappings(SignalHistory, updates)
+            db.commit()
+        finally:
+            db.close()
+
+    async def resolve_pending(self) -> int:
+        """One resolver pass; returns the number of rows written back."""
+        from data.collector import DataCollector
+        start = time.perf_counter()
+        now = time.time()
+        rows = await asyncio.to_thread(self._pending, int(now), self.batch)
+        if not rows:
+            return 0
+
+        by_asset = {}
+        for row in rows:
+            by_asset.setdefault(row.asset, []).append(row)
+        frames = await DataCollector.fetch_data_batch(list(by_asset), self.interval)
+
+        resolved_at = datetime.datetime.utcnow()
+        updates = []
+        for asset, group in by_asset.items():
+            entry_ts = np.array([r.entry_timestamp for r in group], dtype='int64')
+            expiry_ts = entry_ts + np.array([r.expiry_minutes or 0 for r in group], dtype='int64') * 60
+            stale = now - expiry_ts > self.max_age
+            resolvable = np.zeros(len(group), dtype=bool)
+
+            df = frames.get(asset)
+            if df is not None and not df.empty and {'high', 'low', 'close'} <= set(df.columns):
+                as_float = lambda name: np.array([getattr(r, name) if getattr(r, name) is not None else np.nan for r in group], dtype=float)
+                direction = np.array([1 if r.direction == "BUY" else -1 for r in group])
+                try:
+                    resolvable, move, tp_sl, time_to_hit = resolve_outcomes(
+                        df, entry_ts, expiry_ts, as_float('entry_price'), direction, as_float('tp'), as_float('sl'), now
+                    )
+                except Exception as e:
+                    logging.error(f"Outcome Tracker: Resolve failed for {asset}: {e}")
+
+            for i, row in enumerate(group):
+                if resolvable[i]:
+                    updates.append({
+                        "id": row.id,
+                        "outcome": "WIN" if move[i] > 0 else "LOSS" if move[i] < 0 else "DRAW",
+                        "tpsl_outcome": {1: "TP", -1: "SL"}.get(int(tp_sl[i]), "NONE"),
+                        "realized_move": round(float(move[i]), 4),
+                        "time_to_hit": int(time_to_hit[i]) if time_to_hit[i] >= 0 else None,
+                        "resolved_at": resolved_at,
+                    })
+                    self.stats['resolved'] += 1
+                elif stale[i]:
+                    # Candles no longer cover the signal: Close it out instead of retrying forever
+                    updates.append({"id": row.id, "outcome": "UNRESOLVED", "resolved_at": resolved_at})
+                    self.stats['unresolved'] += 1
+
+        if updates:
+            await asyncio.to_thread(self._write, updates)
+        self.stats['passes'] += 1
+        self.stats['last_pass_seconds'] = round(time.perf_counter() - start, 3)
+        logging.info(f"🎯 Outcome Tracker: {len(updates)}/{len(rows)} signals resolved across {len(by_asset)} assets in {self.stats['last_pass_seconds']}s")
+        return len(updates)
+
+    async def run_forever(self, every: int = OUTCOME_RESOLVE_SECONDS):
+        logging.info(f"🎯 Outcome Tracker: Resolving signals on {self.interval} candles every {every}s")
+        while True:
+            try:
+                await self.resolve_pending()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Outcome Tracker Error: {e}")
+            await asyncio.sleep(every)
+
+
+def get_signal_stats(days: int = 30) -> dict:
+    """Hit rates of resolved signals per strategy and per confidence band (binary wins exclude draws)."""
+    from sqlalchemy import func, case
+    from utils.db import init_db, SignalHistory
+
+    since = datetime.datetime.utcnow() - datetime.timedelta(days=days)
+    # Banded on the raw score (what Backtester.confidence_buckets sees), not the calibrated win rate
+    confidence = func.coalesce(SignalHistory.raw_confidence, SignalHistory.confidence)
+    band = case(
+        *[((confidence >= lo) & (confidence < hi), f"{lo}-{min(hi, 100)}") for lo, hi in CONFIDENCE_BANDS],
+        else_="<65",
+    )
+    columns = (
+        func.count(SignalHistory.id),
+        func.sum(case((SignalHistory.outcome == "WIN", 1), else_=0)),
+        func.sum(case((SignalHistory.outcome.in_(("WIN", "LOSS")), 1), else_=0)),
+        func.sum(case((SignalHistory.tpsl_outcome == "TP", 1), else_=0)),
+        func.sum(case((SignalHistory.tpsl_outcome.in_(("TP", "SL")), 1), else_=0)),
+        func.avg(SignalHistory.realized_move),
+        func.avg(SignalHistory.time_to_hit),
+    )
+    resolved = (SignalHistory.timestamp >= since, SignalHistory.outcome.in_(("WIN", "LOSS", "DRAW")))
+
+    def rows_to_stats(rows):
+        out = []
+        for key, signals, wins, decided, tp, tpsl_decided, avg_move, avg_hit in rows:
+            out.append({
+                "group": key or "UNKNOWN",
+                "signals": signals,
+                "win_rate": round(wins / decided * 100, 2) if decided else None,
+                "tp_rate": round(tp / tpsl_decided * 100, 2) if tpsl_decided else None,
+                "avg_move": round(avg_move, 4) if avg_move is not None else None,
+                "avg_time_to_hit": round(avg_hit) if avg_hit is not None else None,
+            })
+        return out
+
+    db = init_db()
+    try:
+        query = lambda key: db.session.query(key, *columns).filter(*resolved).group_by(key).all()
+        by_strategy = rows_to_stats(query(SignalHistory.strategy))
+        by_confidence = rows_to_stats(query(band))
+        overall = rows_to_stats([("ALL", *db.session.query(*columns).filter(*resolved).one())])
+        pending = db.session.query(func.count(SignalHistory.id)).filter(
+            SignalHistory.outcome.is_(None), SignalHistory.entry_timestamp.isnot(None)
+        ).scalar()
+    finally:
+        db.close()
+    return {"days": days, "overall": overall[0], "by_strategy": by_strategy, "by_confidence": by_confidence, "pending": pending}
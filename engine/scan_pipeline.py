@@ -0,0 +1,162 @@
+import os
+import time
+import asyncio
+import logging
+
+SCAN_RSS_BUDGET_MB = int(os.getenv("SCAN_RSS_BUDGET_MB", 400)) # Render free tier: 512MB minus headroom
+SCAN_MAX_CONCURRENCY = int(os.getenv("SCAN_MAX_CONCURRENCY", 12)) # Upper bound for in-flight fetch jobs
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_mb():
+    """Current resident set size in MB from /proc/self/statm (None where procfs is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency gate whose limit follows the RSS budget: halved while the process is over budget,
+    raised by one per acquire while it is comfortably below (75%), never outside 1..max_limit.
+    """
+
+    def __init__(self, max_limit: int = SCAN_MAX_CONCURRENCY, budget_mb: int = SCAN_RSS_BUDGET_MB):
+        self.max_limit = max(1, max_limit)
+        self.budget_mb = budget_mb
+        self.limit = self.max_limit
+        self.active = 0
+        self.min_seen = self.limit
+        self.peak_rss = 0.0
+        self._cond = asyncio.Condition()
+
+    def _adapt(self):
+        rss = rss_mb()
+        if rss is None:
+            return
+        self.peak_rss = max(self.peak_rss, rss)
+        if rss > self.budget_mb:
+            self.limit = max(1, self.limit // 2)
+        elif rss < self.budget_mb * 0.75:
+            self.limit = min(self.max_limit, self.limit + 1)
+        self.min_seen = min(self.min_seen, self.limit)
+
+    async def __aenter__(self):
+        async with self._cond:
+            self._adapt()
+            await self._cond.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        async with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+
+class ScanPipeline:
+    """
+    Two-stage scan pass: I/O-bound fetch jobs run concurrently under an AdaptiveLimiter while the
+    consumer scores whatever frames have already arrived in micro-batches (generate_signals_batch),
+    so a pass costs about the slowest fetch plus the last micro-batch instead of the sum of all fetches.
+    Forex symbols stay one job so Yahoo keeps its single multi-ticker download.
+    """
+
+    def __init__(self, ai=None, max_concurrency: int = SCAN_MAX_CONCURRENCY, budget_mb: int = SCAN_RSS_BUDGET_MB):
+        self.ai = ai
+        self.max_concurrency = max_concurrency
+        self.budget_mb = budget_mb
+        self.last_report = None
+
+    @staticmethod
+    def _jobs(assets):
+        """Fetch jobs: One per non-forex symbol, one shared job for every forex symbol."""
+        from data.collector import DataCollector
+        pairs = [a if isinstance(a, (tuple, list)) else (a, None) for a in assets]
+        forex, jobs = [], []
+        for symbol, asset_type in pairs:
+            asset_type = asset_type or DataCollector.detect_asset_type(symbol)
+            if asset_type == "forex":
+                forex.append((symbol, asset_type))
+            else:
+                jobs.append([(symbol, asset_type)])
+        if forex:
+            jobs.append(forex)
+        return jobs
+
+    async def run(self, assets, interval: str = "15m", fast_scan: bool = True):
+        """One pipelined pass. Returns {symbol: signal or None}; the per-stage report is kept in last_report."""
+        from data.collector import DataCollector
+        if self.ai is None:
+            from utils.engines import get_ai_gen
+            self.ai = get_ai_gen()
+
+        start = time.perf_counter()
+        limiter = AdaptiveLimiter(self.max_concurrency, self.budget_mb)
+        ready = asyncio.Queue()
+        fetch_times = {}
+
+        async def fetch(job):
+            async with limiter:
+                t0 = time.perf_counter()
+                try:
+                    if len(job) == 1:
+                        symbol, asset_type = job[0]
+                        got = {symbol: await DataCollector.fetch_data(symbol, asset_type, interval)}
+                    else:
+                        got = await DataCollector.fetch_data_batch(job, interval)
+                except Exception as e:
+                    logging.error(f"Scan Pipeline: Fetch failed for {[s for s, _ in job]}: {e}")
+                    got = {}
+                elapsed = time.perf_counter() - t0
+            for symbol, _ in job:
+                fetch_times[symbol] = round(elapsed, 3)
+            ready.put_nowait(got)
+
+        tasks = [asyncio.create_task(fetch(job)) for job in self._jobs(assets)]
+        pending_results = len(tasks)
+
+        signals, compute_time, batches = {}, 0.0, 0
+        try:
+            while pending_results:
+                # Micro-batch: Everything that has arrived since the last compute
+                arrived = [await ready.get()]
+                pending_results -= 1
+                while not ready.empty():
+                    arrived.append(ready.get_nowait())
+                    pending_results -= 1
+                batch = {s: df for got in arrived for s, df in got.items() if df is not None and not df.empty}
+                for got in arrived:
+                    signals.update({s: None for s in got})
+                if not batch:
+                    continue
+                t0 = time.perf_counter()
+                signals.update(await self.ai.generate_signals_batch(batch, fast_scan=fast_scan))
+                compute_time += time.perf_counter() - t0
+                batches += 1
+                del batch, arrived # Frames are released as soon as they are scored
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        total = time.perf_counter() - start
+        self.last_report = {
+            "assets": len(signals),
+            "total_seconds": round(total, 3),
+            "slowest_fetch_seconds": max(fetch_times.values(), default=0.0),
+            "fetch_seconds": fetch_times,
+            "compute_seconds": round(compute_time, 3),
+            "compute_batches": batches,
+            "concurrency_min": limiter.min_seen,
+            "concurrency_max": limiter.max_limit,
+            "peak_rss_mb": round(limiter.peak_rss, 1),
+        }
+        logging.info(
+            f"🦁 Scan Pipeline: {len(signals)} assets in {total:.2f}s "
+            f"(slowest fetch {self.last_report['slowest_fetch_seconds']:.2f}s, compute {compute_time:.2f}s in {batches} batches, "
+            f"concurrency {limiter.min_seen}-{limiter.max_limit}, peak RSS {limiter.peak_rss:.0f}MB)"
+        )
+        return signals
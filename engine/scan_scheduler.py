@@ -0,0 +1,200 @@
+import os
+import gc
+import time
+import asyncio
+import logging
+import numpy as np
+
+from data.candle_stream import frame_epochs
+from data.candle_store import INTERVAL_SECONDS
+
+SCAN_SCHEDULER = os.getenv("SCAN_SCHEDULER", "1") == "1"
+SCAN_TICK_SECONDS = int(os.getenv("SCAN_TICK_SECONDS", 15)) # How often due symbols are checked
+SCAN_CLOSE_GRACE = int(os.getenv("SCAN_CLOSE_GRACE", 20)) # Provider lag after a bar closes before polling
+SCAN_INTERVAL = "15m" # fetch_data's default candles (Deriv routes are 5m regardless)
+SCAN_QUEUE_SIZE = 16 # Published batches a slow subscriber may lag behind before the oldest is dropped
+# Sentiment included: Every fallback that stands in for scheduler results scans in the same mode,
+# so confidence (and the filters on it) means the same whether or not the scheduler is warm
+SCAN_FAST_SCAN = False
+
+
+def last_closed_epoch(epochs: np.ndarray, granularity: int, now: float):
+    """Open time of the newest fully closed bar (the live bar is skipped), or None."""
+    if not len(epochs):
+        return None
+    if epochs[-1] + granularity <= now:
+        return int(epochs[-1])
+    return int(epochs[-2]) if len(epochs) > 1 else None
+
+
+class _Tracked:
+    __slots__ = ('asset_type', 'last_closed', 'granularity', 'due_at', 'signal', 'evaluated_at', 'fetched_at')
+
+    def __init__(self, asset_type):
+        self.asset_type = asset_type
+        self.last_closed = None
+        self.granularity = INTERVAL_SECONDS[SCAN_INTERVAL]
+        self.due_at = 0.0
+        self.signal = None
+        self.evaluated_at = 0.0
+        self.fetched_at = 0.0 # Last fetch attempt, with or without data
+
+
+class ScanScheduler:
+    """
+    Central scan loop shared by the radar, the autotrader and the Mini App.
+    Tracks each symbol's last closed bar and re-evaluates it only once a newer bar has closed:
+    streamed symbols are checked against their live buffer (no fetch), the rest are fetched
+    when their next close is due. Fresh evaluations are published to every subscriber queue,
+    so CPU and provider traffic follow the market instead of the number of callers.
+    """
+
+    def __init__(self, ai=None, tick: int = SCAN_TICK_SECONDS):
+        self.ai = ai
+        self.tick = tick
+        self.tracked = {}
+        self.subscribers = []
+        self.task = None
+        self.stats = {'ticks': 0, 'fetched': 0, 'evaluated': 0, 'unchanged': 0, 'published': 0}
+
+    @property
+    def active(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def start(self):
+        """Starts the loop (idempotent)."""
+        if not self.active:
+            self.task = asyncio.create_task(self.run_forever())
+        return self.task
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try: await self.task
+            except BaseException: pass
+            self.task = None
+
+    def track(self, assets):
+        """Adds symbols or (symbol, asset_type) pairs to the scanned universe (idempotent)."""
+        for asset in assets:
+            symbol, asset_type = asset if isinstance(asset, (tuple, list)) else (asset, None)
+            if symbol and symbol not in self.tracked:
+                self.tracked[symbol] = _Tracked(asset_type)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue of published {symbol: signal or None} batches (one per evaluation pass)."""
+        queue = asyncio.Queue(maxsize=SCAN_QUEUE_SIZE)
+        self.subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self.subscribers:
+            self.subscribers.remove(queue)
+
+    def ready(self, symbols) -> bool:
+        """
+        True once every given symbol has been through a pass: Evaluated on a closed bar, or fetched
+        without data (a dead feed counts as 'no signal' instead of blocking readiness for good).
+        """
+        if not self.active:
+            return False
+        states = [self.tracked.get(s[0] if isinstance(s, (tuple, list)) else s) for s in symbols]
+        return all(state is not None and (state.evaluated_at or state.fetched_at) for state in states)
+
+    def latest(self, symbols=None) -> list:
+        """
+        Most recent signals (closed-bar evaluations) for the given or all tracked symbols.
+        Copies with the entry time re-based on now: A cached evaluation may be up to a bar old.
+        """
+        from engine.ai_generator import AISignalGenerator
+        symbols = self.tracked if symbols is None else [s[0] if isinstance(s, (tuple, list)) else s for s in symbols]
+        signals = [t.signal for t in (self.tracked.get(s) for s in symbols) if t is not None and t.signal]
+        return [{**signal, **AISignalGenerator.entry_fields()} for signal in signals]
+
+    def _due(self, now: float):
+        """Symbols to fetch: streamed ones whose buffer shows a newer closed bar, the rest once their next close is due."""
+        from utils.engines import get_candle_streams
+        buffers = get_candle_streams().buffers
+        due = []
+        for symbol, state in self.tracked.items():
+            buf = buffers.get(symbol)
+            if buf is not None and buf.is_fresh(now):
+                last = buf.last_epoch
+                closed = last if last + buf.granularity <= now else last - buf.granularity
+                if state.last_closed is None or closed > state.last_closed:
+                    due.append(symbol)
+            elif now >= state.due_at:
+                due.append(symbol)
+        return due
+
+    async def run_once(self) -> dict:
+        """One scheduler tick. Returns the published batch ({} when nothing had a new closed bar)."""
+        from data.collector import DataCollector
+        now = time.time()
+        self.stats['ticks'] += 1
+        due = self._due(now)
+        if not due:
+            return {}
+
+        frames = await DataCollector.fetch_data_batch([(s, self.tracked[s].asset_type) for s in due], SCAN_INTERVAL)
+        self.stats['fetched'] += len(due)
+        fresh = {}
+        for symbol in due:
+            state, df = self.tracked[symbol], frames.get(symbol)
+            state.fetched_at = now
+            closed = None
+            if df is not None and not df.empty:
+                epochs = frame_epochs(df)
+                if len(epochs) > 1:
+                    state.granularity = int(np.median(np.diff(epochs)))
+                closed = last_closed_epoch(epochs, state.granularity, now)
+            if closed is not None and (state.last_closed is None or closed > state.last_closed):
+                state.last_closed = closed
+                # Next close: the live bar's end, plus the provider's publishing lag
+                state.due_at = closed + 2 * state.granularity + SCAN_CLOSE_GRACE
+                fresh[symbol] = df
+            else:
+                # No new bar yet (closed market / slow provider): Poll again a fraction of a bar later
+                state.due_at = now + max(self.tick, state.granularity // 4)
+                self.stats['unchanged'] += 1
+        if not fresh:
+            return {}
+
+        signals = await self.ai.generate_signals_batch(fresh, fast_scan=SCAN_FAST_SCAN)
+        evaluated_at = time.time()
+        for symbol in fresh:
+            state = self.tracked[symbol]
+            state.signal, state.evaluated_at = signals.get(symbol), evaluated_at
+        self.stats['evaluated'] += len(fresh)
+        del frames, fresh
+        gc.collect() # Reclaim RAM once for the whole batch
+
+        self._publish(signals)
+        return signals
+
+    def _publish(self, batch: dict):
+        for queue in list(self.subscribers):
+            if queue.full():
+                queue.get_nowait() # Slow consumer: Drop its oldest batch, keep the newest
+            queue.put_nowait(batch)
+        self.stats['published'] += 1
+
+    async def run_forever(self):
+        if self.ai is None:
+            from utils.engines import get_ai_gen
+            self.ai = get_ai_gen()
+        logging.info(f"⏱️ Scan Scheduler: Tracking {len(self.tracked)} symbols, checking for closed bars every {self.tick}s")
+        while True:
+            try:
+                batch = await self.run_once()
+                if batch:
+                    found = sum(1 for s in batch.values() if s)
+                    logging.info(f"⏱️ Scan Scheduler: {len(batch)} symbols had a new closed bar -> {found} signals published")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Scan Scheduler Error: {e}")
+            await asyncio.sleep(self.tick)
+
+    def get_stats(self):
+        return {**self.stats, "active": self.active, "tracked": len(self.tracked), "subscribers": len(self.subscribers)}
@@ -0,0 +1,60 @@
+import os
+import json
+import logging
+
+from engine.ai_generator import AISignalGenerator
+from engine.strategies import StrategyEngine
+
+# Ranked optimizer output (scripts/optimize_signals.py) applied at startup; missing file = built-in defaults
+SIGNAL_CONFIG_PATH = os.getenv("SIGNAL_CONFIG_PATH") or ('/data/signal_config.json' if os.path.exists('/data') else 'signal_config.json')
+SIGNAL_CONFIG_RANK = int(os.getenv("SIGNAL_CONFIG_RANK", 1))
+
+
+def current_config() -> dict:
+    """The live scoring parameters as a JSON-friendly dict."""
+    return {
+        "weights": dict(AISignalGenerator.SCORE_WEIGHTS),
+        "min_confidence": AISignalGenerator.MIN_CONFIDENCE,
+        "thresholds": dict(StrategyEngine.THRESHOLDS),
+        "expiry": {level: [list(row) for row in rows] for level, rows in AISignalGenerator.EXPIRY_TABLE.items()},
+    }
+
+
+# Built-in values, captured before any override so partial configs always merge onto them
+DEFAULT_CONFIG = current_config()
+
+
+def merge_config(overrides: dict, base: dict = None) -> dict:
+    """Section-wise merge of a (partial) config onto `base` (default: DEFAULT_CONFIG)."""
+    merged = json.loads(json.dumps(base or DEFAULT_CONFIG))
+    for key, value in (overrides or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key].update(value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def apply_config(config: dict) -> dict:
+    """Installs a (partial) config as the class-level parameters used by every generator."""
+    cfg = merge_config(config)
+    AISignalGenerator.SCORE_WEIGHTS = cfg["weights"]
+    AISignalGenerator.MIN_CONFIDENCE = cfg["min_confidence"]
+    AISignalGenerator.EXPIRY_TABLE = {level: tuple(tuple(row) for row in rows) for level, rows in cfg["expiry"].items()}
+    StrategyEngine.THRESHOLDS = cfg["thresholds"]
+    return cfg
+
+
+def load_signal_config(path: str = SIGNAL_CONFIG_PATH, rank: int = SIGNAL_CONFIG_RANK):
+    """Applies the rank-th config of an optimizer output file. Returns its entry, or None (defaults stay)."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            entry = json.load(f)["ranked"][rank - 1]
+        apply_config(entry["config"])
+        logging.info(f"Signal Config: Applied rank {rank} from {path} ({entry.get('objective')} in-sample: {entry.get('train')}, out-of-sample: {entry.get('test')})")
+        return entry
+    except Exception as e:
+        logging.error(f"Signal Config: Could not apply {path}: {e}. Using built-in defaults.")
+        return None
@@ -0,0 +1,83 @@
+import math
+import numpy as np
+import pandas as pd
+
+# Snapshot attribute -> frame column (last-bar values)
+LAST_FIELDS = {
+    'close': 'close', 'volume': 'volume',
+    'ema_9': 'EMA_9', 'ema_21': 'EMA_21', 'ema_50': 'EMA_50', 'ema_200': 'EMA_200',
+    'rsi': 'RSI_14', 'macd': 'MACD_12_26_9', 'macd_signal': 'MACDs_12_26_9',
+    'bb_lower': 'BBL_20_2.0', 'bb_upper': 'BBU_20_2.0', 'stoch_k': 'STOCHk_14_3_3',
+    'adx': 'ADX_14', 'adx_pos': 'ADX_pos', 'adx_neg': 'ADX_neg', 'atr': 'atr',
+}
+
+# Window aggregates the scoring / strategy / structure layers read
+WINDOW_FIELDS = (
+    'bars', 'prev_close', 'prev_ema_9', 'prev_ema_21', 'close_10_back',
+    'volume_recent', 'volume_avg', 'volume_20', 'atr_avg',
+    'high_20', 'low_20', 'bos_high', 'bos_low',
+)
+
+BOS_LOOKBACK = 30
+
+
+def _agg(values: np.ndarray, func):
+    """NaN-skipping reduction with pandas semantics (NaN when nothing is left)."""
+    values = values[~np.isnan(values)]
+    return float(func(values)) if values.size else math.nan
+
+
+class BarSnapshot:
+    """
+    Last-bar view of an indicator frame: Built once per signal and shared by TechnicalAnalysis,
+    StrategyEngine, MarketStructure and the AI helpers instead of repeated df.iloc[-1] Series lookups.
+    Missing columns are None and present-but-empty values NaN, so the original
+    'k in last_row' and pd.isna checks keep their meaning.
+    """
+    __slots__ = tuple(LAST_FIELDS) + WINDOW_FIELDS
+
+    def __init__(self, df: pd.DataFrame):
+        self.bars = n = len(df)
+        index = {col: i for i, col in enumerate(df.columns)}
+        try:
+            # One 2-D copy is far cheaper than a Series per column (df[col] costs ~50us in pandas 2)
+            values = df.to_numpy(dtype=float)
+            column = lambda col: values[:, index[col]]
+        except (TypeError, ValueError):
+            column = lambda col: df[col].to_numpy(dtype=float) # Non-numeric extra columns
+
+        arrays = {}
+        for attr, col in LAST_FIELDS.items():
+            if col in index and n:
+                arrays[attr] = arr = column(col)
+                setattr(self, attr, float(arr[-1]))
+            else:
+                setattr(self, attr, None)
+
+        close = arrays.get('close')
+        self.prev_close = float(close[-2]) if n >= 2 else None
+        self.close_10_back = float(close[-10]) if n >= 10 else None
+        self.prev_ema_9 = float(arrays['ema_9'][-2]) if 'ema_9' in arrays and n >= 2 else None
+        self.prev_ema_21 = float(arrays['ema_21'][-2]) if 'ema_21' in arrays and n >= 2 else None
+
+        volume = arrays.get('volume')
+        if volume is not None:
+            self.volume_recent = _agg(volume[-5:], np.mean)
+            self.volume_20 = _agg(volume[-20:], np.mean)
+            self.volume_avg = _agg(volume, np.mean)
+        else:
+            self.volume_recent = self.volume_20 = self.volume_avg = None
+        self.atr_avg = _agg(arrays['atr'], np.mean) if 'atr' in arrays else None
+
+        if n and 'high' in index and 'low' in index:
+            high, low = column('high'), column('low')
+            self.high_20, self.low_20 = _agg(high[-20:], np.max), _agg(low[-20:], np.min)
+            # Structure break range: The BOS_LOOKBACK bars before the current one
+            self.bos_high = _agg(high[-BOS_LOOKBACK:-1], np.max)
+            self.bos_low = _agg(low[-BOS_LOOKBACK:-1], np.min)
+        else:
+            self.high_20 = self.low_20 = self.bos_high = self.bos_low = None
+
+    @staticmethod
+    def isna(value) -> bool:
+        return value is None or value != value
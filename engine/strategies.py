@@ -1,67 +1,79 @@
 import pandas as pd
 import numpy as np
 
+from engine.indicators import trailing, trailing_mean, shift
+from engine.snapshot import BarSnapshot
+
 class StrategyEngine:
+    # evaluate_batch() codes -> the names evaluate() returns
+    STRATEGY_NAMES = (
+        "No Strategy Qualified", "Stable Market Scan", "High Volatility Conflict",
+        "Momentum Breakout (ADX+Vol)", "Trend Follower (EMA Cross)", "Mean Reversion (BB+RSI)",
+        "Smart Money (Structure BOS)", "Scalping Pulse (Stoch+MACD)",
+    )
+
+    # Entry thresholds (swept by engine/optimizer.py, overridden at startup by engine/signal_config.py)
+    THRESHOLDS = {
+        "cross_adx": 15, "mr_rsi_buy": 35, "mr_rsi_sell": 65, "momentum_adx": 20, "momentum_volume": 1.3,
+        "bos_pct": 0.003, "scalp_stoch_buy": 35, "scalp_stoch_sell": 65,
+    }
+
     @staticmethod
-    def evaluate(df: pd.DataFrame):
+    def evaluate(df: pd.DataFrame, snap: BarSnapshot = None):
         """
         Evaluates the market using 5 distinct quantitative strategies.
         Returns the name of the strongest qualifying strategy and its direction.
+        'snap' is the shared last-bar snapshot (built here if not passed).
         """
         if df.empty or len(df) < 20:
             return "No Strategy Qualified", "STAY"
 
-        last = df.iloc[-1]
-        prev = df.iloc[-2]
+        last = snap or BarSnapshot(df)
+        th = StrategyEngine.THRESHOLDS
         
         # TREND BIAS FILTER
         bias = 0
-        if 'EMA_50' in last and 'EMA_200' in last:
-            if last['close'] > last['EMA_50'] > last['EMA_200']: bias = 1
-            elif last['close'] < last['EMA_50'] < last['EMA_200']: bias = -1
+        if last.ema_50 is not None and last.ema_200 is not None:
+            if last.close > last.ema_50 > last.ema_200: bias = 1
+            elif last.close < last.ema_50 < last.ema_200: bias = -1
 
         results = []
 
         # 1. Trend Follower (EMA Cross) + ADX Confirmation
-        if 'EMA_9' in last and 'EMA_21' in last:
-            adx = last.get('ADX_14', 0)
-            if prev['EMA_9'] <= prev['EMA_21'] and last['EMA_9'] > last['EMA_21'] and adx > 15:
+        if last.ema_9 is not None and last.ema_21 is not None:
+            adx = last.adx if last.adx is not None else 0
+            if last.prev_ema_9 <= last.prev_ema_21 and last.ema_9 > last.ema_21 and adx > th["cross_adx"]:
                 results.append(("Trend Follower (EMA Cross)", "BUY", 0.85))
-            elif prev['EMA_9'] >= prev['EMA_21'] and last['EMA_9'] < last['EMA_21'] and adx > 15:
+            elif last.prev_ema_9 >= last.prev_ema_21 and last.ema_9 < last.ema_21 and adx > th["cross_adx"]:
                 results.append(("Trend Follower (EMA Cross)", "SELL", 0.85))
 
         # 2. Mean Reversion (Bollinger + RSI) + Trend Exhaustion
-        if all(k in last for k in ['RSI_14', 'BBL_20_2.0', 'BBU_20_2.0']):
+        if last.rsi is not None and last.bb_lower is not None and last.bb_upper is not None:
             # Bullish Reversal: Relaxed RSI 35/65
-            if last['close'] < last['BBL_20_2.0'] and last['RSI_14'] < 35 and bias != -1:
+            if last.close < last.bb_lower and last.rsi < th["mr_rsi_buy"] and bias != -1:
                 results.append(("Mean Reversion (BB+RSI)", "BUY", 0.8))
-            elif last['close'] > last['BBU_20_2.0'] and last['RSI_14'] > 65 and bias != 1:
+            elif last.close > last.bb_upper and last.rsi > th["mr_rsi_sell"] and bias != 1:
                 results.append(("Mean Reversion (BB+RSI)", "SELL", 0.8))
 
         # 3. Momentum Breakout (ADX + Volume)
-        if 'ADX_14' in last and 'volume' in last:
-            avg_vol = df['volume'].tail(20).mean()
-            if last['ADX_14'] > 20 and last['volume'] > avg_vol * 1.3:
+        if last.adx is not None and last.volume is not None:
+            if last.adx > th["momentum_adx"] and last.volume > last.volume_20 * th["momentum_volume"]:
                 # Must align with Bias
-                dir = "BUY" if (last['close'] > prev['close'] and bias != -1) else ("SELL" if (last['close'] < prev['close'] and bias != 1) else "STAY")
+                dir = "BUY" if (last.close > last.prev_close and bias != -1) else ("SELL" if (last.close < last.prev_close and bias != 1) else "STAY")
                 if dir != "STAY":
                     results.append(("Momentum Breakout (ADX+Vol)", dir, 0.9))
 
         # 4. Smart Money (BOS / Structure) - Increased to 0.3%
-        lookback = 30
-        upper_band = df['high'].iloc[-lookback:-1].max()
-        lower_band = df['low'].iloc[-lookback:-1].min()
-        
-        if last['close'] > upper_band * 1.003 and bias != -1:
+        if last.close > last.bos_high * (1 + th["bos_pct"]) and bias != -1:
             results.append(("Smart Money (Structure BOS)", "BUY", 0.8))
-        elif last['close'] < lower_band * 0.997 and bias != 1:
+        elif last.close < last.bos_low * (1 - th["bos_pct"]) and bias != 1:
             results.append(("Smart Money (Structure BOS)", "SELL", 0.8))
 
         # 5. Scalping Pulse (Stoch + MACD) - Trend Only
-        if all(k in last for k in ['STOCHk_14_3_3', 'MACD_12_26_9', 'MACDs_12_26_9']):
-            if bias != -1 and last['STOCHk_14_3_3'] < 35 and last['MACD_12_26_9'] > last['MACDs_12_26_9']:
+        if last.stoch_k is not None and last.macd is not None and last.macd_signal is not None:
+            if bias != -1 and last.stoch_k < th["scalp_stoch_buy"] and last.macd > last.macd_signal:
                 results.append(("Scalping Pulse (Stoch+MACD)", "BUY", 0.75))
-            elif bias != 1 and last['STOCHk_14_3_3'] > 65 and last['MACD_12_26_9'] < last['MACDs_12_26_9']:
+            elif bias != 1 and last.stoch_k > th["scalp_stoch_sell"] and last.macd < last.macd_signal:
                 results.append(("Scalping Pulse (Stoch+MACD)", "SELL", 0.75))
 
         if not results:
@@ -74,3 +86,57 @@ class StrategyEngine:
 
         results.sort(key=lambda x: x[2], reverse=True)
         return results[0][0], results[0][1]
+
+    @staticmethod
+    def evaluate_batch(cols: dict, has_volume: np.ndarray, thresholds: dict = None):
+        """
+        Vectorized evaluate() at every bar of (assets, bars) arrays.
+        Returns (name codes into STRATEGY_NAMES, directions +1 BUY / -1 SELL / 0 STAY); [:, -1] matches evaluate().
+        has_volume: per-asset flag for frames that carry a volume column; thresholds default to THRESHOLDS.
+        """
+        th = thresholds or StrategyEngine.THRESHOLDS
+        close, high, low = cols['close'], cols['high'], cols['low']
+        prev_close = shift(close)
+        with np.errstate(invalid='ignore'):
+            # TREND BIAS FILTER
+            ema50, ema200 = cols['EMA_50'], cols['EMA_200']
+            bias = np.where((close > ema50) & (ema50 > ema200), 1, np.where((close < ema50) & (ema50 < ema200), -1, 0))
+            adx = cols['ADX_14']
+
+            # 1. Trend Follower (EMA Cross) + ADX Confirmation
+            ema9, ema21 = cols['EMA_9'], cols['EMA_21']
+            prev9, prev21 = shift(ema9), shift(ema21)
+            cross_buy = (prev9 <= prev21) & (ema9 > ema21) & (adx > th["cross_adx"])
+            cross_sell = ~cross_buy & (prev9 >= prev21) & (ema9 < ema21) & (adx > th["cross_adx"])
+
+            # 2. Mean Reversion (Bollinger + RSI)
+            rsi = cols['RSI_14']
+            mr_buy = (close < cols['BBL_20_2.0']) & (rsi < th["mr_rsi_buy"]) & (bias != -1)
+            mr_sell = ~mr_buy & (close > cols['BBU_20_2.0']) & (rsi > th["mr_rsi_sell"]) & (bias != 1)
+
+            # 3. Momentum Breakout (ADX + Volume)
+            volume = cols['volume']
+            burst = np.asarray(has_volume)[:, None] & (adx > th["momentum_adx"]) & (volume > trailing_mean(volume, 20) * th["momentum_volume"])
+            mo_buy = burst & (close > prev_close) & (bias != -1)
+            mo_sell = burst & ~mo_buy & (close < prev_close) & (bias != 1)
+
+            # 4. Smart Money (BOS): Range of the previous 29 bars
+            upper = trailing(shift(high), 29, np.max, -np.inf)
+            lower = trailing(shift(low), 29, np.min, np.inf)
+            bos_buy = (close > upper * (1 + th["bos_pct"])) & (bias != -1)
+            bos_sell = ~bos_buy & (close < lower * (1 - th["bos_pct"])) & (bias != 1)
+
+            # 5. Scalping Pulse (Stoch + MACD)
+            stoch, macd, signal = cols['STOCHk_14_3_3'], cols['MACD_12_26_9'], cols['MACDs_12_26_9']
+            sc_buy = (bias != -1) & (stoch < th["scalp_stoch_buy"]) & (macd > signal)
+            sc_sell = ~sc_buy & (bias != 1) & (stoch > th["scalp_stoch_sell"]) & (macd < signal)
+
+        # CONFLICT RESOLUTION: Highest weight wins (ties keep evaluation order)
+        fired = [mo_buy | mo_sell, cross_buy | cross_sell, mr_buy | mr_sell, bos_buy | bos_sell, sc_buy | sc_sell]
+        any_buy = mo_buy | cross_buy | mr_buy | bos_buy | sc_buy
+        any_sell = mo_sell | cross_sell | mr_sell | bos_sell | sc_sell
+        short = np.zeros(close.shape, dtype=bool)
+        short[..., :19] = True # evaluate() needs 20 bars
+        codes = np.select([short, any_buy & any_sell, ~(any_buy | any_sell)] + fired, [0, 2, 1, 3, 4, 5, 6, 7])
+        directions = np.where(codes >= 3, np.where(any_buy, 1, -1), 0)
+        return codes, directions
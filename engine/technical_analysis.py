@@ -1,21 +1,75 @@
+import numpy as np
 import pandas as pd
 import ta
 from ta.momentum import RSIIndicator, StochasticOscillator
 from ta.trend import MACD, EMAIndicator, ADXIndicator
 from ta.volatility import BollingerBands
+from engine.indicators import compute_indicators, COLUMNS, ROW, MIN_BARS
+from engine.snapshot import BarSnapshot
 
 class TechnicalAnalysis:
     @staticmethod
     def calculate_indicators(df: pd.DataFrame):
         """
-        Calculates a standard set of technical indicators for the dataframe using the 'ta' library.
+        Calculates a standard set of technical indicators with the NumPy kernel (engine/indicators.py).
+        Output matches the 'ta' pipeline column for column; frames with NaN candles still go through 'ta'.
         Expected columns: open, high, low, close, volume
         """
         # Ensure columns are float
         for col in ['open', 'high', 'low', 'close', 'volume']:
-            if col in df.columns:
+            if col in df.columns and df[col].dtype != np.float64:
                 df[col] = df[col].astype(float)
         
+        high = df['high'].to_numpy()
+        low = df['low'].to_numpy()
+        close = df['close'].to_numpy()
+        if not (np.isfinite(high).all() and np.isfinite(low).all() and np.isfinite(close).all()):
+            return TechnicalAnalysis._calculate_indicators_ta(df)
+
+        out = compute_indicators(np.ascontiguousarray(high), np.ascontiguousarray(low), np.ascontiguousarray(close))
+        if len(df) < MIN_BARS:
+            # Same failure point as 'ta': Everything before ADX is attached, then it raises
+            for name in COLUMNS[:ROW['ADX_14']]:
+                df[name] = out[ROW[name]]
+            raise ValueError(f"ADX/ATR need at least {MIN_BARS} candles (got {len(df)})")
+
+        # One block insert instead of ~16 column inserts
+        base = df.drop(columns=[c for c in COLUMNS if c in df.columns])
+        return pd.concat([base, pd.DataFrame(out.T, index=df.index, columns=COLUMNS)], axis=1)
+
+    @staticmethod
+    def batchable(df: pd.DataFrame) -> bool:
+        """Frames the 2-D kernel can take as-is (enough bars for ADX/ATR, no NaN candles)."""
+        if len(df) < MIN_BARS:
+            return False
+        return all(np.isfinite(df[c].to_numpy(dtype=float)).all() for c in ('high', 'low', 'close'))
+
+    @staticmethod
+    def stack_frames(frames):
+        """
+        Stacks equal-length frames into (assets, bars) arrays keyed like frame columns, with indicators
+        computed for all assets in one kernel pass (frames that already carry live indicators keep theirs).
+        Returns (cols, has_volume).
+        """
+        def stack(col):
+            return np.vstack([df[col].to_numpy(dtype=float) if col in df.columns else np.full(len(df), np.nan) for df in frames])
+
+        cols = {c: stack(c) for c in ('open', 'high', 'low', 'close', 'volume')}
+        out = compute_indicators(cols['high'], cols['low'], cols['close'])
+        for i, df in enumerate(frames):
+            if TechnicalAnalysis.has_indicators(df):
+                out[:, i] = np.vstack([df[c].to_numpy(dtype=float) for c in COLUMNS])
+        cols.update({name: out[ROW[name]] for name in COLUMNS})
+        return cols, np.array(['volume' in df.columns for df in frames])
+
+    @staticmethod
+    def has_indicators(df: pd.DataFrame) -> bool:
+        """True when the frame already carries the full indicator set (e.g. live candle stream frames)."""
+        return all(c in df.columns for c in COLUMNS)
+
+    @staticmethod
+    def _calculate_indicators_ta(df: pd.DataFrame):
+        """Original 'ta' pipeline (kept for gappy frames, where its NaN handling differs)."""
         close = df['close']
         high = df['high']
         low = df['low']
@@ -58,34 +112,36 @@ class TechnicalAnalysis:
         return df
 
     @staticmethod
-    def get_signal_strength(df: pd.DataFrame):
+    def get_signal_strength(df: pd.DataFrame, snap: BarSnapshot = None):
         """
         Determines the strength of the move based on technicals.
         Returns a score from -1 (Strong Sell) to 1 (Strong Buy).
         Highly sensitive to trend strength and momentum.
+        'snap' is the shared last-bar snapshot (built here if not passed).
         """
         if df.empty or len(df) < 2:
             return 0
             
-        last_row = df.iloc[-1]
+        last = snap or BarSnapshot(df)
+        isna = BarSnapshot.isna
         score = 0
         total_weight = 0
         
         # 0. THE GOLDEN FILTER: EMA 50/200 Trend Alignment
         # We determine the "Bias" based on EMA location
         bias = 0
-        if all(k in last_row for k in ['close', 'EMA_50']):
-            if not pd.isna(last_row.get('EMA_200')):
-                if last_row['close'] > last_row['EMA_50'] > last_row['EMA_200']: bias = 1 
-                elif last_row['close'] < last_row['EMA_50'] < last_row['EMA_200']: bias = -1 
+        if last.close is not None and last.ema_50 is not None:
+            if not isna(last.ema_200):
+                if last.close > last.ema_50 > last.ema_200: bias = 1 
+                elif last.close < last.ema_50 < last.ema_200: bias = -1 
             else:
                 # Fallback to EMA_50 only if EMA_200 is missing
-                if last_row['close'] > last_row['EMA_50']: bias = 0.5 # Weak Bullish
+                if last.close > last.ema_50: bias = 0.5 # Weak Bullish
                 else: bias = -0.5 # Weak Bearish
         
         # 1. RSI (Weight: 2.0)
-        if 'RSI_14' in last_row and not pd.isna(last_row['RSI_14']):
-            rsi = last_row['RSI_14']
+        if not isna(last.rsi):
+            rsi = last.rsi
             rsi_delta = (rsi - 50) / 20 
             # In a bullish bias, we favor higher RSI; in bearish, lower.
             if (bias == 1 and rsi_delta > 0) or (bias == -1 and rsi_delta < 0):
@@ -99,31 +155,30 @@ class TechnicalAnalysis:
             elif bias == -1 and rsi > 60: score -= 1.5; total_weight += 1.0 # Sell the rip
         
         # 2. MACD (Weight: 2.0) - Trend Confirmation
-        if 'MACD_12_26_9' in last_row and 'MACDs_12_26_9' in last_row:
-            if not pd.isna(last_row['MACD_12_26_9']) and not pd.isna(last_row['MACDs_12_26_9']):
-                macd_val = last_row['MACD_12_26_9']
-                signal_val = last_row['MACDs_12_26_9']
-                cross_strength = (macd_val - signal_val) / (abs(macd_val) + abs(signal_val) + 0.0001)
-                
-                # Only give full weight if cross aligns with Bias
-                if (bias == 1 and cross_strength > 0) or (bias == -1 and cross_strength < 0):
-                    score += cross_strength * 2.0
-                else:
-                    score += cross_strength * 0.5 # Diminished if against trend
-                total_weight += 2.0
+        if not isna(last.macd) and not isna(last.macd_signal):
+            macd_val = last.macd
+            signal_val = last.macd_signal
+            cross_strength = (macd_val - signal_val) / (abs(macd_val) + abs(signal_val) + 0.0001)
+            
+            # Only give full weight if cross aligns with Bias
+            if (bias == 1 and cross_strength > 0) or (bias == -1 and cross_strength < 0):
+                score += cross_strength * 2.0
+            else:
+                score += cross_strength * 0.5 # Diminished if against trend
+            total_weight += 2.0
         
         # 3. EMA Confluence (Weight: 2.0) - HEAVIER WEIGHT
-        if 'EMA_50' in last_row and not pd.isna(last_row['EMA_50']):
-            price_dist = (last_row['close'] - last_row['EMA_50']) / last_row['EMA_50']
+        if not isna(last.ema_50):
+            price_dist = (last.close - last.ema_50) / last.ema_50
             ema_score = max(min(price_dist * 100, 2.0), -2.0)
             score += ema_score
             total_weight += 2.0
             
         # 4. ADX Trend Filtering (Weight: 1.5)
-        if 'ADX_14' in last_row and not pd.isna(last_row['ADX_14']):
-            adx = last_row['ADX_14']
+        if not isna(last.adx):
+            adx = last.adx
             if adx > 25: # Strong trend present
-                strength = (last_row['ADX_pos'] - last_row['ADX_neg']) / 50
+                strength = (last.adx_pos - last.adx_neg) / 50
                 score += strength * 1.5
                 total_weight += 1.5
             else:
@@ -131,8 +186,8 @@ class TechnicalAnalysis:
                 total_weight += 1.0
                 
         # 5. Stochastic (Weight: 1.5) - TREND RE-ENTRY ONLY
-        if 'STOCHk_14_3_3' in last_row and not pd.isna(last_row['STOCHk_14_3_3']):
-            stoch = last_row['STOCHk_14_3_3']
+        if not isna(last.stoch_k):
+            stoch = last.stoch_k
             # Re-entry: Stochastic oversold in a BULL trend
             if bias == 1 and stoch < 30:
                 score += 1.5
@@ -150,3 +205,66 @@ class TechnicalAnalysis:
         if bias == -1 and final_score > 0.2: final_score = 0.1
         
         return max(min(final_score, 1), -1)
+
+    @staticmethod
+    def get_signal_strength_batch(cols: dict) -> np.ndarray:
+        """
+        Vectorized get_signal_strength evaluated at every bar of (assets, bars) arrays.
+        `cols` maps frame column names to 2-D arrays; column [:, -1] equals the per-frame score.
+        """
+        close, ema50, ema200 = cols['close'], cols['EMA_50'], cols['EMA_200']
+        zeros = np.zeros(close.shape)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # 0. THE GOLDEN FILTER (falls back to EMA_50 only while EMA_200 is warming up)
+            bias = np.where(
+                np.isnan(ema200), np.where(close > ema50, 0.5, -0.5),
+                np.where((close > ema50) & (ema50 > ema200), 1.0, np.where((close < ema50) & (ema50 < ema200), -1.0, 0.0))
+            )
+            bull, bear = bias == 1, bias == -1
+            score = zeros.copy()
+            weight = zeros.copy()
+
+            # 1. RSI (+ trend-aligned dip/rip re-entry)
+            rsi = cols['RSI_14']
+            has = ~np.isnan(rsi)
+            delta = (rsi - 50) / 20
+            aligned = (bull & (delta > 0)) | (bear & (delta < 0))
+            score += np.where(has, delta * np.where(aligned, 2.5, 1.5), 0.0)
+            weight += np.where(has, 2.0, 0.0)
+            dip, rip = has & bull & (rsi < 40), has & bear & (rsi > 60)
+            score += 1.5 * dip - 1.5 * rip
+            weight += dip | rip
+
+            # 2. MACD
+            macd, signal = cols['MACD_12_26_9'], cols['MACDs_12_26_9']
+            has = ~np.isnan(macd) & ~np.isnan(signal)
+            cross = (macd - signal) / (np.abs(macd) + np.abs(signal) + 0.0001)
+            aligned = (bull & (cross > 0)) | (bear & (cross < 0))
+            score += np.where(has, cross * np.where(aligned, 2.0, 0.5), 0.0)
+            weight += np.where(has, 2.0, 0.0)
+
+            # 3. EMA Confluence
+            has = ~np.isnan(ema50)
+            score += np.where(has, np.clip((close - ema50) / ema50 * 100, -2.0, 2.0), 0.0)
+            weight += np.where(has, 2.0, 0.0)
+
+            # 4. ADX Trend Filtering
+            adx = cols['ADX_14']
+            has = ~np.isnan(adx)
+            strong = has & (adx > 25)
+            score += np.where(strong, (cols['ADX_pos'] - cols['ADX_neg']) / 50 * 1.5, 0.0)
+            weight += np.where(strong, 1.5, np.where(has, 1.0, 0.0))
+
+            # 5. Stochastic re-entry
+            stoch = cols['STOCHk_14_3_3']
+            has = ~np.isnan(stoch)
+            buy, sell = has & bull & (stoch < 30), has & bear & (stoch > 70)
+            score += 1.5 * buy - 1.5 * sell
+            weight += 1.5 * (buy | sell)
+
+            final = np.where(weight == 0, 0.0, score / weight)
+        final = np.where(bull & (final < -0.2), -0.1, final)
+        final = np.where(bear & (final > 0.2), 0.1, final)
+        final = np.clip(final, -1, 1)
+        final[..., :1] = 0 # Needs 2 bars
+        return final
@@ -6,7 +6,6 @@ import sys
 from dotenv import load_dotenv
 from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, CallbackQueryHandler, filters
 from bot.handlers import start_command, handle_message, callback_handler
-from utils.db import init_db
 from config import Config
 from api.server import app as api_app  # Combined Process
 import uvicorn
@@ -41,99 +40,161 @@ async def start_polling(application):
 sent_radar_messages = []
 
 async def market_radar_loop(application):
-    """Background Radar: Scans every 15 minutes and notifies users of setups. Alerts expire after 30m."""
+    """
+    Background Radar: Notifies users of setups. Alerts expire after 30m.
+    With the scan scheduler running it reacts to each batch of fresh closed-bar signals,
+    otherwise it scans every 15 minutes.
+    """
     import time
     import asyncio
-    from bot.handlers import scan_market_now, global_gc
+    from bot.handlers import scan_market_now, global_gc, RADAR_ASSETS
     from utils.formatter import format_signal
-    from utils.db import init_db
+    from utils.async_db import init_async_db
+    from utils.engines import get_scan_scheduler
     last_alerts = {} 
+    scheduler = get_scan_scheduler()
+    queue = scheduler.subscribe() if scheduler.active else None
+    radar_symbols = {symbol for symbol, _ in RADAR_ASSETS}
     
-    while True:
-        try:
-            import gc
-            gc.collect() # Pre-scan cleanup
-            
-            logging.info("Radar Detector: Scanning Markets for prime setups...")
-            signals = await scan_market_now()
+    try:
+        while True:
+            try:
+                if queue is not None:
+                    # EVENT-DRIVEN: Wait for the scheduler's next batch of new-candle evaluations
+                    published = await queue.get()
+                    signals = [s for symbol, s in published.items() if s and symbol in radar_symbols]
+                else:
+                    import gc
+                    gc.collect() # Pre-scan cleanup
+                
+                    logging.info("Radar Detector: Scanning Markets for prime setups...")
+                    signals = await scan_market_now()
             
-            if signals:
-                db = init_db()
-                users = db.get_all_users()
+                if signals:
+                    db = init_async_db()
+                    try:
+                        users = await db.get_all_users()
+                    finally:
+                        await db.close() # Don't hold a read snapshot open while messages go out
                 
-                for signal in signals:
-                    # 1. Premium Filter: Only 70%+ confidence for Radar Alerts
-                    if signal['confidence'] < 70:
-                        continue
+                    for signal in signals:
+                        # 1. Premium Filter: Only 70%+ confidence for Radar Alerts (raw score: 'confidence' may be the calibrated win rate)
+                        if signal['raw_confidence'] < 70:
+                            continue
     
-                    # 2. Freshness Filter: Ensure at least 2 minutes of lead time
-                    # Prevents "stale" signals if scanning or batching was slow
-                    if signal['entry_timestamp'] < (time.time() + 120):
-                        logging.info(f"Radar: Skipping {signal['asset']} - inadequate lead time (< 2m).")
-                        continue
+                        # 2. Freshness Filter: Ensure at least 2 minutes of lead time
+                        # Prevents "stale" signals if scanning or batching was slow
+                        if signal['entry_timestamp'] < (time.time() + 120):
+                            logging.info(f"Radar: Skipping {signal['asset']} - inadequate lead time (< 2m).")
+                            continue
     
-                    # Deduplication logic (skip if we alerted for this asset/direction in the last hour)
-                    alert_key = f"{signal['asset']}_{signal['direction']}"
-                    if alert_key in last_alerts and (time.time() - last_alerts[alert_key]) < 3600:
-                        continue
+                        # Deduplication logic (skip if we alerted for this asset/direction in the last hour)
+                        alert_key = f"{signal['asset']}_{signal['direction']}"
+                        if alert_key in last_alerts and (time.time() - last_alerts[alert_key]) < 3600:
+                            continue
                     
-                    # Parallel Message Dispatch
-                    async def notify_user(user, signal, last_alerts, alert_key):
-                        try:
-                            if not user.notifications_enabled:
-                                return
+                        # Parallel Message Dispatch
+                        async def notify_user(user, signal, last_alerts, alert_key):
+                            try:
+                                if not user.notifications_enabled:
+                                    return
                                 
-                            user_tz = user.timezone or "UTC"
-                            message, kb = format_signal(signal, user_tz=user_tz)
-                            full_msg = f"🔔 **SIGNAL DETECTED** (High Confidence) 🔔\n\n{message}"
+                                user_tz = user.timezone or "UTC"
+                                message, kb = format_signal(signal, user_tz=user_tz)
+                                full_msg = f"🔔 **SIGNAL DETECTED** (High Confidence) 🔔\n\n{message}"
                             
-                            sent_msg = await application.bot.send_message(
-                                chat_id=user.telegram_id,
-                                text=full_msg,
-                                reply_markup=kb,
-                                parse_mode="Markdown"
-                            )
-                            # Track for auto-deletion (30 minutes expiry)
-                            sent_radar_messages.append((user.telegram_id, sent_msg.message_id, time.time() + 1800))
-                        except Exception:
-                            pass # Handle blocked users
+                                sent_msg = await application.bot.send_message(
+                                    chat_id=user.telegram_id,
+                                    text=full_msg,
+                                    reply_markup=kb,
+                                    parse_mode="Markdown"
+                                )
+                                # Track for auto-deletion (30 minutes expiry)
+                                sent_radar_messages.append((user.telegram_id, sent_msg.message_id, time.time() + 1800))
+                            except Exception:
+                                pass # Handle blocked users
 
-                    # Create batches of 5 to prevent RAM spikes
-                    batch_size = 5
-                    for i in range(0, len(users), batch_size):
-                        batch = users[i:i + batch_size]
-                        notif_tasks = [notify_user(u, signal, last_alerts, alert_key) for u in batch]
-                        if notif_tasks:
-                            await asyncio.gather(*notif_tasks)
-                        await asyncio.sleep(0.1) # Micro-pause for RAM stability
+                        # Create batches of 5 to prevent RAM spikes
+                        batch_size = 5
+                        for i in range(0, len(users), batch_size):
+                            batch = users[i:i + batch_size]
+                            notif_tasks = [notify_user(u, signal, last_alerts, alert_key) for u in batch]
+                            if notif_tasks:
+                                await asyncio.gather(*notif_tasks)
+                            await asyncio.sleep(0.1) # Micro-pause for RAM stability
                     
-                    last_alerts[alert_key] = time.time()
-                    logging.info(f"Radar Alert: Dispatched {alert_key} to {len(users)} users.")
-                
-                db.close()
+                        last_alerts[alert_key] = time.time()
+                        logging.info(f"Radar Alert: Dispatched {alert_key} to {len(users)} users.")
+            
+                if queue is not None:
+                    continue # The scheduler paces the radar and reclaims RAM after each pass
                 
-            # Lion RAM Shield: Purge all caches and reclaim memory
-            from bot.handlers import global_gc
-            global_gc()
+                # Lion RAM Shield: Purge caches once RSS is over budget
+                from bot.handlers import global_gc
+                global_gc()
                 
-            # Radar frequency: Every 15 minutes (900 seconds)
-            await asyncio.sleep(900) 
+                # Radar frequency: Every 15 minutes (900 seconds)
+                await asyncio.sleep(900) 
             
-        except Exception as e:
-            logging.error(f"Radar Detector Error: {e}")
-            await asyncio.sleep(60) # Back off on error
+            except Exception as e:
+                logging.error(f"Radar Detector Error: {e}")
+                await asyncio.sleep(60) # Back off on error
+    finally:
+        scheduler.unsubscribe(queue)
 
 async def main():
-    # Initialize Database & Seed Plans
-    from utils.db import init_db, seed_plans
-    init_db(force_create=False)
+    # Bring the schema up to date (once, here) & Seed Plans
+    from utils.migrations import ensure_schema
+    from utils.db import seed_plans
+    ensure_schema()
     seed_plans()
     
+    # Optimizer-ranked scoring parameters (no file = built-in defaults)
+    from engine.signal_config import load_signal_config
+    load_signal_config()
+    
+    # Confidence calibration fitted on resolved signals (scripts/fit_calibration.py)
+    from engine.calibration import load_calibration
+    load_calibration()
+    
+    # tracemalloc allocation sites per subsystem (/api/admin/memory), off unless investigating
+    from utils.mem_profiler import MEM_PROFILER, get_mem_profiler
+    if MEM_PROFILER:
+        get_mem_profiler().start()
+    
+    # Loop lag sampler + blocked-loop watchdog (percentiles in /api/health)
+    from utils.loop_monitor import LOOP_MONITOR, get_loop_monitor
+    if LOOP_MONITOR:
+        get_loop_monitor().start()
+    
     # Check for Token
     if not TOKEN:
         print("CRITICAL: TELEGRAM_BOT_TOKEN not found in .env file.")
         return
 
+    # Live candle streams for the radar universe: fetch_data becomes a buffer lookup for these
+    if os.getenv("CANDLE_STREAMING", "1") == "1":
+        from bot.handlers import RADAR_ASSETS
+        from utils.engines import get_candle_streams
+        get_candle_streams().watch_many(RADAR_ASSETS)
+
+    # Resolve expired signals against later candles (win rates per strategy / confidence band)
+    if os.getenv("OUTCOME_TRACKER", "1") == "1":
+        from engine.outcome_tracker import OutcomeTracker
+        asyncio.create_task(OutcomeTracker().run_forever())
+
+    # Closed-bar scan scheduler: Each asset is evaluated once per new candle and published to
+    # the radar, the autotrader and the Mini App instead of every consumer scanning on its own timer
+    from engine.scan_scheduler import SCAN_SCHEDULER
+    if SCAN_SCHEDULER:
+        from bot.handlers import RADAR_ASSETS
+        from api.server import MARKET_SCAN_ASSETS
+        from utils.engines import get_scan_scheduler
+        scheduler = get_scan_scheduler()
+        scheduler.track(RADAR_ASSETS)
+        scheduler.track(MARKET_SCAN_ASSETS)
+        scheduler.start()
+
     # Combined API & Bot Process (RAM Efficient)
     logging.info("Starting background API task...")
     asyncio.create_task(start_combined_api())
@@ -141,8 +202,9 @@ async def main():
     print("TradeSigx Bot: Building Application layer...")
     logging.info(f"Configuration: BASE_URL is set to {Config.BASE_URL}")
     # Build Application
-    from telegram.request import HTTPXRequest
-    request = HTTPXRequest(connect_timeout=60, read_timeout=60)
+    # Metered: Every Bot API call (editMessageText, sendMessage...) lands in the /metrics histograms
+    from utils.metrics import telegram_request
+    request = telegram_request(connect_timeout=60, read_timeout=60)
     application = ApplicationBuilder().token(TOKEN).request(request).build()
     
     print("TradeSigx Bot: Registering Handlers...")
@@ -257,8 +319,16 @@ async def main():
     if api_process:
         api_process.terminate()
 
+async def run_bot():
+    """Runs the bot and releases shared network resources (pooled sockets/sessions) on shutdown."""
+    try:
+        await main()
+    finally:
+        from utils.engines import close_shared_engines
+        await close_shared_engines()
+
 if __name__ == '__main__':
     try:
-        asyncio.run(main())
+        asyncio.run(run_bot())
     except KeyboardInterrupt:
         pass
@@ -0,0 +1,165 @@
+"""
+Per-signal latency of the scoring layers (TA strength, strategies, structure, volume/momentum/volatility)
+reading one shared BarSnapshot vs. the previous df.iloc[-1] Series access (kept below as the reference).
+Also checks that both produce identical results.
+
+Usage: python scripts/bench_bar_snapshot.py [--bars 200] [--runs 500]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.getcwd())
+from engine.ai_generator import AISignalGenerator
+from engine.market_structure import MarketStructure
+from engine.snapshot import BarSnapshot
+from engine.strategies import StrategyEngine
+from engine.technical_analysis import TechnicalAnalysis
+
+
+# --- Reference: Row-access versions replaced by BarSnapshot ---
+def row_signal_strength(df):
+    last_row = df.iloc[-1]
+    score, total_weight, bias = 0, 0, 0
+    if all(k in last_row for k in ['close', 'EMA_50']):
+        if not pd.isna(last_row.get('EMA_200')):
+            if last_row['close'] > last_row['EMA_50'] > last_row['EMA_200']: bias = 1
+            elif last_row['close'] < last_row['EMA_50'] < last_row['EMA_200']: bias = -1
+        else:
+            bias = 0.5 if last_row['close'] > last_row['EMA_50'] else -0.5
+    if 'RSI_14' in last_row and not pd.isna(last_row['RSI_14']):
+        rsi = last_row['RSI_14']
+        delta = (rsi - 50) / 20
+        score += delta * (2.5 if (bias == 1 and delta > 0) or (bias == -1 and delta < 0) else 1.5)
+        total_weight += 2.0
+        if bias == 1 and rsi < 40: score += 1.5; total_weight += 1.0
+        elif bias == -1 and rsi > 60: score -= 1.5; total_weight += 1.0
+    if 'MACD_12_26_9' in last_row and 'MACDs_12_26_9' in last_row:
+        if not pd.isna(last_row['MACD_12_26_9']) and not pd.isna(last_row['MACDs_12_26_9']):
+            m, s = last_row['MACD_12_26_9'], last_row['MACDs_12_26_9']
+            cross = (m - s) / (abs(m) + abs(s) + 0.0001)
+            score += cross * (2.0 if (bias == 1 and cross > 0) or (bias == -1 and cross < 0) else 0.5)
+            total_weight += 2.0
+    if 'EMA_50' in last_row and not pd.isna(last_row['EMA_50']):
+        score += max(min((last_row['close'] - last_row['EMA_50']) / last_row['EMA_50'] * 100, 2.0), -2.0)
+        total_weight += 2.0
+    if 'ADX_14' in last_row and not pd.isna(last_row['ADX_14']):
+        if last_row['ADX_14'] > 25:
+            score += (last_row['ADX_pos'] - last_row['ADX_neg']) / 50 * 1.5
+            total_weight += 1.5
+        else:
+            total_weight += 1.0
+    if 'STOCHk_14_3_3' in last_row and not pd.isna(last_row['STOCHk_14_3_3']):
+        stoch = last_row['STOCHk_14_3_3']
+        if bias == 1 and stoch < 30: score += 1.5; total_weight += 1.5
+        elif bias == -1 and stoch > 70: score -= 1.5; total_weight += 1.5
+    if total_weight == 0: return 0
+    final = score / total_weight
+    if bias == 1 and final < -0.2: final = -0.1
+    if bias == -1 and final > 0.2: final = 0.1
+    return max(min(final, 1), -1)
+
+
+def row_evaluate(df):
+    last, prev = df.iloc[-1], df.iloc[-2]
+    bias = 0
+    if 'EMA_50' in last and 'EMA_200' in last:
+        if last['close'] > last['EMA_50'] > last['EMA_200']: bias = 1
+        elif last['close'] < last['EMA_50'] < last['EMA_200']: bias = -1
+    results = []
+    if 'EMA_9' in last and 'EMA_21' in last:
+        adx = last.get('ADX_14', 0)
+        if prev['EMA_9'] <= prev['EMA_21'] and last['EMA_9'] > last['EMA_21'] and adx > 15: results.append(("Trend Follower (EMA Cross)", "BUY", 0.85))
+        elif prev['EMA_9'] >= prev['EMA_21'] and last['EMA_9'] < last['EMA_21'] and adx > 15: results.append(("Trend Follower (EMA Cross)", "SELL", 0.85))
+    if all(k in last for k in ['RSI_14', 'BBL_20_2.0', 'BBU_20_2.0']):
+        if last['close'] < last['BBL_20_2.0'] and last['RSI_14'] < 35 and bias != -1: results.append(("Mean Reversion (BB+RSI)", "BUY", 0.8))
+        elif last['close'] > last['BBU_20_2.0'] and last['RSI_14'] > 65 and bias != 1: results.append(("Mean Reversion (BB+RSI)", "SELL", 0.8))
+    if 'ADX_14' in last and 'volume' in last:
+        if last['ADX_14'] > 20 and last['volume'] > df['volume'].tail(20).mean() * 1.3:
+            d = "BUY" if (last['close'] > prev['close'] and bias != -1) else ("SELL" if (last['close'] < prev['close'] and bias != 1) else "STAY")
+            if d != "STAY": results.append(("Momentum Breakout (ADX+Vol)", d, 0.9))
+    upper, lower = df['high'].iloc[-30:-1].max(), df['low'].iloc[-30:-1].min()
+    if last['close'] > upper * 1.003 and bias != -1: results.append(("Smart Money (Structure BOS)", "BUY", 0.8))
+    elif last['close'] < lower * 0.997 and bias != 1: results.append(("Smart Money (Structure BOS)", "SELL", 0.8))
+    if all(k in last for k in ['STOCHk_14_3_3', 'MACD_12_26_9', 'MACDs_12_26_9']):
+        if bias != -1 and last['STOCHk_14_3_3'] < 35 and last['MACD_12_26_9'] > last['MACDs_12_26_9']: results.append(("Scalping Pulse (Stoch+MACD)", "BUY", 0.75))
+        elif bias != 1 and last['STOCHk_14_3_3'] > 65 and last['MACD_12_26_9'] < last['MACDs_12_26_9']: results.append(("Scalping Pulse (Stoch+MACD)", "SELL", 0.75))
+    if not results: return "Stable Market Scan", "STAY"
+    if {"BUY", "SELL"} <= {r[1] for r in results}: return "High Volatility Conflict", "STAY"
+    results.sort(key=lambda x: x[2], reverse=True)
+    return results[0][0], results[0][1]
+
+
+def row_structure(df):
+    df['hh'] = df['high'].rolling(window=5, center=True).max()
+    df['ll'] = df['low'].rolling(window=5, center=True).min()
+    trend = "Neutral"
+    ema50, ema200 = df['EMA_50'].iloc[-1], df['EMA_200'].iloc[-1]
+    if not pd.isna(ema50) and not pd.isna(ema200):
+        trend = "Bullish" if ema50 > ema200 else "Bearish"
+    return trend, df['low'].tail(20).min(), df['high'].tail(20).max()
+
+
+def row_helpers(df):
+    recent, avg = df['volume'].iloc[-5:].mean(), df['volume'].mean()
+    up = df['close'].iloc[-1] > df['close'].iloc[-2]
+    vol = (0.8 if up else -0.8) if recent > avg * 1.5 else ((0.4 if up else -0.4) if recent > avg * 1.2 else 0)
+    mom = max(min((df['close'].iloc[-1] - df['close'].iloc[-10]) / df['close'].iloc[-10] * 20, 1), -1)
+    atr, atr_avg = df['atr'].iloc[-1], df['atr'].mean()
+    level = "HIGH" if atr > atr_avg * 1.3 else ("LOW" if atr < atr_avg * 0.7 else "NORMAL")
+    return vol, mom, level
+
+
+def row_layers(df):
+    s = row_structure(df)
+    return row_signal_strength(df), row_evaluate(df), s, row_helpers(df)
+
+
+def snapshot_layers(df, ai):
+    snap = BarSnapshot(df)
+    s = MarketStructure.detect_structure(df, snap)
+    return (
+        TechnicalAnalysis.get_signal_strength(df, snap), StrategyEngine.evaluate(df, snap),
+        (s['trend'], s['support'], s['resistance']),
+        (ai._analyze_volume(df, snap), ai._calculate_momentum(df, snap), ai._get_volatility_level(df, snap)),
+    )
+
+
+def random_frame(bars, seed):
+    rng = np.random.default_rng(seed)
+    close = 1.1 * (1 + np.cumsum(rng.normal(0, 0.003, bars)))
+    open_ = np.r_[close[0], close[:-1]]
+    return TechnicalAnalysis.calculate_indicators(pd.DataFrame({
+        'open': open_, 'close': close, 'volume': rng.integers(10, 1000, bars).astype(float),
+        'high': np.maximum(open_, close) + np.abs(rng.normal(0, 0.001, bars)),
+        'low': np.minimum(open_, close) - np.abs(rng.normal(0, 0.001, bars)),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bars", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=500)
+    args = parser.parse_args()
+
+    ai = AISignalGenerator()
+    frames = [random_frame(args.bars, seed) for seed in range(50)]
+    for df in frames:
+        ref, new = row_layers(df.copy()), snapshot_layers(df.copy(), ai)
+        assert np.allclose(ref[0], new[0]) and ref[1:] == new[1:], f"mismatch: {ref} vs {new}"
+
+    timings = {}
+    for name, func in (("row access", row_layers), ("snapshot", lambda df: snapshot_layers(df, ai))):
+        start = time.perf_counter()
+        for i in range(args.runs):
+            func(frames[i % len(frames)])
+        timings[name] = (time.perf_counter() - start) / args.runs * 1e6
+    print(f"per-signal scoring layers ({args.bars} bars): row access={timings['row access']:7.1f}us "
+          f"snapshot={timings['snapshot']:7.1f}us -> {timings['row access'] / timings['snapshot']:5.1f}x | results match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Runs the same bulk scan through every SIGNAL_COMPUTE_MODE (inline / thread / process) while a heartbeat
+coroutine measures how long the event loop stalls, and checks that all modes produce the same signals.
+
+Usage: python scripts/bench_compute_pool.py [--assets 40] [--bars 200] [--runs 3] [--workers 2]
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import logging
+
+sys.path.append(os.getcwd())
+from engine.ai_generator import AISignalGenerator
+from engine.compute_pool import ComputePool
+import utils.engines as engines
+from scripts.bench_batch_signals import random_frame, same
+
+
+async def heartbeat(lags, stop, every=0.005):
+    """Records how late each 5ms tick fires (the stall other coroutines would see)."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(every)
+        lags.append(time.perf_counter() - start - every)
+
+
+async def run_mode(mode, workers, frames, runs):
+    engines._compute_pool = pool = ComputePool(mode, workers)
+    ai = AISignalGenerator()
+    await ai.generate_signals_batch(dict(list(frames.items())[:2])) # Warm-up (starts the workers)
+    await ai.generate_signal(*next(iter(frames.items())), fast_scan=True)
+
+    lags, stop = [], asyncio.Event()
+    beat = asyncio.create_task(heartbeat(lags, stop))
+    await asyncio.sleep(0.01) # Let the heartbeat start ticking
+    start = time.perf_counter()
+    for _ in range(runs):
+        batch = await ai.generate_signals_batch(frames)
+        singles = {a: await ai.generate_signal(a, df, fast_scan=True) for a, df in frames.items()}
+    elapsed = (time.perf_counter() - start) / runs
+    await asyncio.sleep(0.01) # One more tick so a stall that lasted until the end is recorded
+    stop.set()
+    await beat
+    pool.shutdown()
+    return batch, singles, elapsed, max(lags, default=0.0)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", type=int, default=40)
+    parser.add_argument("--bars", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    # Mixed lengths: Most frames batch together, a few take the per-asset path
+    frames = {f"SYN_{i}": random_frame(args.bars if i % 5 else args.bars - 37, i) for i in range(args.assets)}
+    reference = None
+    for mode in ("inline", "thread", "process"):
+        batch, singles, elapsed, stall = await run_mode(mode, args.workers, frames, args.runs)
+        if reference is None:
+            reference = (batch, singles)
+        mismatches = sum(not same(batch[a], reference[0][a]) for a in frames) + \
+            sum(not same(singles[a], reference[1][a]) for a in frames)
+        print(f"{mode:<8} {elapsed * 1000:8.1f} ms/scan   worst loop stall {stall * 1000:7.1f} ms   mismatches vs inline: {mismatches}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+"""
+Counts the SQL statements (and time) a typical Telegram callback spends on the database:
+init_db() + one user lookup, with the old per-call create_all() schema check against the current
+session-only init_db(). Runs on a throwaway SQLite file migrated to the latest schema.
+
+Usage: python scripts/bench_db_queries.py [--callbacks 200]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.append(os.getcwd())
+from sqlalchemy import create_engine, event
+import utils.db as db
+from utils.migrations import migrate
+
+
+def legacy_init_db():
+    """init_db() as it was: Schema inspection (create_all + late column PRAGMAs) on every call."""
+    db.Base.metadata.create_all(db.engine)
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql("PRAGMA table_info(signal_history)")
+    return db.DBManager()
+
+
+def run(init, callbacks, counter):
+    counter[0] = 0
+    start = time.perf_counter()
+    for i in range(callbacks):
+        manager = init()
+        manager.get_user_by_telegram_id(str(i % 10))
+        manager.close()
+    return counter[0] / callbacks, (time.perf_counter() - start) / callbacks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--callbacks", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", connect_args={"check_same_thread": False})
+        migrate(engine)
+        db.engine = engine
+        db.Session.configure(bind=engine)
+        manager = db.DBManager()
+        for i in range(10):
+            manager.add(db.User(telegram_id=str(i), username=f"user{i}"))
+        manager.commit()
+        manager.close()
+
+        counter = [0]
+        event.listen(engine, "before_cursor_execute", lambda *a: counter.__setitem__(0, counter[0] + 1))
+        before_q, before_t = run(legacy_init_db, args.callbacks, counter)
+        after_q, after_t = run(db.init_db, args.callbacks, counter)
+        engine.dispose()
+
+    print(f"{'':<22}{'queries/callback':>18}{'ms/callback':>14}")
+    print(f"{'create_all per call':<22}{before_q:>18.1f}{before_t * 1000:>14.2f}")
+    print(f"{'migrated at startup':<22}{after_q:>18.1f}{after_t * 1000:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
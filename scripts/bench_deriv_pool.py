@@ -0,0 +1,147 @@
+"""
+Benchmarks the shared Deriv WS pool against the legacy connect-per-call pattern.
+Runs against a local fake binaryws server, so no app_id/token or network is needed.
+
+Usage: python scripts/bench_deriv_pool.py [--requests 200] [--concurrency 13] [--handshake-ms 80]
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+
+sys.path.append(os.getcwd())
+import websockets
+from data.deriv_pool import DerivConnectionPool
+
+
+def fake_candles(count, granularity):
+    now = int(time.time()) // granularity * granularity
+    price = 100.0
+    candles = []
+    for i in range(count):
+        o = price
+        price += random.uniform(-1, 1)
+        candles.append({
+            "epoch": now - (count - i) * granularity,
+            "open": round(o, 4), "high": round(max(o, price) + 0.2, 4),
+            "low": round(min(o, price) - 0.2, 4), "close": round(price, 4)
+        })
+    return candles
+
+
+async def stream_ohlc(ws, req, sub_id, last, interval=0.2):
+    """Pushes 'ohlc' updates for a subscribe=1 ticks_history request."""
+    granularity = req.get("granularity", 60)
+    price = last["close"]
+    while True:
+        await asyncio.sleep(interval)
+        price += random.uniform(-0.5, 0.5)
+        now = int(time.time())
+        ohlc = {"open_time": now // granularity * granularity, "epoch": now, "granularity": granularity,
+                "symbol": req["ticks_history"], "id": sub_id, "open": str(last["close"]),
+                "high": str(max(price, last["close"])), "low": str(min(price, last["close"])), "close": str(price)}
+        await ws.send(json.dumps({"msg_type": "ohlc", "ohlc": ohlc, "subscription": {"id": sub_id},
+                                  "echo_req": req, "req_id": req.get("req_id")}))
+
+
+async def fake_binaryws(ws, path=None, handshake_ms=0, latency_ms=0):
+    """Answers authorize/ticks_history (incl. subscribe=1 streams) the way binaryws does, echoing req_id."""
+    # Emulates TLS + app_id handshake cost paid on every fresh connection
+    await asyncio.sleep(handshake_ms / 1000)
+    streams = {}
+
+    async def answer(req):
+        await asyncio.sleep(latency_ms / 1000)
+        if "authorize" in req:
+            resp = {"msg_type": "authorize", "authorize": {"loginid": "VRTC000"}}
+        elif "ticks_history" in req:
+            resp = {"msg_type": "candles", "candles": fake_candles(req.get("count", 200), req.get("granularity", 60))}
+            if req.get("subscribe"):
+                sub_id = f"sub-{len(streams) + 1}"
+                resp["subscription"] = {"id": sub_id}
+                streams[sub_id] = asyncio.create_task(stream_ohlc(ws, req, sub_id, resp["candles"][-1]))
+        elif "forget" in req:
+            task = streams.pop(req["forget"], None)
+            if task:
+                task.cancel()
+            resp = {"msg_type": "forget", "forget": int(task is not None)}
+        else:
+            resp = {"msg_type": "error", "error": {"code": "UnrecognisedRequest", "message": "Unrecognised request"}}
+        resp["echo_req"] = req
+        if "req_id" in req:
+            resp["req_id"] = req["req_id"]
+        await ws.send(json.dumps(resp))
+
+    try:
+        async for raw in ws:
+            req = json.loads(raw)
+            if "authorize" in req:
+                # Authorization is serialized per socket like the real API
+                await answer(req)
+            else:
+                asyncio.create_task(answer(req))
+    finally:
+        for task in streams.values():
+            task.cancel()
+
+
+async def legacy_call(uri, token, symbol):
+    """The pre-pool get_synthetic_data pattern: connect, authorize, request, close."""
+    async with websockets.connect(uri, close_timeout=5) as ws:
+        if token:
+            await ws.send(json.dumps({"authorize": token}))
+            await ws.recv()
+        await ws.send(json.dumps({"ticks_history": symbol, "count": 200, "end": "latest", "style": "candles", "granularity": 300}))
+        return json.loads(await ws.recv())
+
+
+async def run(mode, uri, token, total, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+    pool = DerivConnectionPool(token=token, uri=uri) if mode == "pool" else None
+    symbols = ["R_100", "R_75", "1HZ100V", "1HZ75V", "C1000", "B1000", "frxEURUSD"]
+
+    async def one(i):
+        async with sem:
+            symbol = symbols[i % len(symbols)]
+            if pool:
+                data = await pool.request({"ticks_history": symbol, "count": 200, "end": "latest", "style": "candles", "granularity": 300})
+            else:
+                data = await legacy_call(uri, token, symbol)
+            assert "candles" in data, data
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(total)])
+    elapsed = time.perf_counter() - start
+    stats = pool.get_stats() if pool else {"connects": total}
+    if pool:
+        await pool.close()
+    return elapsed, stats
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=13)
+    parser.add_argument("--handshake-ms", type=float, default=80)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    async def handler(ws, path=None):
+        await fake_binaryws(ws, path, handshake_ms=args.handshake_ms, latency_ms=args.latency_ms)
+
+    async with websockets.serve(handler, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        uri = f"ws://127.0.0.1:{port}"
+        token = "fake-token"
+        print(f"Fake binaryws on {uri} | handshake={args.handshake_ms}ms latency={args.latency_ms}ms")
+        print("-" * 60)
+        for mode in ("legacy", "pool"):
+            elapsed, stats = await run(mode, uri, token, args.requests, args.concurrency)
+            print(f"{mode:>6}: {args.requests} requests in {elapsed:.2f}s -> {args.requests / elapsed:7.1f} req/s | connects={stats['connects']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
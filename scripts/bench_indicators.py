@@ -0,0 +1,55 @@
+"""
+Benchmarks TechnicalAnalysis.calculate_indicators (NumPy kernel) against the original 'ta' pipeline
+and checks that every indicator column matches.
+
+Usage: python scripts/bench_indicators.py [--bars 200] [--runs 200]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.getcwd())
+from engine.technical_analysis import TechnicalAnalysis
+from engine.indicators import COLUMNS
+
+
+def random_candles(bars, price=1.1, seed=7):
+    rng = np.random.default_rng(seed)
+    close = price * (1 + np.cumsum(rng.normal(0, 0.002, bars)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) + np.abs(rng.normal(0, 0.001 * price, bars))
+    low = np.minimum(open_, close) - np.abs(rng.normal(0, 0.001 * price, bars))
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close,
+                         'volume': rng.integers(100, 1000, bars).astype(float)})
+
+
+def timed(func, base, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        out = func(base.copy())
+    return (time.perf_counter() - start) / runs * 1000, out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bars", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    for price in (1.1, 150.0, 60000.0):
+        base = random_candles(args.bars, price)
+        ta_ms, ref = timed(TechnicalAnalysis._calculate_indicators_ta, base, args.runs)
+        np_ms, new = timed(TechnicalAnalysis.calculate_indicators, base, args.runs)
+
+        for col in COLUMNS:
+            a, b = ref[col].to_numpy(dtype=float), new[col].to_numpy(dtype=float)
+            assert np.allclose(a, b, rtol=1e-9, atol=1e-9 * price, equal_nan=True), f"{col} mismatch at price {price}"
+
+        print(f"price={price:>8} bars={args.bars}: ta={ta_ms:6.2f}ms numpy={np_ms:6.2f}ms -> {ta_ms / np_ms:5.1f}x | all {len(COLUMNS)} columns match")
+
+
+if __name__ == "__main__":
+    main()
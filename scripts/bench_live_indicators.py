@@ -0,0 +1,68 @@
+"""
+Streams synthetic candles through a CandleBuffer with LiveIndicators attached and checks every
+indicator row against a full NumPy-kernel pass over the whole streamed history.
+Also times one incremental update vs. one full recompute of the 200-bar window.
+
+Usage: python scripts/bench_live_indicators.py [--seed-bars 200] [--bars 500] [--revisions 3]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.append(os.getcwd())
+from data.candle_stream import CandleBuffer
+from engine.live_indicators import LiveIndicators
+from engine.indicators import COLUMNS, compute_indicators
+from engine.technical_analysis import TechnicalAnalysis
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed-bars", type=int, default=200)
+    parser.add_argument("--bars", type=int, default=500)
+    parser.add_argument("--revisions", type=int, default=3, help="live-bar revisions before each bar closes")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    total = args.seed_bars + args.bars
+    close = 100 * (1 + np.cumsum(rng.normal(0, 0.002, total)))
+    high = close + np.abs(rng.normal(0, 0.1, total))
+    low = close - np.abs(rng.normal(0, 0.1, total))
+    epochs = 1_700_000_000 + 300 * np.arange(total)
+
+    buf = CandleBuffer(capacity=args.seed_bars, granularity=300)
+    buf.indicators = LiveIndicators(buf)
+    for i in range(args.seed_bars):
+        buf.upsert(int(epochs[i]), close[i], high[i], low[i], close[i], notify=False)
+    buf.indicators.reseed()
+
+    step_times = []
+    for i in range(args.seed_bars, total):
+        # The live bar wanders before settling on its final OHLC
+        for _ in range(args.revisions):
+            c = close[i] + rng.normal(0, 0.05)
+            buf.upsert(int(epochs[i]), c, max(high[i], c), min(low[i], c), c)
+        start = time.perf_counter()
+        buf.upsert(int(epochs[i]), close[i], high[i], low[i], close[i])
+        step_times.append(time.perf_counter() - start)
+
+    # Reference: Kernel over the entire history, last `capacity` rows
+    ref = compute_indicators(high, low, close)[:, -buf.capacity:]
+    live = buf.to_frame()
+    for i, name in enumerate(COLUMNS):
+        assert np.allclose(ref[i], live[name].to_numpy(), rtol=1e-8, atol=1e-8, equal_nan=True), f"{name} diverged"
+    print(f"All {len(COLUMNS)} columns match a full-history recompute after {args.bars} bars x {args.revisions + 1} updates")
+
+    window = live[['open', 'high', 'low', 'close']].copy()
+    start = time.perf_counter()
+    for _ in range(50):
+        TechnicalAnalysis.calculate_indicators(window.copy())
+    full_ms = (time.perf_counter() - start) / 50 * 1000
+    step_us = np.median(step_times) * 1e6
+    print(f"incremental update: {step_us:7.1f}us | full recompute ({buf.capacity} bars): {full_ms * 1000:7.1f}us -> {full_ms * 1000 / step_us:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Times a pipelined radar pass (ScanPipeline) against the old serial shape (fetch every asset one after another,
+then score) with simulated provider latencies, and prints the pipeline's per-stage report.
+No network: DataCollector's fetches are replaced by sleeps returning synthetic frames.
+
+Usage: python scripts/bench_scan_pipeline.py [--latency 0.3 1.5] [--bars 200] [--budget 400] [--concurrency 12]
+"""
+import os
+import sys
+import time
+import json
+import random
+import asyncio
+import argparse
+import logging
+
+sys.path.append(os.getcwd())
+from data.collector import DataCollector
+from engine.ai_generator import AISignalGenerator
+from engine.scan_pipeline import ScanPipeline, SCAN_MAX_CONCURRENCY, SCAN_RSS_BUDGET_MB
+from bot.handlers import RADAR_ASSETS
+from scripts.bench_batch_signals import random_frame
+
+
+def simulate(latency, bars):
+    delays = {symbol: random.uniform(*latency) for symbol, _ in RADAR_ASSETS}
+    frames = {symbol: random_frame(bars, i) for i, (symbol, _) in enumerate(RADAR_ASSETS)}
+
+    async def fetch_data(symbol, asset_type=None, interval="15m"):
+        await asyncio.sleep(delays[symbol])
+        return frames[symbol]
+
+    async def fetch_data_batch(assets, interval="15m"):
+        symbols = [a[0] if isinstance(a, (tuple, list)) else a for a in assets]
+        await asyncio.sleep(max(delays[s] for s in symbols)) # One multi-ticker download
+        return {s: frames[s] for s in symbols}
+
+    DataCollector.fetch_data = staticmethod(fetch_data)
+    DataCollector.fetch_data_batch = staticmethod(fetch_data_batch)
+    return delays, frames
+
+
+async def serial_pass(ai, frames):
+    fetched = {}
+    for symbol, asset_type in RADAR_ASSETS:
+        fetched[symbol] = await DataCollector.fetch_data(symbol, asset_type)
+    return await ai.generate_signals_batch(fetched, fast_scan=True)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", nargs=2, type=float, default=(0.3, 1.5), help="min/max simulated fetch seconds")
+    parser.add_argument("--bars", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=SCAN_RSS_BUDGET_MB, help="RSS budget in MB")
+    parser.add_argument("--concurrency", type=int, default=SCAN_MAX_CONCURRENCY)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    random.seed(0)
+
+    delays, frames = simulate(args.latency, args.bars)
+    ai = AISignalGenerator()
+    await ai.generate_signals_batch({s: frames[s] for s in list(frames)[:2]}, fast_scan=True) # Warm-up
+
+    start = time.perf_counter()
+    serial = await serial_pass(ai, frames)
+    serial_time = time.perf_counter() - start
+
+    pipeline = ScanPipeline(ai, max_concurrency=args.concurrency, budget_mb=args.budget)
+    start = time.perf_counter()
+    piped = await pipeline.run(RADAR_ASSETS)
+    piped_time = time.perf_counter() - start
+
+    same = sorted(s for s, sig in serial.items() if sig) == sorted(s for s, sig in piped.items() if sig)
+    print(f"{len(RADAR_ASSETS)} assets, sum of fetch latencies {sum(delays.values()):.2f}s, slowest {max(delays.values()):.2f}s")
+    print(f"serial:    {serial_time:.2f}s")
+    print(f"pipelined: {piped_time:.2f}s  (same qualifying assets: {same})")
+    print(json.dumps({k: v for k, v in pipeline.last_report.items() if k != 'fetch_seconds'}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,7 +2,7 @@ from utils.db import init_db, User
 import logging
 
 def check_users():
-    db = init_db()
+    db = init_db(force_create=True)
     try:
         users = db.session.query(User).all()
         print(f"Total Users: {len(users)}")
@@ -0,0 +1,80 @@
+"""
+Fits the confidence calibration tables (raw confidence -> observed binary win rate, isotonic per
+strategy and asset class) and writes them to CALIBRATION_PATH; the bot loads them at startup.
+
+Sources (default: the bot database):
+  resolved SignalHistory rows (engine/outcome_tracker.py), raw confidence where stored
+  --trades trades.csv          backtest trades from scripts/run_backtest.py --out
+
+Usage: python scripts/fit_calibration.py [--days 90] [--trades trades.csv ...] [--min-samples 50] [--out calibration.json]
+"""
+import os
+import sys
+import json
+import argparse
+import datetime
+import pandas as pd
+
+sys.path.append(os.getcwd())
+from engine.calibration import fit_calibration, asset_class, CALIBRATION_PATH, CALIBRATION_MIN_SAMPLES
+
+
+def load_history(days):
+    """(confidence, strategy, symbol, won) of decided signals from SignalHistory."""
+    from sqlalchemy import func
+    from utils.db import init_db, SignalHistory
+    since = datetime.datetime.utcnow() - datetime.timedelta(days=days)
+    db = init_db(force_create=True)
+    try:
+        rows = db.session.query(
+            func.coalesce(SignalHistory.raw_confidence, SignalHistory.confidence),
+            SignalHistory.strategy, SignalHistory.asset, SignalHistory.outcome
+        ).filter(SignalHistory.timestamp >= since, SignalHistory.outcome.in_(("WIN", "LOSS"))).all()
+    finally:
+        db.close()
+    return pd.DataFrame(rows, columns=["confidence", "strategy", "symbol", "outcome"]).assign(
+        won=lambda d: d["outcome"] == "WIN"
+    ).drop(columns="outcome")
+
+
+def load_trades(path):
+    trades = pd.read_csv(path)
+    trades = trades[trades["binary_outcome"] != 0] # Draws carry no win/loss information
+    return pd.DataFrame({
+        "confidence": trades["confidence"], "strategy": trades["strategy"],
+        "symbol": trades["symbol"], "won": trades["binary_outcome"] == 1,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=90, help="SignalHistory lookback")
+    parser.add_argument("--trades", nargs="*", default=[], help="backtest trade CSVs instead of the database")
+    parser.add_argument("--min-samples", type=int, default=CALIBRATION_MIN_SAMPLES)
+    parser.add_argument("--out", default=CALIBRATION_PATH)
+    args = parser.parse_args()
+
+    data = pd.concat([load_trades(p) for p in args.trades], ignore_index=True) if args.trades else load_history(args.days)
+    data = data.dropna(subset=["confidence"])
+    if data.empty:
+        parser.error("no resolved signals to fit on")
+    data["strategy"] = data["strategy"].fillna("UNKNOWN")
+    classes = {s: asset_class(s) for s in data["symbol"].unique()}
+
+    fitted = fit_calibration(data["confidence"].to_numpy(), data["strategy"].to_numpy(),
+                             data["symbol"].map(classes).to_numpy(), data["won"].to_numpy(), args.min_samples)
+    print(f"{len(data):,} decided signals, overall win rate {data['won'].mean() * 100:.1f}%")
+    for key, table in sorted(fitted["tables"].items()):
+        steps = ", ".join(f"<={k:g}: {v:g}%" for k, v in zip(table["knots"], table["values"]))
+        print(f"{key:<50} n={table['samples']:<6} {steps}")
+    if not fitted["tables"]:
+        print(f"No group reached {args.min_samples} signals; nothing written.")
+        return
+
+    with open(args.out, "w") as f:
+        json.dump(fitted, f, indent=2)
+    print(f"\nCalibration written to {args.out} (restart the bot or point CALIBRATION_PATH at it)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Applies the versioned schema migrations (utils/migrations.py) to the bot database.
+main.py runs them at startup too; this is for deploy steps and inspecting a database by hand.
+
+Usage: python scripts/migrate.py [--status] [--to VERSION] [--db path/to/tradesigx.db]
+"""
+import os
+import sys
+import argparse
+import logging
+
+sys.path.append(os.getcwd())
+from sqlalchemy import create_engine
+from utils.migrations import MIGRATIONS, LATEST_VERSION, migrate, schema_version
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--status", action="store_true", help="show the schema version and pending steps, change nothing")
+    parser.add_argument("--to", type=int, default=LATEST_VERSION, help="stop at this version")
+    parser.add_argument("--db", help="SQLite file (default: the bot database from utils/db.py)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.db:
+        engine = create_engine(f"sqlite:///{args.db}")
+    else:
+        from utils.db import engine, db_path
+        print(f"Database: {db_path}")
+
+    with engine.connect() as conn:
+        version = schema_version(conn)
+    pending = [(v, d) for v, d, _ in MIGRATIONS if version < v <= args.to]
+    print(f"Schema version {version} (latest {LATEST_VERSION}), {len(pending)} pending")
+    for v, description in pending:
+        print(f"  v{v}: {description}")
+    if args.status or not pending:
+        return
+
+    applied = migrate(engine, target=args.to)
+    print(f"Applied: {', '.join(f'v{v}' for v in applied)}")
+
+
+if __name__ == "__main__":
+    main()
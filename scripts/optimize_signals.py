@@ -0,0 +1,84 @@
+"""
+Walk-forward parameter sweep over the scoring weights, strategy thresholds, confidence gate and
+expiry tables. Writes ranked configs; copy the file to SIGNAL_CONFIG_PATH (or point the env var at it)
+and the bot applies rank SIGNAL_CONFIG_RANK at startup.
+
+Sources are the same as scripts/run_backtest.py (--symbols from the candle store, --csv, --synthetic).
+A custom grid is a JSON object of "section.key" -> [values], e.g.
+  {"weights.ta": [0.3, 0.4, 0.5], "thresholds.cross_adx": [15, 20], "min_confidence": [65, 75]}
+
+Usage: python scripts/optimize_signals.py --symbols R_100 R_75 --granularity 300 [--grid grid.json]
+       [--folds 4] [--train-segments 3] [--objective win_rate|tp_rate|avg_move] [--workers 4] [--out signal_config.json]
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+
+sys.path.append(os.getcwd())
+from engine.optimizer import WalkForwardOptimizer, DEFAULT_GRID, OBJECTIVES
+from engine.backtester import TPSL_MAX_HOLD
+from data.candle_store import CandleStore, CANDLE_STORE_PATH, CANDLE_STORE_WINDOW
+from scripts.run_backtest import load_csv, synthetic
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", nargs="*", default=[])
+    parser.add_argument("--csv", nargs="*", default=[])
+    parser.add_argument("--synthetic", type=int, default=0)
+    parser.add_argument("--bars", type=int, default=100_000, help="bars per synthetic series")
+    parser.add_argument("--granularity", type=int, default=60, help="candle size in seconds")
+    parser.add_argument("--store", default=CANDLE_STORE_PATH)
+    parser.add_argument("--grid", default=None, help="JSON grid file (default: engine.optimizer.DEFAULT_GRID)")
+    parser.add_argument("--folds", type=int, default=4)
+    parser.add_argument("--train-segments", type=int, default=3)
+    parser.add_argument("--objective", choices=OBJECTIVES, default="win_rate")
+    parser.add_argument("--min-signals", type=int, default=30, help="windows with fewer signals don't count")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--every", type=int, default=1, help="evaluate every N bars (scan cadence)")
+    parser.add_argument("--max-hold", type=int, default=TPSL_MAX_HOLD)
+    parser.add_argument("--frame-bars", type=int, default=CANDLE_STORE_WINDOW)
+    parser.add_argument("--top", type=int, default=20, help="ranked configs kept in the output")
+    parser.add_argument("--out", default="signal_config.json")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    frames = {}
+    if args.symbols:
+        store = CandleStore(args.store)
+        for symbol in args.symbols:
+            frames[symbol] = store.read(symbol, args.granularity, limit=-1)
+        store.close()
+    for path in args.csv:
+        frames[os.path.splitext(os.path.basename(path))[0]] = load_csv(path)
+    if args.synthetic:
+        frames.update(synthetic(args.synthetic, args.bars, args.granularity))
+    frames = {s: df for s, df in frames.items() if not df.empty}
+    if not frames:
+        parser.error("no candle history (use --symbols, --csv or --synthetic)")
+
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid) as f:
+            grid = json.load(f)
+
+    optimizer = WalkForwardOptimizer(
+        grid=grid, folds=args.folds, train_segments=args.train_segments, objective=args.objective,
+        min_signals=args.min_signals, workers=args.workers, frame_bars=args.frame_bars, every=args.every,
+        max_hold=args.max_hold,
+    )
+    report = optimizer.run(frames, args.granularity)
+    WalkForwardOptimizer.save(report, args.out, top=args.top)
+
+    print(f"\n{report['configs']} configs x {len(report['symbols'])} series x {args.folds} folds in {report['seconds']}s")
+    print(f"Baseline (current defaults): test {args.objective}={report['baseline']['test']} train={report['baseline']['train']}")
+    print(f"Walk-forward (per-fold in-sample winner, out-of-sample): {report['walk_forward']['test']}")
+    for entry in report["ranked"][:10]:
+        print(f"#{entry['rank']:<3} train={entry['train']} test={entry['test']} signals={entry['test_signals']} {json.dumps(entry['overrides'])}")
+    print(f"Ranked configs written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Replays candle history through the signal pipeline and reports binary-expiry and TP/SL win rates
+per strategy (and overall), so weight / confidence-gate changes can be measured before shipping.
+
+Sources (pick one):
+  --symbols R_100 EURUSD=X     series from the candle store (see --list)
+  --csv data/EURUSD_1m.csv     CSV files with time, open, high, low, close[, volume] columns
+  --synthetic 20               random-walk series (speed check / smoke test)
+
+Usage: python scripts/run_backtest.py --symbols R_100 --granularity 300 [--min-confidence 65] [--every 1]
+       [--expiry 5] [--max-hold 120] [--frame-bars 200] [--by strategy|symbol|volatility|confidence] [--out trades.csv]
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.getcwd())
+from engine.backtester import Backtester, TPSL_MAX_HOLD
+from data.candle_store import CandleStore, CANDLE_STORE_PATH, CANDLE_STORE_WINDOW
+
+
+def load_csv(path):
+    df = pd.read_csv(path)
+    time_col = next((c for c in df.columns if c.lower() in ('time', 'timestamp', 'date', 'datetime', 'epoch')), None)
+    if time_col:
+        unit = 's' if np.issubdtype(df[time_col].dtype, np.number) else None
+        df.index = pd.to_datetime(df.pop(time_col), unit=unit)
+    df.columns = [c.lower() for c in df.columns]
+    return df.dropna(subset=['open', 'high', 'low', 'close'])
+
+
+def synthetic(count, bars, granularity):
+    frames = {}
+    index = pd.date_range('2020-01-01', periods=bars, freq=f'{granularity}s')
+    for i in range(count):
+        rng = np.random.default_rng(i)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, bars)))
+        open_ = np.r_[close[0], close[:-1]]
+        spread = np.abs(rng.normal(0, 0.0005, bars)) * close
+        frames[f"SYN_{i}"] = pd.DataFrame({
+            'open': open_, 'high': np.maximum(open_, close) + spread, 'low': np.minimum(open_, close) - spread,
+            'close': close, 'volume': rng.integers(100, 1000, bars).astype(float)
+        }, index=index)
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", nargs="*", default=[])
+    parser.add_argument("--csv", nargs="*", default=[])
+    parser.add_argument("--synthetic", type=int, default=0)
+    parser.add_argument("--bars", type=int, default=525_600, help="bars per synthetic series (default: 1 year of 1m)")
+    parser.add_argument("--granularity", type=int, default=60, help="candle size in seconds")
+    parser.add_argument("--store", default=CANDLE_STORE_PATH)
+    parser.add_argument("--list", action="store_true", help="list stored series and exit")
+    parser.add_argument("--min-confidence", type=float, default=None)
+    parser.add_argument("--every", type=int, default=1, help="evaluate every N bars (scan cadence)")
+    parser.add_argument("--expiry", type=int, default=None, help="fixed expiry in minutes (default: smart expiry)")
+    parser.add_argument("--max-hold", type=int, default=TPSL_MAX_HOLD, help="TP/SL timeout in bars")
+    parser.add_argument("--frame-bars", type=int, default=CANDLE_STORE_WINDOW)
+    parser.add_argument("--by", default="strategy")
+    parser.add_argument("--out", default=None, help="write every trade to this CSV")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    frames = {}
+    if args.symbols or args.list:
+        store = CandleStore(args.store)
+        if args.list:
+            for symbol, granularity, rows in store.list_series():
+                print(f"{symbol:<20} {granularity:>6}s {rows:>8} rows")
+            return
+        for symbol in args.symbols:
+            frames[symbol] = store.read(symbol, args.granularity, limit=-1)
+        store.close()
+    for path in args.csv:
+        frames[os.path.splitext(os.path.basename(path))[0]] = load_csv(path)
+    if args.synthetic:
+        frames.update(synthetic(args.synthetic, args.bars, args.granularity))
+    frames = {s: df for s, df in frames.items() if not df.empty}
+    if not frames:
+        parser.error("no candle history (use --symbols, --csv or --synthetic)")
+
+    tester = Backtester(frame_bars=args.frame_bars, min_confidence=args.min_confidence, every=args.every,
+                        expiry_minutes=args.expiry, max_hold=args.max_hold)
+    start = time.perf_counter()
+    trades = tester.run_many(frames, args.granularity)
+    elapsed = time.perf_counter() - start
+    total_bars = sum(len(df) for df in frames.values())
+    print(f"\n{len(frames)} series, {total_bars:,} bars -> {len(trades):,} signals in {elapsed:.1f}s")
+    if trades.empty:
+        return
+
+    if args.by == "confidence":
+        trades = trades.assign(confidence_band=Backtester.confidence_buckets(trades))
+        args.by = "confidence_band"
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print(Backtester.summarize(trades, by=args.by))
+    if args.out:
+        trades.to_csv(args.out, index=False)
+        print(f"Trades written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
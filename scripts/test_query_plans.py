@@ -0,0 +1,101 @@
+"""
+Query-plan regression check for the hot database queries: Builds each query the way the bot does,
+runs EXPLAIN QUERY PLAN on a throwaway database migrated to the latest schema and fails (exit 1)
+if any of them falls back to a full table scan.
+
+Usage: python scripts/test_query_plans.py [--db path/to/tradesigx.db [--no-migrate]] [-v]
+"""
+import os
+import re
+import sys
+import argparse
+import tempfile
+import datetime
+
+sys.path.append(os.getcwd())
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import Session
+from utils.db import User, SignalHistory, TradeExecution, BrokerAccount
+from utils.migrations import migrate
+
+
+def hot_queries(session):
+    """(name, query, rowid-ordered scan allowed) for each hot path."""
+    today = datetime.datetime(2024, 1, 1) # Literal values don't change the plan
+    now = 1704067200
+    return [
+        # engine/autotrader.py: Trades today per user
+        ("autotrader daily trade count", session.query(func.count(TradeExecution.id)).filter(
+            TradeExecution.user_id == "123", TradeExecution.timestamp >= today), False),
+        ("autotrader enabled users", session.query(User).filter(User.autotrade_enabled == True), False),
+        # bot/handlers.py wallet_history
+        ("wallet history", session.query(TradeExecution).filter_by(user_id="123")
+            .order_by(TradeExecution.timestamp.desc()).limit(5), False),
+        # api/server.py /api/signals: Newest first straight off the rowid
+        ("recent signals", session.query(SignalHistory).order_by(SignalHistory.id.desc()).limit(50), True),
+        # bot/admin_handlers.py stats
+        ("registered users", session.query(func.count(User.id)).filter(User.is_registered == True), False),
+        ("users per plan", session.query(func.count(User.id)).filter(User.subscription_plan == "pro"), False),
+        ("pending kyc", session.query(User).filter(User.kyc_status == "pending"), False),
+        ("user by telegram id", session.query(User).filter(User.telegram_id == "123"), False),
+        # bot/handlers.py broker lookups
+        ("brokers by user", session.query(BrokerAccount).filter_by(user_id=1), False),
+        ("broker by user + name", session.query(BrokerAccount).filter_by(user_id=1, broker_name="deriv"), False),
+        ("active brokers by user + name", session.query(BrokerAccount).filter_by(
+            user_id=1, broker_name="deriv", is_active=True), False),
+        ("active brokers by user", session.query(BrokerAccount).filter_by(user_id=1, is_active=True), False),
+        # engine/outcome_tracker.py
+        ("pending outcomes", session.query(SignalHistory.id).filter(
+            SignalHistory.outcome.is_(None), SignalHistory.entry_timestamp.isnot(None),
+            SignalHistory.entry_timestamp + func.coalesce(SignalHistory.expiry_minutes, 0) * 60 <= now,
+        ).order_by(SignalHistory.id).limit(500), False),
+        ("resolved signal stats", session.query(SignalHistory.strategy, func.count(SignalHistory.id)).filter(
+            SignalHistory.timestamp >= today - datetime.timedelta(days=30),
+            SignalHistory.outcome.in_(("WIN", "LOSS", "DRAW")),
+        ).group_by(SignalHistory.strategy), False),
+    ]
+
+
+FULL_SCAN = re.compile(r"\bSCAN (\w+)(?! USING)")
+
+
+def explain(session, query):
+    statement = query.statement.compile(session.get_bind(), compile_kwargs={"literal_binds": True})
+    rows = session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}").fetchall()
+    return [row[-1] for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", help="check an existing database instead of a fresh one (it is migrated first)")
+    parser.add_argument("--no-migrate", action="store_true", help="check --db as it is")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{args.db or os.path.join(tmp, 'plans.db')}")
+        if not (args.db and args.no_migrate):
+            migrate(engine)
+        failures = checked = 0
+        with Session(engine) as session:
+            for name, query, rowid_scan_ok in hot_queries(session):
+                checked += 1
+                plan = explain(session, query)
+                scans = [line for line in plan if FULL_SCAN.search(line)]
+                if rowid_scan_ok:
+                    # Reading the table backwards by rowid until LIMIT is fine; sorting it is not
+                    scans = [line for line in plan if "TEMP B-TREE" in line]
+                ok = not scans
+                failures += not ok
+                print(f"{'PASS' if ok else 'FAIL'}  {name}")
+                if args.verbose or not ok:
+                    for line in plan:
+                        print(f"        {line}")
+        engine.dispose()
+
+    print(f"\n{failures} of {checked} hot queries fall back to a full table scan")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
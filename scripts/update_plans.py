@@ -5,7 +5,7 @@ from utils.db import init_db, SubscriptionPlan
 import json
 
 def update_plans():
-    db = init_db()
+    db = init_db(force_create=True)
     try:
         # Update VIP plan features
         vip = db.session.query(SubscriptionPlan).filter_by(name="vip").first()
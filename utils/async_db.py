@@ -0,0 +1,111 @@
+from sqlalchemy import event, select, func
+
+from utils.db import db_path, _sqlite_pragmas, User, SubscriptionPlan, PaymentTransaction
+
+# Async twin of utils/db.py for coroutines (bot handlers, API routes, radar, autotrader):
+# Same database file and SQLite profile, but queries run on aiosqlite's thread so the event loop keeps serving.
+# Sync DBManager stays for scripts and worker threads (outcome tracker, DB writer).
+
+_engine = None
+_session_factory = None
+
+
+def get_async_engine():
+    """Shared AsyncEngine (created on first use, so importing this module costs nothing)."""
+    global _engine, _session_factory
+    if _engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+        _engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        event.listen(_engine.sync_engine, "connect", _sqlite_pragmas)
+        # Loaded objects stay readable after commit: An expired attribute would need a lazy load, which can't await
+        _session_factory = async_sessionmaker(_engine, expire_on_commit=False)
+    return _engine
+
+
+async def dispose_async_engine():
+    global _engine, _session_factory
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+        _session_factory = None
+
+
+def init_async_db():
+    """Returns an AsyncDBManager (the async counterpart of init_db(); no schema work)."""
+    return AsyncDBManager()
+
+
+class AsyncDBManager:
+    """
+    DBManager's methods, awaited, on an AsyncSession.
+    Use `db = init_async_db()` ... `await db.close()`, or `async with AsyncDBManager() as db:`.
+    Attributes never lazy-load: Refetch an object to see changes committed elsewhere.
+    """
+
+    def __init__(self):
+        get_async_engine()
+        self.session = _session_factory()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def get_user_by_telegram_id(self, telegram_id):
+        return await self.first(select(User).where(User.telegram_id == telegram_id))
+
+    async def get_all_users(self):
+        return await self.all(select(User))
+
+    async def get_users_paginated(self, page=1, per_page=10):
+        return await self.all(select(User).offset((page-1)*per_page).limit(per_page))
+
+    async def get_user_count(self):
+        return await self.count(User)
+
+    async def get_pending_kyc(self):
+        return await self.all(select(User).where(User.kyc_status == "pending"))
+
+    async def get_subscription_plan(self, plan_name):
+        return await self.first(select(SubscriptionPlan).where(SubscriptionPlan.name == plan_name))
+
+    async def get_all_plans(self):
+        return await self.all(select(SubscriptionPlan).where(SubscriptionPlan.is_active == True))
+
+    async def create_payment(self, user_id, amount, method, plan, ref):
+        payment = PaymentTransaction(
+            user_id=user_id, amount=amount, payment_method=method,
+            plan_purchased=plan, transaction_ref=ref
+        )
+        self.session.add(payment)
+        await self.session.commit()
+        return payment
+
+    async def get_payment_by_ref(self, ref):
+        return await self.first(select(PaymentTransaction).where(PaymentTransaction.transaction_ref == ref))
+
+    # Ad-hoc statements (what sync callers do with db.session.query)
+    async def first(self, statement):
+        return (await self.session.execute(statement)).scalars().first()
+
+    async def all(self, statement):
+        return (await self.session.execute(statement)).scalars().all()
+
+    async def count(self, model, *criteria):
+        return await self.session.scalar(select(func.count(model.id)).where(*criteria))
+
+    async def execute(self, statement):
+        return await self.session.execute(statement)
+
+    def add(self, obj):
+        self.session.add(obj)
+
+    async def delete(self, obj):
+        await self.session.delete(obj)
+
+    async def commit(self):
+        await self.session.commit()
+
+    async def close(self):
+        await self.session.close()
@@ -1,8 +1,8 @@
 import os
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 import datetime
 
 Base = declarative_base()
@@ -21,19 +21,19 @@ class User(Base):
     email = Column(String, unique=True, nullable=True)
     phone = Column(String, nullable=True)
     country = Column(String, nullable=True)
-    is_registered = Column(Boolean, default=False)  # Completed signup
+    is_registered = Column(Boolean, default=False, index=True)  # Completed signup
     registration_step = Column(String, default="start")  # Tracks signup progress
     terms_accepted = Column(Boolean, default=False)
     joined_at = Column(DateTime, default=datetime.datetime.utcnow)
     
     # Subscription & Monetization
-    subscription_plan = Column(String, default="free")  # free, basic, pro, vip
+    subscription_plan = Column(String, default="free", index=True)  # free, basic, pro, vip
     plan_expires_at = Column(DateTime, nullable=True)
     signals_used_today = Column(Integer, default=0)
     last_signal_date = Column(String, nullable=True)  # For daily reset
     
     # KYC Verification
-    kyc_status = Column(String, default="not_submitted")  # not_submitted, pending, approved, rejected
+    kyc_status = Column(String, default="not_submitted", index=True)  # not_submitted, pending, approved, rejected
     kyc_id_document = Column(String, nullable=True)  # File ID or URL
     kyc_selfie = Column(String, nullable=True)  # File ID or URL
     kyc_submitted_at = Column(DateTime, nullable=True)
@@ -61,7 +61,7 @@ class User(Base):
     external_wallets = Column(Text, nullable=True) # JSON string: {"metamask": "0x...", "phantom": "..."}
     
     # Autotrading Settings
-    autotrade_enabled = Column(Boolean, default=False)
+    autotrade_enabled = Column(Boolean, default=False, index=True)
     autotrade_min_confidence = Column(Float, default=75.0)
     autotrade_max_trades = Column(Integer, default=5)
     autotrade_assets = Column(String, default="BTC/USDT,ETH/USDT,GC=F")
@@ -92,6 +92,8 @@ class PaymentTransaction(Base):
 
 class BrokerAccount(Base):
     __tablename__ = 'broker_accounts'
+    # Broker lookups: by user, user + broker, user + broker + active
+    __table_args__ = (Index("ix_broker_accounts_user_broker_active", "user_id", "broker_name", "is_active"),)
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'))
     broker_name = Column(String)
@@ -102,6 +104,8 @@ class BrokerAccount(Base):
 
 class SignalHistory(Base):
     __tablename__ = 'signal_history'
+    # Outcome tracker: Pending rows (outcome IS NULL) and resolved stats over a time window
+    __table_args__ = (Index("ix_signal_history_outcome_timestamp", "outcome", "timestamp"),)
     id = Column(Integer, primary_key=True)
     asset = Column(String)
     direction = Column(String)
@@ -110,9 +114,23 @@ class SignalHistory(Base):
     sl = Column(Float)
     confidence = Column(Float)
     timestamp = Column(DateTime, default=datetime.datetime.utcnow)
+    
+    raw_confidence = Column(Float, nullable=True)  # Before calibration (engine/calibration.py)
+    
+    # Outcome Tracking (filled by engine/outcome_tracker.py once the expiry has passed)
+    strategy = Column(String, nullable=True)
+    expiry_minutes = Column(Integer, nullable=True)
+    entry_timestamp = Column(Integer, nullable=True)  # Epoch the trade is entered at
+    outcome = Column(String, nullable=True)  # WIN / LOSS / DRAW at expiry, UNRESOLVED without candles
+    tpsl_outcome = Column(String, nullable=True)  # TP / SL (first touch before expiry) or NONE
+    realized_move = Column(Float, nullable=True)  # % move at expiry in the signal's direction
+    time_to_hit = Column(Integer, nullable=True)  # Seconds from entry to the TP/SL touch
+    resolved_at = Column(DateTime, nullable=True)
 
 class TradeExecution(Base):
     __tablename__ = 'trade_executions'
+    # AutoTrader daily count and wallet history: By user, within / ordered by time
+    __table_args__ = (Index("ix_trade_executions_user_id_timestamp", "user_id", "timestamp"),)
     id = Column(Integer, primary_key=True)
     user_id = Column(String)
     asset = Column(String)
@@ -131,15 +149,37 @@ db_path = 'tradesigx.db'
 if os.path.exists('/data'):
     db_path = '/data/tradesigx.db'
 
+# SQLite profile applied to every new connection (WAL lets readers run while the writer commits)
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL") # NORMAL is durable in WAL except on power loss
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 32 * 1024 * 1024)) # Bytes; counts toward RSS as pages are touched
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", -8000)) # Negative = KiB per connection
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)) # Wait for the lock instead of "database is locked"
+
 engine = create_engine(f'sqlite:///{db_path}', connect_args={"check_same_thread": False})
 Session = sessionmaker(bind=engine)
 
-def init_db(force_create=True):
+@event.listens_for(engine, "connect")
+def _sqlite_pragmas(dbapi_conn, connection_record):
+    cursor = dbapi_conn.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size = {SQLITE_CACHE_SIZE}")
+    finally:
+        cursor.close()
+
+def init_db(force_create=False):
     """
-    Returns a DBManager instance.
-    Ensures all tables exist by calling create_all(engine).
+    Returns a DBManager instance (a session from the shared factory, no schema work).
+    The schema is managed by utils/migrations.py at startup; force_create=True applies pending
+    migrations first, for standalone scripts that may open an older database.
     """
-    Base.metadata.create_all(engine)
+    if force_create:
+        from utils.migrations import ensure_schema
+        ensure_schema()
     db = DBManager()
     return db
 
@@ -0,0 +1,128 @@
+import os
+import time
+import asyncio
+import logging
+
+DB_WRITE_BATCH_MAX = int(os.getenv("DB_WRITE_BATCH_MAX", 64)) # Writes grouped into one transaction
+DB_WRITE_LINGER_MS = float(os.getenv("DB_WRITE_LINGER_MS", 20)) # How long the first write waits for company
+
+
+class DBWriter:
+    """
+    Single-writer queue for small, frequent commits (signal usage counters, signal history, trade inserts).
+    Writes are ops `op(session) -> value`; the writer task groups whatever is queued into one transaction
+    on a worker thread, so SQLite sees one writer and one fsync per batch instead of one per callback.
+    If a batch fails, its ops are retried one transaction each so a bad write only fails its own caller.
+    Ops must therefore be safe to re-run after a rollback (session.add / UPDATE statements are).
+    """
+
+    def __init__(self, batch_max: int = DB_WRITE_BATCH_MAX, linger_ms: float = DB_WRITE_LINGER_MS):
+        self.batch_max = max(1, batch_max)
+        self.linger = linger_ms / 1000
+        self.queue = None
+        self.task = None
+        self.stats = {'ops': 0, 'batches': 0, 'largest_batch': 0, 'retried_batches': 0, 'failed_ops': 0, 'busy_seconds': 0.0}
+
+    def _ensure_started(self):
+        if self.task is None or self.task.done():
+            self.queue = asyncio.Queue()
+            self.task = asyncio.create_task(self._run())
+
+    def _enqueue(self, op) -> asyncio.Future:
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((op, future))
+        return future
+
+    def submit_nowait(self, op) -> asyncio.Future:
+        """Fire-and-forget write; the future resolves to op's result once committed (failures are logged)."""
+        future = self._enqueue(op)
+        future.add_done_callback(_log_failure)
+        return future
+
+    async def submit(self, op):
+        """Queues a write and waits for its commit. Returns op's result or raises its error."""
+        # Shielded: A cancelled caller doesn't pull its write out of a batch in flight
+        return await asyncio.shield(self._enqueue(op))
+
+    async def _run(self):
+        while True:
+            batch = [await self.queue.get()]
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_max:
+                if self.queue.empty():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self.queue.get_nowait())
+
+            start = time.perf_counter()
+            try:
+                outcomes = await asyncio.to_thread(self._apply, [op for op, _ in batch])
+            except Exception as e: # Never lose the writer task: Fail this batch's callers instead
+                outcomes = [(False, e)] * len(batch)
+            self.stats['busy_seconds'] += time.perf_counter() - start
+            self.stats['batches'] += 1
+            self.stats['ops'] += len(batch)
+            self.stats['largest_batch'] = max(self.stats['largest_batch'], len(batch))
+            for (_, future), (ok, value) in zip(batch, outcomes):
+                self.queue.task_done()
+                if not ok:
+                    self.stats['failed_ops'] += 1
+                if future.done():
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    def _apply(self, ops):
+        """Worker thread: All ops in one transaction, or one transaction each if the group fails."""
+        from utils.db import Session
+        session = Session(expire_on_commit=False) # Results stay readable after the session closes
+        try:
+            try:
+                results = [(True, op(session)) for op in ops]
+                session.commit()
+                return results
+            except Exception:
+                session.rollback()
+                if len(ops) == 1:
+                    raise
+            self.stats['retried_batches'] += 1
+            results = []
+            for op in ops:
+                try:
+                    value = op(session)
+                    session.commit()
+                    results.append((True, value))
+                except Exception as e:
+                    session.rollback()
+                    results.append((False, e))
+            return results
+        except Exception as e:
+            return [(False, e)]
+        finally:
+            session.close()
+
+    async def close(self):
+        """Lets queued writes commit, then stops the writer task."""
+        if self.task is None:
+            return
+        await self.queue.join()
+        self.task.cancel()
+        self.task = None
+
+    def get_stats(self):
+        return {**self.stats, "queued": self.queue.qsize() if self.queue else 0,
+                "busy_seconds": round(self.stats['busy_seconds'], 3)}
+
+
+def _log_failure(future):
+    if not future.cancelled() and future.exception() is not None:
+        logging.error(f"DB Writer: Write failed: {future.exception()}")
@@ -1,3 +1,4 @@
+import os
 import logging
 from engine.ai_generator import AISignalGenerator
 from data.collector import DataCollector
@@ -20,3 +21,120 @@ def get_data_collector():
         logging.info("📊 Initializing Shared Data Collector (Singleton)...")
         _data_collector = DataCollector()
     return _data_collector
+
+_deriv_pool = None
+
+def get_deriv_pool():
+    """Shared Deriv WS pool used by the radar, the autotrader and /api/market-scan."""
+    global _deriv_pool
+    if _deriv_pool is None:
+        from data.deriv_pool import DerivConnectionPool
+        _deriv_pool = DerivConnectionPool()
+        logging.info(f"🔌 Initializing Shared Deriv WS Pool ({_deriv_pool.size} sockets)...")
+    return _deriv_pool
+
+_candle_streams = None
+
+def get_candle_streams():
+    """Shared rolling candle buffers for streamed (hot) symbols."""
+    global _candle_streams
+    if _candle_streams is None:
+        from data.candle_stream import CandleStreamManager
+        _candle_streams = CandleStreamManager()
+    return _candle_streams
+
+_exchange_registry = None
+
+def get_exchange_registry():
+    """Shared ccxt async exchanges for crypto candles (one session + market load per venue)."""
+    global _exchange_registry
+    if _exchange_registry is None:
+        from data.exchanges import ExchangeRegistry
+        _exchange_registry = ExchangeRegistry()
+        logging.info(f"🏦 Initializing Shared Exchange Registry ({', '.join(v.name for v in _exchange_registry.venues)})...")
+    return _exchange_registry
+
+_candle_store = None
+
+def get_candle_store():
+    """Shared on-disk candle history (None when disabled or the disk is unusable)."""
+    global _candle_store
+    if _candle_store is None:
+        if os.getenv("CANDLE_STORE", "1") != "1":
+            _candle_store = False
+        else:
+            try:
+                from data.candle_store import CandleStore
+                _candle_store = CandleStore()
+                logging.info(f"💾 Initializing Shared Candle Store ({_candle_store.path})...")
+            except Exception as e:
+                logging.error(f"Candle Store unavailable, falling back to provider-only fetches: {e}")
+                _candle_store = False
+    return _candle_store or None
+
+_compute_pool = None
+
+def get_compute_pool():
+    """Shared executor for the CPU part of signal generation (SIGNAL_COMPUTE_MODE)."""
+    global _compute_pool
+    if _compute_pool is None:
+        from engine.compute_pool import ComputePool
+        _compute_pool = ComputePool()
+    return _compute_pool
+
+_db_writer = None
+
+def get_db_writer():
+    """Shared single-writer queue that batches small SQLite commits."""
+    global _db_writer
+    if _db_writer is None:
+        from utils.db_writer import DBWriter
+        _db_writer = DBWriter()
+    return _db_writer
+
+_scan_pipeline = None
+
+def get_scan_pipeline():
+    """Shared pipelined scanner (overlapping fetch/compute under the RSS budget)."""
+    global _scan_pipeline
+    if _scan_pipeline is None:
+        from engine.scan_pipeline import ScanPipeline
+        _scan_pipeline = ScanPipeline(get_ai_gen())
+    return _scan_pipeline
+
+_scan_scheduler = None
+
+def get_scan_scheduler():
+    """Shared closed-bar scan loop feeding the radar, the autotrader and the Mini App."""
+    global _scan_scheduler
+    if _scan_scheduler is None:
+        from engine.scan_scheduler import ScanScheduler
+        _scan_scheduler = ScanScheduler(get_ai_gen())
+    return _scan_scheduler
+
+async def close_shared_engines():
+    """Closes long-lived network resources on shutdown."""
+    global _deriv_pool, _candle_streams, _candle_store, _exchange_registry, _scan_scheduler, _compute_pool, _db_writer
+    if _scan_scheduler is not None:
+        await _scan_scheduler.stop()
+        _scan_scheduler = None
+    if _db_writer is not None:
+        await _db_writer.close() # Commit queued writes before the process exits
+        _db_writer = None
+    from utils.async_db import dispose_async_engine
+    await dispose_async_engine()
+    if _compute_pool is not None:
+        _compute_pool.shutdown()
+        _compute_pool = None
+    if _candle_streams is not None:
+        await _candle_streams.stop()
+        _candle_streams = None
+    if _deriv_pool is not None:
+        await _deriv_pool.close()
+        _deriv_pool = None
+    if _exchange_registry is not None:
+        await _exchange_registry.close()
+        _exchange_registry = None
+    if _candle_store:
+        _candle_store.close()
+        _candle_store = None
@@ -0,0 +1,125 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import deque
+
+LOOP_MONITOR = os.getenv("LOOP_MONITOR", "1") == "1"
+LOOP_MONITOR_INTERVAL = float(os.getenv("LOOP_MONITOR_INTERVAL", 0.25)) # Seconds between lag samples
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", 250)) # A callback running longer is a stall
+LOOP_LAG_SAMPLES = 2400 # ~10 minutes of samples at the default interval
+LOOP_STALLS_KEPT = 20
+STACK_DEPTH = 15
+
+
+class LoopMonitor:
+    """
+    Event-loop health for the combined bot + API process:
+    - a sampler coroutine records how late each tick fires (loop lag percentiles)
+    - a watchdog thread notices when the loop stops ticking for longer than the threshold and
+      captures the loop thread's stack at that moment, i.e. the synchronous call that is blocking it
+    """
+
+    def __init__(self, interval: float = LOOP_MONITOR_INTERVAL, threshold_ms: float = LOOP_BLOCK_THRESHOLD_MS):
+        self.interval = interval
+        self.threshold = threshold_ms / 1000
+        self.lags = deque(maxlen=LOOP_LAG_SAMPLES)
+        self.stalls = deque(maxlen=LOOP_STALLS_KEPT)
+        self.stall_count = 0
+        self.beat = time.monotonic()
+        self.loop_thread_id = None
+        self.task = None
+        self._stop = threading.Event()
+        self._watchdog = None
+        self._open_stall = None # Stall being recorded; closed by the next tick
+
+    def start(self):
+        """Starts the sampler on the running loop and the watchdog thread (idempotent)."""
+        if self.task is not None and not self.task.done():
+            return
+        self.loop_thread_id = threading.get_ident()
+        self.beat = time.monotonic()
+        self.task = asyncio.create_task(self._sample())
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logging.info(f"🩺 Loop Monitor: Sampling every {self.interval}s, stall threshold {self.threshold * 1000:.0f}ms")
+
+    def stop(self):
+        self._stop.set()
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def _sample(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.lags.append(max(0.0, now - start - self.interval))
+            self.beat = now
+            stall = self._open_stall
+            if stall is not None:
+                # The loop is ticking again: The stall lasted until roughly now
+                stall["duration_ms"] = round((now - stall["_since"]) * 1000, 1)
+                self._open_stall = None
+
+    def _watch(self):
+        while not self._stop.wait(self.threshold / 2):
+            since = self.beat
+            # The sampler itself sleeps `interval`, so only time beyond that counts as blocked
+            blocked = time.monotonic() - since - self.interval
+            if blocked < self.threshold or self._open_stall is not None:
+                continue
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = traceback.format_stack(frame)[-STACK_DEPTH:] if frame is not None else []
+            stall = {
+                "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "duration_ms": round(blocked * 1000, 1), # Updated once the loop resumes
+                "stack": [line.rstrip() for line in stack],
+                "_since": since + self.interval,
+            }
+            self._open_stall = stall
+            self.stalls.append(stall)
+            self.stall_count += 1
+            where = stack[-1].strip().splitlines()[0] if stack else "unknown"
+            logging.warning(f"🩺 Loop Monitor: Event loop blocked for {blocked * 1000:.0f}ms+ at {where}")
+
+    @staticmethod
+    def _percentile(values, q):
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def get_stats(self, stalls: int = 5, stacks: bool = False):
+        """Lag percentiles and the latest stalls (with the blocking frame only, unless stacks=True)."""
+        lags = list(self.lags)
+        ms = lambda v: round(v * 1000, 2)
+        return {
+            "active": self.task is not None and not self.task.done(),
+            "samples": len(lags),
+            "lag_ms": {
+                "p50": ms(self._percentile(lags, 0.50)), "p95": ms(self._percentile(lags, 0.95)),
+                "p99": ms(self._percentile(lags, 0.99)), "max": ms(max(lags, default=0.0)),
+            },
+            "stalls": self.stall_count,
+            "threshold_ms": ms(self.threshold),
+            "recent_stalls": [
+                {"at": s["at"], "duration_ms": s["duration_ms"],
+                 **({"stack": s["stack"]} if stacks else {"where": s["stack"][-1].strip().splitlines()[0] if s["stack"] else None})}
+                for s in list(self.stalls)[-stalls:]
+            ],
+        }
+
+
+_monitor = None
+
+def get_loop_monitor():
+    global _monitor
+    if _monitor is None:
+        _monitor = LoopMonitor()
+    return _monitor
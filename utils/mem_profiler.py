@@ -0,0 +1,215 @@
+import os
+import gc
+import sys
+import time
+import logging
+import tracemalloc
+
+MEM_PROFILER = os.getenv("MEM_PROFILER", "0") == "1" # tracemalloc costs CPU and RAM: Switch on to investigate
+MEM_PROFILER_FRAMES = int(os.getenv("MEM_PROFILER_FRAMES", 12)) # Frames kept per allocation (enough to reach repo code)
+MEM_PROFILER_TOP = 10 # Allocation sites listed per subsystem
+# global_gc() only purges caches above this RSS (defaults to the scan pipeline budget)
+GC_PURGE_RSS_MB = int(os.getenv("GC_PURGE_RSS_MB", os.getenv("SCAN_RSS_BUDGET_MB", 400)))
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+# Owner of an allocation = innermost repo frame on its traceback, matched by path prefix (first rule wins)
+REPO_SUBSYSTEMS = (
+    ("data/collector.py", "collector_cache"),
+    ("data/candle_stream", "candle_streams"),
+    ("data/candle_store.py", "candle_store"),
+    ("data/", "collector_cache"),
+    ("engine/sentiment_analysis.py", "sentiment_cache"),
+    ("engine/", "signal_engine"),
+    ("utils/db.py", "sqlalchemy"),
+    ("utils/async_db.py", "sqlalchemy"),
+    ("main.py", "radar"),
+    ("bot/", "bot_handlers"),
+    ("api/", "api"),
+)
+# No repo frame on the traceback: Classify by the library that allocated
+LIBRARY_SUBSYSTEMS = (
+    ("pandas", "dataframes"), ("numpy", "dataframes"),
+    ("sqlalchemy", "sqlalchemy"), ("aiosqlite", "sqlalchemy"),
+    ("telegram", "telegram"), ("httpx", "telegram"),
+    ("textblob", "sentiment_cache"), ("vaderSentiment", "sentiment_cache"), ("nltk", "sentiment_cache"),
+    ("yfinance", "collector_cache"), ("ccxt", "collector_cache"),
+)
+
+
+_file_kinds = {}
+
+def _file_kind(filename: str):
+    """('repo' | 'lib', subsystem, label) for a source file, cached: Snapshots hold ~10^5 distinct tracebacks."""
+    kind = _file_kinds.get(filename)
+    if kind is None:
+        if filename.startswith(_ROOT) and os.sep + "site-packages" + os.sep not in filename:
+            rel = filename[len(_ROOT):].replace(os.sep, "/")
+            subsystem = next((name for prefix, name in REPO_SUBSYSTEMS if rel.startswith(prefix)), "other")
+            kind = ("repo", subsystem, rel)
+        elif filename.startswith("<frozen importlib"):
+            kind = ("lib", "imports", filename) # Module code and constants, fixed after startup
+        else:
+            marker = next((m for m, _ in LIBRARY_SUBSYSTEMS if f"{os.sep}{m}{os.sep}" in filename), None)
+            subsystem = dict(LIBRARY_SUBSYSTEMS)[marker] if marker else "other"
+            kind = ("lib", subsystem, f"{marker}:{os.path.basename(filename)}" if marker else os.path.basename(filename))
+        _file_kinds[filename] = kind
+    return kind
+
+
+def _classify(frames):
+    """(subsystem, site) for an allocation's frames, most recent first: The innermost repo frame owns it."""
+    for frame in frames:
+        kind = _file_kind(frame[0])
+        if kind[0] == "repo":
+            return kind[1], frame
+    if not frames:
+        return "other", ("?", 0)
+    return _file_kind(frames[0][0])[1], frames[0]
+
+
+def _mb(n):
+    return round(n / (1024 * 1024), 3)
+
+
+class MemoryProfiler:
+    """
+    Memory evidence for sizing caches instead of purging them blindly:
+    - tracemalloc snapshots grouped by subsystem, with the top allocation sites of each (MEM_PROFILER=1)
+    - direct measurements of the caches global_gc() clears (always available, no tracemalloc needed)
+    """
+
+    def __init__(self, frames: int = MEM_PROFILER_FRAMES):
+        self.frames = frames
+        self.last = None # Previous per-subsystem totals, for growth between reports
+        self.purges = {"purged": 0, "skipped": 0, "last_rss_mb": None}
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        if not self.tracing:
+            tracemalloc.start(self.frames)
+            logging.info(f"🧠 Memory Profiler: tracemalloc on ({self.frames} frames per allocation)")
+
+    def stop(self):
+        if self.tracing:
+            tracemalloc.stop()
+
+    def snapshot(self, top: int = MEM_PROFILER_TOP):
+        """Live traced memory per subsystem: {subsystem: {mb, blocks, growth_mb, sites: [...]}}."""
+        if not self.tracing:
+            return None
+        # Everything allocated while walking the snapshot is traced too: Keep the per-block loop minimal
+        snap = tracemalloc.take_snapshot()
+        per_traceback = {} # frames (most recent first) -> [size, blocks]
+        raw = getattr(snap.traces, "_traces", None)
+        if raw is not None:
+            # Raw (domain, size, frames, ...) tuples: Skips building a Traceback object per block
+            for trace in raw:
+                entry = per_traceback.get(trace[2])
+                if entry is None:
+                    per_traceback[trace[2]] = [trace[1], 1]
+                else:
+                    entry[0] += trace[1]
+                    entry[1] += 1
+        else:
+            for stat in snap.statistics("traceback"):
+                frames = tuple((f.filename, f.lineno) for f in reversed(stat.traceback))
+                per_traceback[frames] = [stat.size, stat.count]
+        del snap, raw
+
+        groups = {}
+        for frames, (size, blocks) in per_traceback.items():
+            subsystem, site = _classify(frames)
+            group = groups.get(subsystem)
+            if group is None:
+                group = groups[subsystem] = {"size": 0, "blocks": 0, "sites": {}}
+            group["size"] += size
+            group["blocks"] += blocks
+            entry = group["sites"].setdefault(site, [0, 0])
+            entry[0] += size
+            entry[1] += blocks
+        del per_traceback
+
+        report = {}
+        for subsystem, group in sorted(groups.items(), key=lambda kv: -kv[1]["size"]):
+            sites = sorted(group["sites"].items(), key=lambda kv: -kv[1][0])[:top]
+            previous = (self.last or {}).get(subsystem)
+            report[subsystem] = {
+                "mb": _mb(group["size"]),
+                "blocks": group["blocks"],
+                "growth_mb": _mb(group["size"] - previous) if previous is not None else None,
+                "sites": [{"site": f"{_file_kind(filename)[2]}:{lineno}", "mb": _mb(size), "blocks": count}
+                          for (filename, lineno), (size, count) in sites],
+            }
+        self.last = {subsystem: group["size"] for subsystem, group in groups.items()}
+        return report
+
+    @staticmethod
+    def cache_sizes():
+        """Entry counts and (where cheap to compute) deep sizes of the caches global_gc() purges."""
+        import pandas as pd
+        from data.collector import _data_cache, _inflight
+        from utils.engines import get_ai_gen, get_candle_streams
+
+        def frames_mb(frames):
+            return _mb(sum(int(df.memory_usage(deep=True).sum()) for df in frames if isinstance(df, pd.DataFrame)))
+
+        caches = {
+            "collector_cache": {"entries": len(_data_cache), "in_flight": len(_inflight),
+                                "mb": frames_mb(entry["data"] for entry in list(_data_cache.values()))},
+        }
+        buffers = list(get_candle_streams().buffers.values())
+        caches["candle_streams"] = {
+            "entries": len(buffers),
+            "mb": round(_mb(sum(b.epochs.nbytes + b.values.nbytes for b in buffers)) + frames_mb(b._frame for b in buffers), 3),
+        }
+        sentiment = getattr(get_ai_gen().sentiment_engine, "_sentiment_cache", {})
+        caches["sentiment_cache"] = {"entries": len(sentiment)}
+
+        handlers = sys.modules.get("bot.handlers")
+        if handlers is not None:
+            caches["scan_results"] = {"entries": len(handlers._last_scan_results)}
+        user_cache = sys.modules.get("utils.user_cache")
+        if user_cache is not None:
+            caches["user_cache"] = {"entries": len(user_cache.get_user_cache().entries)}
+        radar = sys.modules.get("__main__")
+        if radar is not None and hasattr(radar, "sent_radar_messages"):
+            caches["radar_messages"] = {"entries": len(radar.sent_radar_messages)}
+
+        # Every live Session and the ORM objects its identity map holds
+        from sqlalchemy.orm import session as orm_session
+        sessions = list(getattr(orm_session, "_sessions", {}).values())
+        caches["sqlalchemy_identity_maps"] = {"sessions": len(sessions),
+                                              "objects": sum(len(s.identity_map) for s in sessions)}
+        return caches
+
+    def report(self, top: int = MEM_PROFILER_TOP):
+        from engine.scan_pipeline import rss_mb
+        rss = rss_mb()
+        traced, peak = tracemalloc.get_traced_memory() if self.tracing else (0, 0)
+        return {
+            "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "rss_mb": round(rss, 1) if rss is not None else None,
+            "gc_purge_rss_mb": GC_PURGE_RSS_MB,
+            "gc_purges": dict(self.purges),
+            "gc_counts": gc.get_count(),
+            "caches": self.cache_sizes(),
+            "tracemalloc": {
+                "enabled": self.tracing,
+                "traced_mb": _mb(traced),
+                "peak_mb": _mb(peak),
+                "subsystems": self.snapshot(top),
+            },
+        }
+
+
+_profiler = None
+
+def get_mem_profiler():
+    global _profiler
+    if _profiler is None:
+        _profiler = MemoryProfiler()
+    return _profiler
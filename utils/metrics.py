@@ -0,0 +1,166 @@
+import os
+import time
+import bisect
+import asyncio
+import functools
+import threading
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_PREFIX = "tradesigx"
+# Latency histogram bounds in seconds (Prometheus "le" buckets, +Inf implied)
+SPAN_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class SpanHistograms:
+    """
+    In-process latency histograms keyed by (span name, labels).
+    Thread-safe: Spans are also recorded from compute pool worker threads.
+    """
+
+    def __init__(self, buckets=SPAN_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.series = {} # (name, labels) -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, labels: tuple = ()):
+        key = (name, labels)
+        slot = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            row = self.series.get(key)
+            if row is None:
+                row = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            row[slot] += 1
+            row[-1] += seconds
+
+    def reset(self):
+        with self._lock:
+            self.series.clear()
+
+    def summary(self):
+        """{"name{labels}": {count, sum_seconds, avg_ms}} for JSON consumers (e.g. /api/health)."""
+        with self._lock:
+            rows = {key: list(row) for key, row in self.series.items()}
+        out = {}
+        for (name, labels), row in sorted(rows.items()):
+            count = sum(row[:-1])
+            tag = ",".join(f"{k}={v}" for k, v in labels)
+            out[f"{name}{{{tag}}}" if tag else name] = {
+                "count": count, "sum_seconds": round(row[-1], 4), "avg_ms": round(row[-1] / count * 1000, 2) if count else 0.0
+            }
+        return out
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            rows = {key: list(row) for key, row in self.series.items()}
+        metric = f"{METRICS_PREFIX}_span_seconds"
+        lines = [f"# HELP {metric} Latency of instrumented spans (fetches, AI stages, handlers, Telegram calls).",
+                 f"# TYPE {metric} histogram"]
+        for (name, labels), row in sorted(rows.items()):
+            base = ",".join([f'span="{name}"'] + [f'{k}="{_escape(v)}"' for k, v in labels])
+            cumulative = 0
+            for bound, count in zip(self.buckets, row):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{{base},le="{bound}"}} {cumulative}')
+            cumulative += row[len(self.buckets)]
+            lines.append(f'{metric}_bucket{{{base},le="+Inf"}} {cumulative}')
+            lines.append(f"{metric}_sum{{{base}}} {row[-1]:.6f}")
+            lines.append(f"{metric}_count{{{base}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_histograms = SpanHistograms()
+
+
+def get_histograms() -> SpanHistograms:
+    return _histograms
+
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def observe(name: str, seconds: float, **labels):
+    if METRICS_ENABLED:
+        _histograms.observe(name, seconds, _labels(labels))
+
+
+class _Span:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _histograms.observe(self.name, time.perf_counter() - self.start, self.labels)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str, **labels):
+    """`with span("ai_stage", stage="indicators"):` times the block (a shared no-op while metrics are off)."""
+    if not METRICS_ENABLED:
+        return _NO_SPAN
+    return _Span(name, _labels(labels))
+
+
+def timed(name: str, label_fn=None, **labels):
+    """
+    Decorator version of span for sync and async functions.
+    'label_fn(*args, **kwargs)' may return extra labels computed from the call (e.g. the callback action).
+    """
+    def wrap(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def run_async(*args, **kwargs):
+                if not METRICS_ENABLED:
+                    return await fn(*args, **kwargs)
+                extra = label_fn(*args, **kwargs) if label_fn else None
+                with _Span(name, _labels({**labels, **extra} if extra else labels)):
+                    return await fn(*args, **kwargs)
+            return run_async
+
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            if not METRICS_ENABLED:
+                return fn(*args, **kwargs)
+            extra = label_fn(*args, **kwargs) if label_fn else None
+            with _Span(name, _labels({**labels, **extra} if extra else labels)):
+                return fn(*args, **kwargs)
+        return run
+    return wrap
+
+
+def telegram_request(**kwargs):
+    """HTTPXRequest for the bot that records one span per Bot API method (sendMessage, editMessageText, ...)."""
+    from telegram.request import HTTPXRequest
+
+    class MeteredRequest(HTTPXRequest):
+        async def do_request(self, url, method, *args, **kw):
+            if not METRICS_ENABLED:
+                return await super().do_request(url, method, *args, **kw)
+            with _Span("telegram_api", (("method", url.rsplit("/", 1)[-1]),)):
+                return await super().do_request(url, method, *args, **kw)
+
+    return MeteredRequest(**kwargs)
@@ -0,0 +1,100 @@
+import logging
+
+# Versioned schema migrations, tracked in SQLite's PRAGMA user_version.
+# Run once at startup (main.py) or via scripts/migrate.py; request paths never touch the schema.
+# The baseline creates every current model table, so later steps must be idempotent (IF NOT EXISTS / column checks).
+
+
+def add_missing_columns(conn, table: str, columns):
+    """ALTER TABLE ADD COLUMN for each (name, type) the table lacks. Returns the names added."""
+    existing = {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+    if not existing: # Table doesn't exist: Nothing to alter
+        return []
+    added = []
+    for name, col_type in columns:
+        if name not in existing:
+            conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}")
+            added.append(name)
+    return added
+
+
+def _baseline(conn):
+    """Creates missing tables and brings pre-v8 users tables up to date (formerly migrate_db.py, migrate_v5.py, scripts/migrate_v8.py)."""
+    from utils.db import Base
+    Base.metadata.create_all(conn)
+    add_missing_columns(conn, "users", [
+        ("full_name", "VARCHAR"), ("email", "VARCHAR"), ("phone", "VARCHAR"), ("country", "VARCHAR"),
+        ("is_registered", "BOOLEAN DEFAULT 0"), ("registration_step", "VARCHAR DEFAULT 'start'"),
+        ("terms_accepted", "BOOLEAN DEFAULT 0"), ("joined_at", "DATETIME"),
+        ("subscription_plan", "VARCHAR DEFAULT 'free'"), ("plan_expires_at", "DATETIME"),
+        ("signals_used_today", "INTEGER DEFAULT 0"), ("last_signal_date", "VARCHAR"),
+        ("kyc_status", "VARCHAR DEFAULT 'not_submitted'"), ("kyc_id_document", "VARCHAR"), ("kyc_selfie", "VARCHAR"),
+        ("kyc_submitted_at", "DATETIME"), ("kyc_reviewed_at", "DATETIME"), ("kyc_rejection_reason", "VARCHAR"),
+        ("is_admin", "BOOLEAN DEFAULT 0"), ("is_super_admin", "BOOLEAN DEFAULT 0"),
+        ("is_banned", "BOOLEAN DEFAULT 0"), ("ban_reason", "VARCHAR"),
+        ("default_lot", "FLOAT DEFAULT 0.01"), ("risk_per_trade", "FLOAT DEFAULT 1.0"), ("max_daily_loss", "FLOAT DEFAULT 5.0"),
+        ("wallet_balance", "FLOAT DEFAULT 0.0"), ("wallet_currency", "VARCHAR DEFAULT 'USD'"), ("wallet_address", "VARCHAR"),
+        ("timezone", "VARCHAR DEFAULT 'UTC'"), ("notifications_enabled", "BOOLEAN DEFAULT 1"),
+        ("bulk_scan_config", "VARCHAR DEFAULT 'BTC/USDT,ETH/USDT,GC=F,EURUSD=X,GBPUSD=X'"), ("external_wallets", "TEXT"),
+        ("autotrade_enabled", "BOOLEAN DEFAULT 0"), ("autotrade_min_confidence", "FLOAT DEFAULT 75.0"),
+        ("autotrade_max_trades", "INTEGER DEFAULT 5"), ("autotrade_assets", "VARCHAR DEFAULT 'BTC/USDT,ETH/USDT,GC=F'"),
+    ])
+
+
+def _signal_outcomes(conn):
+    """SignalHistory calibration + outcome tracking columns (engine/calibration.py, engine/outcome_tracker.py)."""
+    add_missing_columns(conn, "signal_history", [
+        ("raw_confidence", "FLOAT"), ("strategy", "VARCHAR"), ("expiry_minutes", "INTEGER"), ("entry_timestamp", "INTEGER"),
+        ("outcome", "VARCHAR"), ("tpsl_outcome", "VARCHAR"), ("realized_move", "FLOAT"),
+        ("time_to_hit", "INTEGER"), ("resolved_at", "DATETIME"),
+    ])
+
+
+def _model_indexes(conn):
+    """Every index declared on the models that the database lacks (hot query paths, scripts/test_query_plans.py)."""
+    from utils.db import Base
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+# (version, description, step): Append only, never renumber
+MIGRATIONS = [
+    (1, "baseline schema + legacy users columns", _baseline),
+    (2, "signal_history outcome and calibration columns", _signal_outcomes),
+    (3, "indexes for trade, user, broker and signal outcome queries", _model_indexes),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn) -> int:
+    return conn.exec_driver_sql("PRAGMA user_version").scalar() or 0
+
+
+def migrate(engine=None, target: int = None):
+    """Applies pending migrations, each in its own transaction. Returns the versions applied."""
+    if engine is None:
+        from utils.db import engine
+    target = LATEST_VERSION if target is None else target
+    applied = []
+    for version, description, step in MIGRATIONS:
+        if version > target:
+            break
+        with engine.begin() as conn:
+            if schema_version(conn) >= version:
+                continue
+            step(conn)
+            conn.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+        applied.append(version)
+        logging.info(f"🗄️ Migrations: Applied v{version} ({description})")
+    return applied
+
+
+_migrated = False
+
+def ensure_schema():
+    """migrate() once per process: Startup and standalone scripts call this, request paths don't."""
+    global _migrated
+    if not _migrated:
+        migrate()
+        _migrated = True
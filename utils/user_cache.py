@@ -0,0 +1,156 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from utils.db import User
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 2048)) # Snapshots kept (LRU beyond that)
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 300)) # Seconds; backstop for writes made outside this process
+
+# Read-through cache of User rows for the hot navigation callbacks (menus, profile, access checks).
+# Every ORM write to users invalidates it (session events below), so a snapshot is never staler
+# than the last commit. Paths that modify the user still load the real row.
+
+_ALL = object() # Pending-invalidation marker: A bulk statement touched users we can't name
+
+
+class UserSnapshot:
+    """Immutable copy of a User row's columns (reads like the ORM object, holds no session)."""
+    __slots__ = tuple(column.key for column in User.__table__.columns)
+
+    def __init__(self, user):
+        for key in self.__slots__:
+            object.__setattr__(self, key, getattr(user, key))
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"UserSnapshot is read-only (load the User row to change '{key}')")
+
+    def __repr__(self):
+        return f"<UserSnapshot telegram_id={self.telegram_id!r}>"
+
+
+class UserCache:
+    """
+    Bounded LRU of UserSnapshot by telegram_id. Thread-safe: Invalidations also arrive from the
+    DB writer thread. A load that races an invalidation is not stored (generation check).
+    """
+
+    def __init__(self, size: int = USER_CACHE_SIZE, ttl: float = USER_CACHE_TTL):
+        self.size = max(1, size)
+        self.ttl = ttl
+        self.entries = OrderedDict() # telegram_id -> (snapshot, expires_at)
+        self.generation = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'evictions': 0}
+
+    def peek(self, telegram_id):
+        with self._lock:
+            entry = self.entries.get(telegram_id)
+            if entry is None or entry[1] < time.monotonic():
+                return None
+            self.entries.move_to_end(telegram_id)
+            return entry[0]
+
+    async def get(self, telegram_id):
+        """Snapshot of the user, or None if they don't exist (misses aren't cached: Signup inserts them)."""
+        telegram_id = str(telegram_id)
+        snapshot = self.peek(telegram_id)
+        if snapshot is not None:
+            self.stats['hits'] += 1
+            return snapshot
+        self.stats['misses'] += 1
+        generation = self.generation
+        from utils.async_db import AsyncDBManager
+        async with AsyncDBManager() as db:
+            user = await db.get_user_by_telegram_id(telegram_id)
+        if user is None:
+            return None
+        snapshot = UserSnapshot(user)
+        self.put(snapshot, generation)
+        return snapshot
+
+    def put(self, snapshot, generation=None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return # Invalidated while loading: The next read refetches
+            self.entries[snapshot.telegram_id] = (snapshot, time.monotonic() + self.ttl)
+            self.entries.move_to_end(snapshot.telegram_id)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def invalidate(self, keys):
+        """Drops the given telegram_ids, or everything for _ALL."""
+        with self._lock:
+            self.generation += 1
+            self.stats['invalidations'] += 1
+            if keys is _ALL or _ALL in keys:
+                self.entries.clear()
+            else:
+                for key in keys:
+                    self.entries.pop(str(key), None)
+
+    def clear(self):
+        self.invalidate(_ALL)
+
+    def get_stats(self):
+        hits, misses = self.stats['hits'], self.stats['misses']
+        return {**self.stats, "size": len(self.entries), "capacity": self.size,
+                "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None}
+
+
+_cache = None
+
+def get_user_cache():
+    global _cache
+    if _cache is None:
+        _cache = UserCache()
+    return _cache
+
+
+async def get_user_snapshot(telegram_id):
+    return await get_user_cache().get(telegram_id)
+
+
+# --- Write-through invalidation (every Session, sync or async, in this process) ---
+# Keys are dropped as soon as the write is flushed and again after commit, so a read that
+# reloaded the old row in between doesn't survive the commit.
+
+def _mark(session, keys):
+    pending = session.info.setdefault("user_cache_pending", set())
+    pending.update(keys)
+    if _cache is not None:
+        _cache.invalidate(keys)
+
+
+@event.listens_for(Session, "after_flush")
+def _users_flushed(session, flush_context):
+    keys = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            keys.add(obj.__dict__.get("telegram_id") or _ALL) # Unloaded key: Drop everything
+    if keys:
+        _mark(session, keys)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _users_bulk_write(state):
+    """UPDATE/DELETE statements on users: Tag them with .execution_options(user_cache_keys=(telegram_id, ...))."""
+    if (state.is_update or state.is_delete) and any(mapper.class_ is User for mapper in state.all_mappers):
+        _mark(state.session, state.execution_options.get("user_cache_keys") or (_ALL,))
+
+
+@event.listens_for(Session, "after_commit")
+def _users_committed(session):
+    pending = session.info.pop("user_cache_pending", None)
+    if pending and _cache is not None:
+        _cache.invalidate(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _users_rolled_back(session):
+    session.info.pop("user_cache_pending", None)